@@ -1,5 +1,5 @@
 import streamlit as st
-import tempfile
+import os
 from pathlib import Path
 import pandas as pd
 import sys
@@ -8,24 +8,57 @@ import time
 SRC_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(SRC_ROOT))
 
-from core.process import process_well
+from core.cache import LasCache
 from core.config import CLASConfig
+from core.jobs import FAILED, JobQueue
+from core.memcache import MemoryCache
 from viz.plotly_qc import PlotlyQCPlot
 from io import BytesIO
 from viz.plotlib_qc import plot_qc as plot_qc_matplotlib
-from pathlib import Path
-from matplotlib.figure import Figure
 
 # ------------------------------------------------------------------------------
 # Page config
 # ------------------------------------------------------------------------------
 
+# uploads per session; wells are processed in the background
+MAX_WELLS = int(os.environ.get("CLAS_APP_MAX_WELLS", "30"))
+
+# wells shown side by side
+MAX_SHOWN = 2
+
 st.set_page_config(page_title="C-LAS Demo", layout="wide")
 
 st.title("C-LAS")
-st.caption("Interactive QC visualization for LAS files (maximum 2 wells)")
+st.caption(f"Interactive QC visualization for LAS files (up to {MAX_WELLS} wells)")
 
-cfg = CLASConfig()
+# uploads are parsed from memory, so the optional LAS cache is keyed on content
+LAS_CACHE = (
+    LasCache(Path(os.environ["CLAS_CACHE_DIR"]), key="content")
+    if os.environ.get("CLAS_CACHE_DIR")
+    else None
+)
+
+# ------------------------------------------------------------------------------
+# Shared result cache
+# ------------------------------------------------------------------------------
+
+@st.cache_resource
+def result_cache() -> MemoryCache:
+    """One bounded cache for every session on this server."""
+    return MemoryCache(
+        max_bytes=int(os.environ.get("CLAS_APP_CACHE_MB", "512")) * 1024**2,
+        ttl=float(os.environ.get("CLAS_APP_CACHE_TTL", "3600")),
+    )
+
+@st.cache_resource
+def job_queue() -> JobQueue:
+    """Background workers shared by every session on this server."""
+    return JobQueue(
+        workers=int(os.environ.get("CLAS_APP_WORKERS", "0")),
+        cache=result_cache(),
+        las_cache=LAS_CACHE,
+        keep_for=float(os.environ.get("CLAS_APP_CACHE_TTL", "3600")),
+    )
 
 # ------------------------------------------------------------------------------
 # Session state
@@ -33,7 +66,7 @@ cfg = CLASConfig()
 
 defaults = {
     "processed": False,
-    "results": [],}
+    "job_ids": [],}
 
 for k, v in defaults.items():
     st.session_state.setdefault(k, v)
@@ -57,16 +90,34 @@ def dataframe_height_by_chunks(
     chunks = min(chunks, max_chunks)
     return header_px + chunks * chunk_size * row_px
 
-@st.cache_data(show_spinner=False)
-def cached_process_well(las_bytes: bytes, cfg: CLASConfig) -> dict:
-    with tempfile.TemporaryDirectory() as tmpdir:
-        las_path = Path(tmpdir) / "input.las"
-        las_path.write_bytes(las_bytes)
-        return process_well(las_path, cfg)
+def cached_plotly(result: dict, cfg: CLASConfig) -> PlotlyQCPlot:
+    return result_cache().get_or_compute(
+        ("plotly", result["digest"], cfg.fingerprint()),
+        lambda: PlotlyQCPlot(
+            df=result["log"].to_pandas(),
+            well_name=result["well"],
+            threshold=cfg.point_threshold,
+            seams=result["seams"],
+        ),
+    )
+
+def cached_png(result: dict, cfg: CLASConfig) -> bytes:
+    def render() -> bytes:
+        fig = plot_qc_matplotlib(
+            df=result["log"].to_pandas(),
+            seams=result["seams"],
+            well_name=result["well"],
+            out_dir=Path("."),
+            threshold=cfg.point_threshold,
+            plot=False,
+            save=False,
+            reuse_figure=True,
+        )
+        buf = BytesIO()
+        fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
+        return buf.getvalue()
 
-def export_png(fig: Figure, output_path: Path) -> None:
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    fig.savefig(output_path, dpi=150, bbox_inches="tight")
+    return result_cache().get_or_compute(("png", result["digest"], cfg.fingerprint()), render)
 
 # ------------------------------------------------------------------------------
 # Sidebar
@@ -81,7 +132,7 @@ with st.sidebar:
         type=["las"],
         accept_multiple_files=True,
         disabled=st.session_state.processed,
-        help="You can upload up to 2 LAS files for side-by-side comparison.",
+        help=f"You can upload up to {MAX_WELLS} LAS files; any two can be compared side by side.",
     )
     
     use_yaml = st.sidebar.checkbox("Use custom config")
@@ -100,8 +151,8 @@ with st.sidebar:
     else:
         config = CLASConfig()
 
-    if uploaded_files and len(uploaded_files) > 2:
-        st.error("Maximum 2 LAS files allowed.")
+    if uploaded_files and len(uploaded_files) > MAX_WELLS:
+        st.error(f"Maximum {MAX_WELLS} LAS files allowed.")
         st.stop()
 
     if uploaded_files and not st.session_state.processed:
@@ -109,29 +160,10 @@ with st.sidebar:
         st.caption("Start processing once all files are uploaded.")
 
         if st.button("Process Wells", type="primary"):
-            progress = st.progress(0)
-            status = st.empty()
-
-            results = []
-            total = len(uploaded_files)
-            start = time.time()
-
-            for i, f in enumerate(uploaded_files, start=1):
-                status.info(f"Processing {f.name} ({i}/{total})")
-
-                result = cached_process_well(f.read(), cfg)
-                results.append(result)
-
-                elapsed = time.time() - start
-                eta = int((elapsed / i) * (total - i)) if i < total else 0
-
-                progress.progress(i / total)
-                status.caption(f"QC + Seam Extraction · ETA ~ {eta}s")
-
-            progress.empty()
-            status.success("Processing complete")
-
-            st.session_state.results = results
+            queue = job_queue()
+            st.session_state.job_ids = [
+                queue.submit(f.getvalue(), f.name, config).id for f in uploaded_files
+            ]
             st.session_state.processed = True
 
 # ------------------------------------------------------------------------------
@@ -139,19 +171,70 @@ with st.sidebar:
 # ------------------------------------------------------------------------------
 
 if not st.session_state.processed:
-    st.info("Upload up to 2 LAS files and click **Process Wells** to begin.")
+    st.info(f"Upload up to {MAX_WELLS} LAS files and click **Process Wells** to begin.")
     st.stop()
 
-results = st.session_state.results
+jobs = job_queue().jobs(st.session_state.job_ids)
+pending = [j for j in jobs if j.pending]
+# read each result once: a cached result can be evicted between two reads
+results_by_id = {j.id: j.result for j in jobs}
+finished = {j.id: j for j in jobs if results_by_id[j.id] is not None}
+
+# ------------------------------------------------------------------------------
+# Progress
+# ------------------------------------------------------------------------------
+
+if len(jobs) < len(st.session_state.job_ids):
+    st.warning("Some results expired from the server; upload those wells again.")
+
+if pending:
+    st.progress(
+        (len(jobs) - len(pending)) / max(len(jobs), 1),
+        text=f"QC + Seam Extraction · {len(jobs) - len(pending)} of {len(jobs)} well(s) done",
+    )
+
+if len(jobs) > 1 or pending:
+    st.dataframe(
+        pd.DataFrame({
+            "File": [j.name for j in jobs],
+            "Well": [results_by_id[j.id]["well"] if results_by_id[j.id] else "" for j in jobs],
+            "Status": [j.error if j.status == FAILED else j.status for j in jobs],
+            "Seams": [results_by_id[j.id]["seam_count"] if results_by_id[j.id] else None for j in jobs],
+            "Time (s)": [round(j.elapsed, 1) for j in jobs],
+        }),
+        use_container_width=True,
+        hide_index=True,
+        height=dataframe_height_by_chunks(len(jobs), max_chunks=2),
+    )
+
+if not finished:
+    if pending:
+        time.sleep(1)
+        st.rerun()
+    st.stop()
 
 # ------------------------------------------------------------------------------
 # Adaptive layout
 # ------------------------------------------------------------------------------
 
+if len(finished) > MAX_SHOWN:
+    shown = st.multiselect(
+        "Wells to display",
+        options=list(finished),
+        default=list(finished)[:MAX_SHOWN],
+        format_func=lambda job_id: finished[job_id].name,
+        max_selections=MAX_SHOWN,
+        key="shown",
+    )
+else:
+    shown = list(finished)
+
+results = [dict(results_by_id[job_id], digest=finished[job_id].key[1]) for job_id in shown]
+
 if len(results) == 1:
     cols = [st.container()]
 else:
-    cols = st.columns(2)
+    cols = st.columns(max(len(results), 1))
 
 for idx, result in enumerate(results):
     with cols[idx]:
@@ -178,12 +261,23 @@ for idx, result in enumerate(results):
         # -------------------------------
         st.markdown("#### QC Tracks")
 
-        plot = PlotlyQCPlot(
-            df=result["df"],
-            well_name=result["well"],
-        )
+        # the pyramid is built once per well; the slider only re-slices it
+        plot = cached_plotly(result, config)
+        fig = plot.figure()
+
+        depth = result["log"].depth
+        if plot.lod and len(depth) > 1:
+            top, bottom = st.slider(
+                "Depth window (m)",
+                min_value=float(depth[0]),
+                max_value=float(depth[-1]),
+                value=(float(depth[0]), float(depth[-1])),
+                key=f"depth_window_{result['digest']}",
+                help="Long wells show a decimated overview; narrow the window for full resolution.",
+            )
+            fig = plot.zoom(top, bottom)
 
-        st.plotly_chart(plot.figure(), use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True)
 
         # -------------------------------
         # Downloads
@@ -197,24 +291,9 @@ for idx, result in enumerate(results):
             mime="text/csv",
         )
 
-        buf = BytesIO()
-
-        fig = plot_qc_matplotlib(
-            df=result["df"],
-            seams=result["seams"],
-            well_name=result["well"],
-            out_dir=Path("."),
-            threshold=config.point_threshold,
-            plot=False,
-            save=False,
-        )
-
-        fig.savefig(buf, format="png", dpi=150, bbox_inches="tight")
-        buf.seek(0)
-
         st.download_button(
             "Download QC Plot (PNG)",
-            data=buf,
+            data=cached_png(result, config),
             file_name=f"{result['well']}_qc.png",
             mime="image/png",
         )
@@ -227,4 +306,9 @@ st.markdown("---")
 st.caption("Reset will clear all uploaded files and results.")
 
 if st.button("End Session (Reset)", type="primary"):
-    reset_app()
\ No newline at end of file
+    reset_app()
+
+# keep polling while wells are still in the queue
+if pending:
+    time.sleep(1)
+    st.rerun()
\ No newline at end of file
@@ -0,0 +1 @@
+"""Synthetic-LAS benchmarks for the C-LAS pipeline (``python -m bench``)."""
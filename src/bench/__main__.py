@@ -0,0 +1,305 @@
+"""
+Pipeline benchmarks on synthetic LAS files.
+
+Every stage of a single-well run is timed (best of ``--repeat``) and then
+re-run once under tracemalloc for its peak allocation, for wells of each
+requested size; ``cli_startup`` times a cold ``clas --help`` to guard the
+interpreter start-up budget. Results can be saved as a baseline and later runs compared
+against it:
+
+    python -m bench --sizes 10k 100k 1M --save-baseline
+    python -m bench --sizes 10k 100k 1M          # exits 1 on a regression
+"""
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import gc
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+from bench.synth import synth_las
+from core.config import CLASConfig
+from core.io import read_las
+from core.preprocessing import auto_trim
+from core.scoring import compute_clas, flag_coal
+from core.seams import extract_seams
+
+logger = logging.getLogger("clas")
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+
+# differences below this are timer noise, whatever the ratio
+MIN_REGRESSION_S = 0.005
+
+Stage = Tuple[str, Callable[[dict], None]]
+
+
+@dataclass
+class StageResult:
+    stage: str
+    size: str
+    samples: int
+    seconds: float
+    peak_mb: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.stage}@{self.size}"
+
+    @property
+    def rate(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        return self.samples / self.seconds if self.seconds else float("inf")
+
+
+# -------------------------
+# STAGES
+# -------------------------
+def _stages(las_path: Path, cfg: CLASConfig, plot_dir: Path) -> List[Stage]:
+    def read(s):
+        s["raw"], s["well"] = read_las(las_path)
+
+    def trim(s):
+        s["df"] = auto_trim(s["raw"])
+
+    def clas(s):
+        s["df"]["CLAS"] = compute_clas(s["df"], cfg)
+
+    def is_coal(s):
+        s["df"]["IS_COAL"] = flag_coal(s["df"]["CLAS"].to_numpy(), cfg.point_threshold)
+
+    def seams(s):
+        s["seams"] = extract_seams(s["df"], cfg)
+
+    def plot_matplotlib(s):
+        from viz.plot_config import plot_qc
+
+        plot_qc(
+            df=s["df"], seams=s["seams"], well_name=s["well"], out_dir=plot_dir,
+            threshold=cfg.point_threshold, plot=False, save=True, backend="matplotlib",
+        )
+
+    def plot_plotly(s):
+        from viz.plotly_qc import PlotlyQCPlot
+
+        PlotlyQCPlot(s["df"], s["well"], cfg.point_threshold, seams=s["seams"]).figure().to_json()
+
+    return [
+        ("read_las", read),
+        ("auto_trim", trim),
+        ("compute_clas", clas),
+        ("is_coal", is_coal),
+        ("extract_seams", seams),
+        ("plot_qc[matplotlib]", plot_matplotlib),
+        ("plot_qc[plotly]", plot_plotly),
+    ]
+
+
+def _available(stage: str) -> bool:
+    if stage == "plot_qc[plotly]":
+        try:
+            import plotly  # noqa: F401
+        except ImportError:
+            return False
+    return True
+
+
+def bench_startup(repeat: int = 5) -> StageResult:
+    """Wall time of ``python -m core --help`` in a fresh interpreter."""
+    cmd = [sys.executable, "-m", "core", "--help"]
+    cwd = Path(__file__).resolve().parent.parent
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        subprocess.run(cmd, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, perf_counter() - start)
+
+    return StageResult("cli_startup", "-", 0, best, 0.0)
+
+
+def bench_size(
+    size: str,
+    workdir: Path,
+    cfg: CLASConfig,
+    repeat: int = 3,
+    skip: Tuple[str, ...] = (),
+) -> List[StageResult]:
+    samples = SIZES[size]
+    las_path = workdir / f"synth_{size}.las"
+    if not las_path.exists():
+        logger.info(f"Generating {las_path.name} ({samples:,} samples)")
+        synth_las(las_path, samples, seed=samples)
+
+    stages = [
+        (name, fn) for name, fn in _stages(las_path, cfg, workdir / "plots")
+        if name not in skip and _available(name)
+    ]
+    (workdir / "plots").mkdir(exist_ok=True)
+
+    state: dict = {}
+    times: Dict[str, float] = {}
+    for name, fn in stages:
+        best = float("inf")
+        for _ in range(repeat):
+            gc.collect()
+            start = perf_counter()
+            fn(state)
+            best = min(best, perf_counter() - start)
+        times[name] = best
+
+    # separate pass: tracemalloc slows allocation-heavy code down
+    peaks: Dict[str, float] = {}
+    state = {}
+    tracemalloc.start()
+    try:
+        for name, fn in stages:
+            gc.collect()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            fn(state)
+            peaks[name] = (tracemalloc.get_traced_memory()[1] - before) / 1024**2
+    finally:
+        tracemalloc.stop()
+
+    return [
+        StageResult(name, size, samples, times[name], peaks[name])
+        for name, _ in stages
+    ]
+
+
+# -------------------------
+# BASELINE
+# -------------------------
+def load_baseline(path: Path) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    with path.open("r") as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(path: Path, results: List[StageResult], merge: bool = True) -> None:
+    entries = load_baseline(path) if merge else {}
+    for r in results:
+        entries[r.key] = {
+            "seconds": round(r.seconds, 6), "peak_mb": round(r.peak_mb, 2), "samples": r.samples,
+        }
+
+    with path.open("w") as f:
+        json.dump({"results": dict(sorted(entries.items()))}, f, indent=2)
+        f.write("\n")
+
+
+def regressions(
+    results: List[StageResult], baseline: Dict[str, dict], tolerance: float
+) -> List[StageResult]:
+    slow = []
+    for r in results:
+        ref = baseline.get(r.key)
+        if ref and r.seconds > ref["seconds"] * (1 + tolerance) and r.seconds - ref["seconds"] > MIN_REGRESSION_S:
+            slow.append(r)
+    return slow
+
+
+def report(results: List[StageResult], baseline: Dict[str, dict]) -> str:
+    lines = [
+        f"{'stage':<22}{'size':>6}{'seconds':>11}{'samples/s':>14}{'peak MB':>10}{'vs base':>10}",
+    ]
+    for r in results:
+        ref = baseline.get(r.key)
+        ratio = f"{r.seconds / ref['seconds']:.2f}x" if ref and ref["seconds"] else "-"
+        rate = "-" if r.rate is None else f"{r.rate:,.0f}"
+        peak = "-" if not r.samples else f"{r.peak_mb:.1f}"
+        lines.append(
+            f"{r.stage:<22}{r.size:>6}{r.seconds:>11.4f}{rate:>14}{peak:>10}{ratio:>10}"
+        )
+    return "\n".join(lines)
+
+
+# -------------------------
+# CLI
+# -------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m bench",
+        description="Benchmark every C-LAS pipeline stage on synthetic LAS files.",
+    )
+    parser.add_argument(
+        "--sizes", nargs="+", default=["10k", "100k", "1M"], choices=list(SIZES),
+        help="Well sizes to benchmark"
+    )
+    parser.add_argument("--repeat", type=int, default=3, metavar="N", help="Timed runs per stage (best is kept)")
+    parser.add_argument("--skip", nargs="+", default=[], metavar="STAGE", help="Stages to leave out")
+    parser.add_argument("--config", type=Path, metavar="YAML", help="CLAS configuration")
+    parser.add_argument(
+        "--workdir", type=Path, default=Path(tempfile.gettempdir()) / "clas-bench",
+        metavar="DIR", help="Where synthetic LAS files are generated and reused"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE, metavar="JSON", help="Baseline to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, metavar="FRAC",
+        help="Allowed slow-down before a stage counts as a regression"
+    )
+    parser.add_argument("--json", type=Path, metavar="FILE", help="Also write results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    from core.cli import setup_logging
+
+    args = parse_args(argv)
+    setup_logging(args.verbose, quiet=False)
+    # stage output (e.g. "Reading LAS") would drown the report
+    for name in ("core", "viz"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    cfg = CLASConfig.from_yaml(args.config) if args.config else CLASConfig()
+    args.workdir.mkdir(parents=True, exist_ok=True)
+
+    results: List[StageResult] = []
+    if "cli_startup" not in args.skip:
+        results.append(bench_startup(max(args.repeat, 5)))
+
+    for size in args.sizes:
+        logger.info(f"Benchmarking {size} samples")
+        results += bench_size(size, args.workdir, cfg, args.repeat, tuple(args.skip))
+
+    baseline = load_baseline(args.baseline)
+    print(report(results, baseline))
+
+    if args.json:
+        with args.json.open("w") as f:
+            json.dump([dict(asdict(r), samples_per_s=r.rate) for r in results], f, indent=2)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        logger.info(f"✔ Baseline written to {args.baseline}")
+        return
+
+    slow = regressions(results, baseline, args.tolerance)
+    for r in slow:
+        logger.error(
+            f"✘ {r.key}: {r.seconds:.4f}s vs baseline {baseline[r.key]['seconds']:.4f}s"
+        )
+    if slow:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
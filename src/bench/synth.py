@@ -0,0 +1,105 @@
+"""
+Synthetic LAS generator.
+
+Wells look like the sample logs: a shale / sandstone background with coal
+seams (low GR, high LD / SD counts, tight caliper), plus the defects real
+files have: scattered NULL samples, dead-tool runs, depth gaps, irregular
+steps and rows without a depth value.
+"""
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+NULL = -999.25
+ROWS_PER_WRITE = 100_000
+
+
+def synth_well(
+    n_samples: int,
+    seed: int = 0,
+    step: float = 0.02,
+    start: float = 10.0,
+    coal_every: float = 40.0,
+) -> pd.DataFrame:
+    """DEPT / GR / CL / LD / SD frame with NaN for missing values."""
+    rng = np.random.default_rng(seed)
+    n = int(n_samples)
+
+    # mostly regular steps, some half / double steps and a few depth gaps
+    steps = np.full(n, step)
+    odd = rng.random(n) < 0.01
+    steps[odd] = rng.choice([step / 2, 2 * step], size=odd.sum())
+    gaps = rng.integers(0, n, size=max(1, n // 50_000))
+    steps[gaps] += rng.uniform(1.0, 10.0, size=len(gaps))
+    steps[0] = 0.0
+    depth = start + np.cumsum(steps)
+
+    gr = rng.normal(45, 12, n)
+    cl = rng.normal(2.2, 0.08, n)
+    ld = rng.normal(1700, 150, n)
+    sd = rng.normal(15000, 400, n)
+
+    # coal seams, 0.3-6 m thick, on average one every ``coal_every`` metres
+    n_seams = rng.poisson(max(1.0, (depth[-1] - depth[0]) / coal_every))
+    for top in rng.uniform(depth[0], depth[-1], size=n_seams):
+        lo, hi = np.searchsorted(depth, [top, top + rng.uniform(0.3, 6.0)])
+        k = hi - lo
+        gr[lo:hi] = rng.normal(9, 6, k)
+        cl[lo:hi] = rng.normal(1.9, 0.1, k)
+        ld[lo:hi] = rng.normal(4700, 300, k)
+        sd[lo:hi] = rng.normal(18800, 300, k)
+
+    gr = np.round(np.clip(gr, 0, None))
+
+    # scattered NULLs and dead-tool runs
+    for curve in (gr, cl, ld, sd):
+        curve[rng.random(n) < 0.01] = np.nan
+        for s in rng.integers(0, n, size=max(1, n // 20_000)):
+            curve[s:s + rng.integers(10, max(11, min(500, n // 100)))] = np.nan
+
+    # a handful of rows with no depth at all (dropped by auto_trim)
+    depth[rng.integers(0, n, size=max(1, n // 100_000))] = np.nan
+
+    return pd.DataFrame({"DEPT": depth, "GR": gr, "CL": cl, "LD": ld, "SD": sd})
+
+
+def write_las(df: pd.DataFrame, path: Path, well: str = "SYNTH", null: float = NULL) -> Path:
+    depth = df["DEPT"].dropna()
+    step = float(np.median(np.diff(depth))) if len(depth) > 1 else 0.0
+
+    header = (
+        "~Version\n"
+        "VERS. 2.0 : CWLS LOG ASCII STANDARD - VERSION 2.0\n"
+        "WRAP. NO  : ONE LINE PER DEPTH STEP\n"
+        "~Well\n"
+        f"STRT.M {depth.iloc[0]:.4f}\n"
+        f"STOP.M {depth.iloc[-1]:.4f}\n"
+        f"STEP.M {step:.4f}\n"
+        f"NULL. {null}\n"
+        f"WELL. {well}\n"
+        "~Curve\n"
+        "DEPT.M\n"
+        "GR.CPS\n"
+        "CL.IN\n"
+        "LD.CPS\n"
+        "SD.CPS\n"
+        "~A\n"
+    )
+
+    data = df.to_numpy(dtype=np.float64)
+    row = " ".join(["%.4f"] * data.shape[1]) + "\n"
+
+    path = Path(path)
+    with path.open("w") as f:
+        f.write(header)
+        for lo in range(0, len(data), ROWS_PER_WRITE):
+            chunk = np.nan_to_num(data[lo:lo + ROWS_PER_WRITE], nan=null)
+            f.write((row * len(chunk)) % tuple(chunk.ravel().tolist()))
+    return path
+
+
+def synth_las(path: Path, n_samples: int, seed: int = 0, well: Optional[str] = None) -> Path:
+    """Write a synthetic well of ``n_samples`` rows to ``path``."""
+    return write_las(synth_well(n_samples, seed), path, well or f"SYNTH_{n_samples}")
@@ -1,24 +1,49 @@
+import importlib
+import os
+import sys
 from pathlib import Path
 from time import perf_counter
-import pandas as pd
 import logging
 
+# Only the argument parser is imported up front: `clas --help` and other
+# quick invocations must not pay for pandas / lasio / matplotlib.
 from core.cli import parse_args, setup_logging
-from core.pipeline import run_single_well
-from viz.plot_config import plot_qc
-from core.config import CLASConfig
+
+# `clas <command> ...` dispatches to the module's own main(argv)
+SUBCOMMANDS = {
+    "sweep": "core.sweep",
+    "query": "core.catalog",
+    "watch": "core.watch",
+    "serve": "core.serve",
+    "cluster": "core.cluster",
+}
     
-def main() -> None:
-    args = parse_args()
+def main(argv=None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] in SUBCOMMANDS:
+        return importlib.import_module(SUBCOMMANDS[argv[0]]).main(argv[1:])
+
+    args = parse_args(argv)
     setup_logging(args.verbose, args.quiet)
 
+    if args.save_plot and not args.plot:
+        # nothing is shown on screen; skip GUI backend discovery (workers inherit this)
+        os.environ.setdefault("MPLBACKEND", "Agg")
+
+    from core.batch import run_batch, run_field_batch
+    from core.cache import LasCache
+    from core.config import CLASConfig
+    from core.io import read_well_info
+    from core.manifest import Manifest, run_options
+
     logger = logging.getLogger("clas")
 
     # Resolve LAS paths
     if args.las:
         las_files = [Path(p).resolve() for p in args.las]
     else:
-        las_files = sorted(Path(args.las_dir).glob("*.las"))
+        las_files = sorted(p.resolve() for p in Path(args.las_dir).glob("*.las"))
 
     if not las_files:
         raise SystemExit("No LAS files found")
@@ -40,36 +65,158 @@ def main() -> None:
         
     logger.info(f"CLASConfig: {cfg}")
 
-    for las_path in las_files:
-        start = perf_counter()
+    # Skip wells whose LAS file, config, code version and outputs are unchanged
+    manifest = Manifest.in_dir(output_root)
+    options = run_options(args.save_plot, args.stream, args.export, args.common_grid, args.depth_range)
 
-        well_out = output_root / las_path.stem
-        well_out.mkdir(parents=True, exist_ok=True)
+    catalog = None
+    fingerprint = cfg.fingerprint()
+    if args.catalog:
+        from core.catalog import SeamCatalog
 
-        result = run_single_well(
-            las_path=las_path,
-            cfg=cfg,
-            output_dir=well_out,
-        )
-        if args.plot or args.save_plot:
-            plot_qc(
-                df=result.df,
-                seams=result.seams,
-                well_name=result.well,
-                out_dir=result.output_dir,
-                threshold=cfg.point_threshold,
-                plot=args.plot,
-                save=args.save_plot,
-                backend="matplotlib",
+        catalog = SeamCatalog(Path(args.catalog).resolve())
+        logger.info(f"Adding seams to catalog {catalog.path}")
+
+    if args.force or args.plot or not manifest.entries:
+        pending = las_files
+    else:
+        manifest.compact()
+        # wells done before the catalog was in use still need ingesting
+        pending = [
+            p for p in las_files
+            if not manifest.is_current(p, cfg, options)
+            or (catalog is not None and not catalog.contains(p, fingerprint))
+        ]
+
+        skipped = len(las_files) - len(pending)
+        if skipped:
+            logger.info(
+                f"Skipping {skipped} unchanged well(s) listed in {manifest.path.name} "
+                "(use --force to reprocess)"
             )
 
-        elapsed = perf_counter() - start
+    cache = None
+    if args.cache_dir and not args.no_cache:
+        cache = LasCache(
+            root=Path(args.cache_dir).resolve(),
+            max_bytes=int(args.cache_size * 1024**2),
+        )
+        logger.info(f"Using LAS cache at {cache.root}")
+
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(pending)))
+    if jobs > 1:
+        logger.info(f"Running {len(pending)} well(s) on {jobs} worker processes")
+
+    batch_start = perf_counter()
+    outcomes = []
+
+    if args.common_grid is not None:
+        logger.info(f"Scoring {len(pending)} well(s) on a common depth grid")
+        results = run_field_batch(
+            pending,
+            cfg,
+            output_root,
+            step=args.common_grid or None,
+            plot=args.plot,
+            save_plot=args.save_plot,
+            cache=cache,
+            export=args.export,
+        )
+    else:
+        results = run_batch(
+            pending,
+            cfg,
+            output_root,
+            jobs=jobs,
+            plot=args.plot,
+            save_plot=args.save_plot,
+            cache=cache,
+            stream=args.stream,
+            block_bytes=int(args.chunk_mb * 1024**2),
+            profile=args.profile,
+            cprofile=args.cprofile,
+            prefetch=args.prefetch,
+            export=args.export,
+            depth_range=args.depth_range,
+        )
+
+    field_table = None
+    if args.export:
+        from core.export import FIELD_SEAMS_NAME, SEAMS_NAME, FieldSeamTable, export_path, read_table
+
+        field_table = FieldSeamTable(export_path(output_root, FIELD_SEAMS_NAME, args.export), args.export)
+
+    try:
+        if field_table is not None:
+            # wells skipped as up to date keep their exported seams
+            for las_path in sorted(set(las_files) - set(pending), key=las_files.index):
+                field_table.append_frame(read_table(export_path(output_root / las_path.stem, SEAMS_NAME, args.export)))
+
+        for result in results:
+            outcomes.append(result)
+
+            if not result.ok:
+                continue
+
+            if catalog is not None:
+                catalog.add_well(
+                    result.las_path,
+                    fingerprint,
+                    result.seams,
+                    read_well_info(result.las_path),
+                    depth_range=(result.depth_min, result.depth_max),
+                )
+
+            if field_table is not None:
+                field_table.append(result.well, result.las_path, result.seams)
+
+            manifest.record(result, cfg, options)
+
+            logger.info("✔ Processing complete")
+            logger.info(f"✔ Well: {result.well}")
+            logger.info(f"✔ Coal seams detected: {result.seam_count}")
+            logger.info(f"✔ Output directory: {result.output_dir}")
+            logger.info(f"✔ Elapsed time: {result.elapsed:.2f}s")
+    except BaseException:
+        # keep the previous field table rather than a partial one
+        if field_table is not None:
+            field_table.abort()
+        raise
+
+    wall = perf_counter() - batch_start
+    if catalog is not None:
+        catalog.close()
+    if field_table is not None:
+        field_table.close()
+        logger.info(f"Field seam table: {field_table.path} ({field_table.rows} seam(s))")
+
+    busy = sum(o.elapsed for o in outcomes)
+    failed = [o for o in outcomes if not o.ok]
+
+    if len(outcomes) > 1:
+        logger.info(
+            f"Batch finished: {len(outcomes) - len(failed)}/{len(outcomes)} well(s) in {wall:.2f}s "
+            f"({len(outcomes) / wall:.2f} wells/s, {busy:.2f}s of per-well time, "
+            f"{busy / wall:.1f}x speed-up on {jobs} job(s))"
+        )
+
+    if args.profile:
+        from core.profiling import SUMMARY_NAME, format_summary, summarize, write_summary
+
+        summary = summarize(o.profile for o in outcomes if o.ok)
+        write_summary(
+            output_root / SUMMARY_NAME,
+            summary,
+            wells=len(outcomes),
+            jobs=jobs,
+            wall_s=wall,
+        )
+        logger.info(f"Stage profile ({SUMMARY_NAME}):\n{format_summary(summary)}")
 
-        logger.info("✔ Processing complete")
-        logger.info(f"✔ Well: {result.well}")
-        logger.info(f"✔ Coal seams detected: {result.seam_count}")
-        logger.info(f"✔ Output directory: {result.output_dir}")
-        logger.info(f"✔ Elapsed time: {elapsed:.2f}s")
+    if failed:
+        for o in failed:
+            logger.error(f"✘ {o.las_path.name}: {o.error}")
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
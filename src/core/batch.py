@@ -0,0 +1,496 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator, List, Optional, Sequence, Tuple
+import logging
+import os
+import signal
+
+from core.cache import LasCache
+from core.config import CLASConfig
+from core.lasreader import BLOCK_BYTES
+from core.pipeline import run_single_well
+from core.profiling import NULL_PROFILER, StageProfiler
+from core.types import PipelineResult, WellOutcome
+from core.welllog import compact_result
+
+logger = logging.getLogger("clas")
+
+# times a well may take down a worker of a long-lived pool before it is given up on
+MAX_CRASHES = 2
+
+# LAS files parsed ahead of the well being scored in a serial batch
+PREFETCH = 2
+
+# scored wells allowed to wait for their outputs to be written
+MAX_PENDING_WRITES = 2
+
+
+class _RecordBuffer(logging.Handler):
+    """Collects a worker's log records so the parent can replay them in order."""
+
+    def __init__(self):
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # make the record picklable: render args and tracebacks to text
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+def init_worker(level: int) -> None:
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level)
+
+
+def warm_worker(level: int, save_plot: bool) -> None:
+    """Initializer of the long-lived watch and cluster pools; the pipeline comes in with this module."""
+    init_worker(level)
+    # Ctrl+C reaches the whole process group; the parent shuts workers down itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if save_plot:
+        os.environ.setdefault("MPLBACKEND", "Agg")
+        import viz.plot_config  # noqa: F401
+
+
+def worker_ready() -> int:
+    # a no-op task; submitting one per worker starts the whole pool up front
+    return os.getpid()
+
+
+def process_las(
+    las_path: Path,
+    cfg: CLASConfig,
+    output_root: Path,
+    plot: bool = False,
+    save_plot: bool = False,
+    cache: Optional[LasCache] = None,
+    stream: bool = False,
+    block_bytes: int = BLOCK_BYTES,
+    profile: bool = False,
+    cprofile: bool = False,
+    export: Optional[str] = None,
+    depth_range: Optional[Tuple[float, float]] = None,
+) -> WellOutcome:
+    start = perf_counter()
+    well_out = output_root / las_path.stem
+    outputs = [well_out]
+
+    profiler = StageProfiler(cprofile=cprofile) if profile or cprofile else NULL_PROFILER
+    profiler.start()
+
+    try:
+        well_out.mkdir(parents=True, exist_ok=True)
+
+        result = run_single_well(
+            las_path=las_path,
+            cfg=cfg,
+            output_dir=well_out,
+            cache=cache,
+            stream=stream,
+            block_bytes=block_bytes,
+            profiler=profiler,
+            depth_range=depth_range,
+        )
+
+        outputs += _plot_well(result, cfg, plot, save_plot, profiler)
+        outputs += _export_well(result, export, las_path, profiler)
+
+    except Exception as exc:
+        logger.error(f"✘ Failed to process {las_path.name}: {exc}")
+        logger.debug("Traceback:", exc_info=True)
+        return WellOutcome(
+            las_path=las_path,
+            output_dir=well_out,
+            elapsed=perf_counter() - start,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    finally:
+        profiler.stop()
+
+    elapsed = perf_counter() - start
+    if profiler.enabled:
+        profiler.write(
+            result.output_dir,
+            las_file=str(las_path),
+            well=result.well,
+            seam_count=result.seam_count,
+            elapsed_s=elapsed,
+        )
+
+    return WellOutcome(
+        las_path=las_path,
+        output_dir=result.output_dir,
+        elapsed=elapsed,
+        well=result.well,
+        seam_count=result.seam_count,
+        outputs=tuple(outputs),
+        seams=result.seams,
+        depth_min=result.depth_min,
+        depth_max=result.depth_max,
+        profile=tuple(profiler.stages) if profiler.enabled else (),
+    )
+
+
+def _plot_well(result: PipelineResult, cfg: CLASConfig, plot: bool, save_plot: bool, profiler=NULL_PROFILER) -> List[Path]:
+    """Show / save the QC plot; returns the files written."""
+    if not (plot or save_plot):
+        return []
+
+    from viz.plot_config import plot_qc
+
+    plot_qc(
+        df=result.df,
+        seams=result.seams,
+        well_name=result.well,
+        out_dir=result.output_dir,
+        threshold=cfg.point_threshold,
+        plot=plot,
+        save=save_plot,
+        backend="matplotlib",
+        profiler=profiler,
+        reuse_figure=not plot,
+    )
+
+    if not save_plot:
+        return []
+
+    from viz.plotlib_qc import qc_png_path
+
+    return [qc_png_path(result.output_dir, result.well)]
+
+
+def _export_well(result: PipelineResult, export: Optional[str], las_path: Path, profiler=NULL_PROFILER) -> List[Path]:
+    """Write the well's samples / seams in the ``export`` format; returns the files written."""
+    if not export:
+        return []
+
+    from core.export import export_well
+
+    with profiler.stage(f"export[{export}]"):
+        return export_well(result, export, las_path)
+
+
+def process_las_captured(*args, **kwargs):
+    buffer = _RecordBuffer()
+    root = logging.getLogger()
+    root.addHandler(buffer)
+    try:
+        outcome = process_las(*args, **kwargs)
+    finally:
+        root.removeHandler(buffer)
+    return outcome, buffer.records
+
+
+def run_batch(
+    las_files: Sequence[Path],
+    cfg: CLASConfig,
+    output_root: Path,
+    *,
+    jobs: int = 1,
+    plot: bool = False,
+    save_plot: bool = False,
+    cache: Optional[LasCache] = None,
+    stream: bool = False,
+    block_bytes: int = BLOCK_BYTES,
+    profile: bool = False,
+    cprofile: bool = False,
+    prefetch: int = 0,
+    export: Optional[str] = None,
+    depth_range: Optional[Tuple[float, float]] = None,
+) -> Iterator[WellOutcome]:
+    """
+    Process LAS files and yield their outcomes in input order.
+
+    With ``jobs > 1`` wells run in a process pool; each worker's log records
+    are replayed here once its well is reached, so output reads the same as
+    a serial run. A serial batch with ``prefetch > 0`` overlaps reading and
+    writing with scoring (``run_pipelined``) unless it plots interactively,
+    streams, profiles or reads a depth window.
+    """
+    pipelined = not (plot or stream or profile or depth_range)
+    if jobs <= 1 and prefetch > 0 and len(las_files) > 1 and pipelined:
+        yield from run_pipelined(
+            las_files, cfg, output_root, save_plot=save_plot, cache=cache, prefetch=prefetch, export=export,
+        )
+        return
+
+    if jobs <= 1 or len(las_files) <= 1:
+        for las_path in las_files:
+            yield process_las(
+                las_path, cfg, output_root, plot, save_plot, cache, stream, block_bytes,
+                profile, cprofile, export, depth_range,
+            )
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=init_worker,
+        initargs=(logging.getLogger().getEffectiveLevel(),),
+    ) as pool:
+        futures = [
+            pool.submit(
+                process_las_captured,
+                las_path, cfg, output_root, plot, save_plot, cache, stream, block_bytes,
+                profile, cprofile, export, depth_range,
+            )
+            for las_path in las_files
+        ]
+
+        for las_path, future in zip(las_files, futures):
+            try:
+                outcome, records = future.result()
+            except Exception as exc:
+                # the worker itself died (e.g. killed by the OOM killer)
+                logger.error(f"✘ Worker failed on {las_path.name}: {exc}")
+                yield WellOutcome(
+                    las_path=las_path,
+                    output_dir=output_root / las_path.stem,
+                    elapsed=0.0,
+                    error=f"{type(exc).__name__}: {exc}",
+                )
+                continue
+
+            for record in records:
+                logging.getLogger(record.name).handle(record)
+
+            yield outcome
+
+
+def run_pipelined(
+    las_files: Sequence[Path],
+    cfg: CLASConfig,
+    output_root: Path,
+    *,
+    save_plot: bool = False,
+    cache: Optional[LasCache] = None,
+    prefetch: int = PREFETCH,
+    max_writes: int = MAX_PENDING_WRITES,
+    export: Optional[str] = None,
+) -> Iterator[WellOutcome]:
+    """
+    Serial batch with overlapped I/O.
+
+    Reader threads parse up to ``prefetch`` LAS files ahead of the well
+    being scored, and a writer thread renders / saves outputs while the
+    next well is scored. Both queues are bounded, so at most
+    ``prefetch + max_writes + 1`` wells are held in memory and a slow disk
+    stalls scoring instead of piling up results. Outcomes are yielded in
+    input order once a well's outputs are written.
+    """
+    from core.io import read_las
+    from core.process import process_frame
+    from core.stages import StageMemo
+
+    def read(las_path: Path):
+        start = perf_counter()
+        df, well = read_las(las_path, cache=cache)
+        memo = StageMemo.for_file(cache, las_path) if cache is not None else None
+        return df, well, memo, perf_counter() - start
+
+    def write(las_path: Path, result: PipelineResult):
+        start = perf_counter()
+        result.output_dir.mkdir(parents=True, exist_ok=True)
+        outputs = [result.output_dir] + _plot_well(result, cfg, False, save_plot)
+        outputs += _export_well(result, export, las_path)
+        return outputs, perf_counter() - start
+
+    def failed(las_path: Path, elapsed: float, exc: Exception) -> WellOutcome:
+        logger.error(f"✘ Failed to process {las_path.name}: {exc}")
+        logger.debug("Traceback:", exc_info=exc)
+        return WellOutcome(
+            las_path=las_path,
+            output_dir=output_root / las_path.stem,
+            elapsed=elapsed,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+
+    def finish(entry) -> WellOutcome:
+        if isinstance(entry, WellOutcome):
+            return entry
+
+        las_path, result, busy, future = entry
+        try:
+            outputs, write_s = future.result()
+        except Exception as exc:
+            return failed(las_path, busy, exc)
+
+        return WellOutcome(
+            las_path=las_path,
+            output_dir=result.output_dir,
+            elapsed=busy + write_s,
+            well=result.well,
+            seam_count=result.seam_count,
+            outputs=tuple(outputs),
+            seams=result.seams,
+            depth_min=result.depth_min,
+            depth_max=result.depth_max,
+        )
+
+    paths = iter(las_files)
+    reads: deque = deque()
+    # per well in input order: (path, result, busy time, write future), or the outcome of a failure
+    writes: deque = deque()
+
+    with ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="clas-read") as readers, \
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="clas-write") as writer:
+
+        def fill() -> None:
+            for las_path in paths:
+                reads.append((las_path, readers.submit(read, las_path)))
+                if len(reads) >= prefetch:
+                    return
+
+        fill()
+        while reads:
+            las_path, future = reads.popleft()
+            fill()
+
+            logger.info(f"Processing LAS: {las_path.name}")
+            start = perf_counter()
+            read_s = 0.0
+            try:
+                df, well, memo, read_s = future.result()
+                start = perf_counter()
+                result = PipelineResult(
+                    output_dir=output_root / las_path.stem, **compact_result(process_frame(df, well, cfg, memo=memo))
+                )
+            except Exception as exc:
+                writes.append(failed(las_path, read_s + perf_counter() - start, exc))
+            else:
+                busy = read_s + perf_counter() - start
+                writes.append((las_path, result, busy, writer.submit(write, las_path, result)))
+
+            while len(writes) > max_writes:
+                yield finish(writes.popleft())
+
+        while writes:
+            yield finish(writes.popleft())
+
+
+def run_field_batch(
+    las_files: Sequence[Path],
+    cfg: CLASConfig,
+    output_root: Path,
+    *,
+    step: Optional[float] = None,
+    plot: bool = False,
+    save_plot: bool = False,
+    cache: Optional[LasCache] = None,
+    export: Optional[str] = None,
+) -> Iterator[WellOutcome]:
+    """
+    ``run_batch`` scoring wells together on a common depth grid.
+
+    Wells are read until their samples fill one field group, scored in a
+    single vectorized pass (``core.field``) and yielded in input order.
+    ``step`` defaults to the median depth step of each group. If the group
+    pass raises, that group's wells are scored one by one instead.
+    """
+    from core.field import MAX_FIELD_ELEMENTS, process_field
+    from core.io import read_las
+    from core.preprocessing import auto_trim
+    from core.process import process_frame
+
+    def failed(las_path: Path, start: float, exc: Exception) -> WellOutcome:
+        logger.error(f"✘ Failed to process {las_path.name}: {exc}")
+        logger.debug("Traceback:", exc_info=exc)
+        return WellOutcome(
+            las_path=las_path,
+            output_dir=output_root / las_path.stem,
+            elapsed=perf_counter() - start,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+
+    def finish(las_path: Path, res: dict, elapsed: float) -> WellOutcome:
+        start = perf_counter() - elapsed
+        well_out = output_root / las_path.stem
+        try:
+            well_out.mkdir(parents=True, exist_ok=True)
+            result = PipelineResult(output_dir=well_out, **compact_result(res))
+            outputs = [well_out] + _plot_well(result, cfg, plot, save_plot)
+            outputs += _export_well(result, export, las_path)
+        except Exception as exc:
+            return failed(las_path, start, exc)
+
+        return WellOutcome(
+            las_path=las_path,
+            output_dir=well_out,
+            elapsed=perf_counter() - start,
+            well=result.well,
+            seam_count=result.seam_count,
+            outputs=tuple(outputs),
+            seams=result.seams,
+            depth_min=result.depth_min,
+            depth_max=result.depth_max,
+        )
+
+    def score(read: List) -> List:
+        # one well can make the group pass raise; then score the group's wells
+        # on their own depths so only that well fails
+        try:
+            return process_field([g[1] for g in read], [g[2] for g in read], cfg, step)
+        except Exception as exc:
+            logger.warning(f"Field scoring failed ({type(exc).__name__}: {exc}); scoring {len(read)} well(s) one by one")
+            logger.debug("Traceback:", exc_info=True)
+
+        results = []
+        for _, df, well, _ in read:
+            try:
+                results.append(process_frame(df, well, cfg))
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def flush(group: List) -> Iterator[WellOutcome]:
+        read = [g for g in group if not isinstance(g, WellOutcome)]
+        results = iter(())
+        if read:
+            start = perf_counter()
+            results = iter(score(read))
+            share = (perf_counter() - start) / len(read)
+
+        for entry in group:
+            if isinstance(entry, WellOutcome):
+                yield entry
+                continue
+            las_path, _, _, read_s = entry
+            res = next(results)
+            if isinstance(res, Exception):
+                yield failed(las_path, perf_counter() - read_s - share, res)
+            else:
+                yield finish(las_path, res, read_s + share)
+
+    # per well: (path, trimmed frame, well name, read time), or the outcome of a failed read
+    group: List = []
+    samples = 0
+
+    for las_path in las_files:
+        start = perf_counter()
+        logger.info(f"Processing LAS: {las_path.name}")
+        try:
+            df, well = read_las(las_path, cache=cache)
+            df = auto_trim(df)
+            if df.empty:
+                raise ValueError("No samples with a depth value")
+        except Exception as exc:
+            group.append(failed(las_path, start, exc))
+            continue
+
+        group.append((las_path, df, well, perf_counter() - start))
+        samples += len(df)
+
+        if samples >= MAX_FIELD_ELEMENTS:
+            yield from flush(group)
+            group, samples = [], 0
+
+    yield from flush(group)
@@ -0,0 +1,132 @@
+"""
+On-disk cache of parsed LAS curves.
+
+Each entry is the ``read_las`` output stored as a column-major ``.npy``
+array (memory-mapped on load) plus a small JSON sidecar holding the well
+name and column names. Entries are keyed on file size + mtime, or on a
+content hash, and evicted least-recently-used once the cache grows past
+its size cap. The directory is only scanned for eviction when this
+process's running estimate of its size passes the cap, or every
+``RESCAN_EVERY`` writes to catch up with other processes sharing it.
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from core.fsutil import atomic_path
+
+logger = logging.getLogger(__name__)
+
+# bump when read_las output changes so stale entries are never reused
+CACHE_VERSION = 1
+
+CacheKey = Literal["stat", "content"]
+
+# writes between full directory scans when the size estimate stays under the cap
+RESCAN_EVERY = 64
+
+
+def bytes_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class LasCache:
+    root: Path
+    max_bytes: int = 2 * 1024**3
+    key: CacheKey = "stat"
+    # running size estimate ("bytes") and writes since the last scan ("puts")
+    _usage: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def key_for(self, path: Path) -> str:
+        if self.key == "content":
+            return self.key_for_digest(file_digest(path))
+
+        st = path.stat()
+        return self._key(f"{path.resolve()}|{st.st_size}|{st.st_mtime_ns}")
+
+    def key_for_digest(self, digest: str) -> str:
+        """Key of a file known only by its content digest (e.g. an in-memory upload)."""
+        return self._key(digest)
+
+    @staticmethod
+    def _key(ident: str) -> str:
+        return hashlib.sha256(f"v{CACHE_VERSION}|{ident}".encode()).hexdigest()[:32]
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.root / f"{key}.npy", self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, str]]:
+        data_path, meta_path = self._paths(key)
+
+        try:
+            meta = json.loads(meta_path.read_text())
+            data = np.load(data_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        # access time drives LRU eviction; read-only caches and concurrent evictions still serve the hit
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        logger.debug(f"Cache hit for {meta['source']}")
+
+        df = pd.DataFrame(data, columns=meta["columns"], copy=False)
+        return df, meta["well"]
+
+    def put(self, key: str, df: pd.DataFrame, well: str, source: str = "") -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        data_path, meta_path = self._paths(key)
+
+        # the sidecar lands last, so readers never see an entry without its data
+        with atomic_path(meta_path) as meta_tmp:
+            with atomic_path(data_path) as data_tmp, open(data_tmp, "wb") as f:
+                np.save(f, np.asfortranarray(df.to_numpy(dtype=np.float64)))
+            meta_tmp.write_text(
+                json.dumps({"well": well, "columns": list(df.columns), "source": source})
+            )
+
+        usage = self._usage
+        if "bytes" in usage:
+            usage["bytes"] += data_path.stat().st_size + meta_path.stat().st_size
+            usage["puts"] += 1
+        if "bytes" not in usage or usage["bytes"] > self.max_bytes or usage["puts"] >= RESCAN_EVERY:
+            self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        total = 0
+        for meta_path in self.root.glob("*.json"):
+            data_path = meta_path.with_suffix(".npy")
+            try:
+                size = data_path.stat().st_size + meta_path.stat().st_size
+                entries.append((meta_path.stat().st_mtime, size, meta_path, data_path))
+            except OSError:
+                continue
+            total += size
+
+        for _, size, meta_path, data_path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            for p in (meta_path, data_path):
+                p.unlink(missing_ok=True)
+            total -= size
+            logger.debug(f"Evicted cache entry {meta_path.stem}")
+
+        self._usage.update(bytes=total, puts=0)
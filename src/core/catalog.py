@@ -0,0 +1,324 @@
+"""
+Cross-well seam catalog.
+
+Seams from every processed well are stored in a local SQLite database
+together with the well's ~W header items and the config fingerprint they
+were produced with. An R*-tree over (depth, thickness, coal confidence)
+lets interval queries touch only matching seams, so questions like
+
+    clas query --catalog seams.db --depth 300 450 --min-thickness 2 --min-conf 0.8
+
+answer in milliseconds across tens of thousands of wells. SQLite builds
+without the R*-tree module fall back to plain B-tree indexes.
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Mapping, Optional, Sequence, Tuple
+import argparse
+import json
+import logging
+import sqlite3
+
+import pandas as pd
+
+from core import __version__
+
+logger = logging.getLogger("clas")
+
+# ~W mnemonics promoted to columns; the full section is kept as JSON
+WELL_FIELDS = ("WELL", "UWI", "FLD", "COMP", "LOC")
+
+SEAM_COLUMNS = ("TOP", "BOTTOM", "THICKNESS", "MEAN_CLAS", "MIN_CLAS", "COAL_CONF")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wells (
+    well_id     INTEGER PRIMARY KEY,
+    las_path    TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    well        TEXT,
+    uwi         TEXT,
+    field       TEXT,
+    company     TEXT,
+    location    TEXT,
+    depth_min   REAL,
+    depth_max   REAL,
+    seam_count  INTEGER NOT NULL,
+    header      TEXT,
+    version     TEXT,
+    ingested_at TEXT,
+    UNIQUE (las_path, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS wells_name ON wells (well);
+
+CREATE TABLE IF NOT EXISTS seams (
+    seam_id   INTEGER PRIMARY KEY,
+    well_id   INTEGER NOT NULL REFERENCES wells (well_id),
+    top       REAL NOT NULL,
+    bottom    REAL NOT NULL,
+    thickness REAL NOT NULL,
+    mean_clas REAL,
+    min_clas  REAL,
+    coal_conf REAL
+);
+CREATE INDEX IF NOT EXISTS seams_well ON seams (well_id);
+"""
+
+# thickness and confidence are stored as degenerate ranges so a single
+# R*-tree lookup prunes on all three; the tree holds float32 boxes rounded
+# outwards, so results are re-checked against the exact seams columns
+RTREE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS seam_rtree USING rtree (
+    seam_id, top, bottom, thick_lo, thick_hi, conf_lo, conf_hi
+);
+"""
+
+FALLBACK_INDEXES = """
+CREATE INDEX IF NOT EXISTS seams_top ON seams (top);
+CREATE INDEX IF NOT EXISTS seams_bottom ON seams (bottom);
+"""
+
+
+def _path_key(las_path: Path) -> str:
+    # one row per file however it was named (--las vs --las-dir, working directory)
+    return str(Path(las_path).resolve())
+
+
+class SeamCatalog:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+        try:
+            self.conn.executescript(RTREE)
+            self.rtree = True
+        except sqlite3.OperationalError:
+            logger.debug("SQLite has no R*-tree module; using B-tree indexes")
+            self.conn.executescript(FALLBACK_INDEXES)
+            self.rtree = False
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "SeamCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -------------------------
+    # INGEST
+    # -------------------------
+    def contains(self, las_path: Path, fingerprint: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM wells WHERE las_path = ? AND fingerprint = ?",
+            (_path_key(las_path), fingerprint),
+        ).fetchone()
+        return row is not None
+
+    def add_well(
+        self,
+        las_path: Path,
+        fingerprint: str,
+        seams: pd.DataFrame,
+        header: Mapping[str, str],
+        depth_range: Tuple[float, float] = (None, None),
+    ) -> int:
+        """
+        Insert one well's seams, replacing any earlier entry for the same
+        file and config fingerprint. Returns the well id.
+        """
+        rows = [] if seams is None or seams.empty else (
+            seams[list(SEAM_COLUMNS)].to_numpy(dtype=float).tolist()
+        )
+        meta = [header.get(mnem) or None for mnem in WELL_FIELDS]
+
+        with self.conn:
+            self._delete(las_path, fingerprint)
+
+            cur = self.conn.execute(
+                "INSERT INTO wells (las_path, fingerprint, well, uwi, field, company, location,"
+                " depth_min, depth_max, seam_count, header, version, ingested_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    _path_key(las_path), fingerprint, *meta,
+                    *(None if d is None else float(d) for d in depth_range),
+                    len(rows), json.dumps(dict(header)), __version__,
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                ),
+            )
+            well_id = cur.lastrowid
+
+            first = self.conn.execute("SELECT COALESCE(MAX(seam_id), 0) + 1 FROM seams").fetchone()[0]
+            ids = range(first, first + len(rows))
+
+            self.conn.executemany(
+                "INSERT INTO seams (seam_id, well_id, top, bottom, thickness, mean_clas, min_clas, coal_conf)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((i, well_id, *r) for i, r in zip(ids, rows)),
+            )
+            if self.rtree:
+                self.conn.executemany(
+                    "INSERT INTO seam_rtree VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((i, r[0], r[1], r[2], r[2], r[5], r[5]) for i, r in zip(ids, rows)),
+                )
+
+        return well_id
+
+    def _delete(self, las_path: Path, fingerprint: str) -> None:
+        row = self.conn.execute(
+            "SELECT well_id FROM wells WHERE las_path = ? AND fingerprint = ?",
+            (_path_key(las_path), fingerprint),
+        ).fetchone()
+        if row is None:
+            return
+
+        if self.rtree:
+            self.conn.execute(
+                "DELETE FROM seam_rtree WHERE seam_id IN (SELECT seam_id FROM seams WHERE well_id = ?)",
+                row,
+            )
+        self.conn.execute("DELETE FROM seams WHERE well_id = ?", row)
+        self.conn.execute("DELETE FROM wells WHERE well_id = ?", row)
+
+    # -------------------------
+    # QUERY
+    # -------------------------
+    def query(
+        self,
+        depth: Optional[Tuple[float, float]] = None,
+        min_thickness: Optional[float] = None,
+        min_conf: Optional[float] = None,
+        wells: Optional[Sequence[str]] = None,
+        fingerprint: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Seams matching every given filter, ordered by well and depth.
+
+        ``depth`` selects seams overlapping the (top, bottom) interval.
+        """
+        where, params = [], []
+        box, box_params = [], []
+
+        if depth is not None:
+            top, bottom = sorted(map(float, depth))
+            where.append("s.top <= ? AND s.bottom >= ?")
+            params += [bottom, top]
+            box.append("top <= ? AND bottom >= ?")
+            box_params += [bottom, top]
+        if min_thickness is not None:
+            where.append("s.thickness >= ?")
+            params.append(float(min_thickness))
+            box.append("thick_hi >= ?")
+            box_params.append(float(min_thickness))
+        if min_conf is not None:
+            where.append("s.coal_conf >= ?")
+            params.append(float(min_conf))
+            box.append("conf_hi >= ?")
+            box_params.append(float(min_conf))
+
+        if box and self.rtree:
+            where.append(f"s.seam_id IN (SELECT seam_id FROM seam_rtree WHERE {' AND '.join(box)})")
+            params += box_params
+
+        if wells:
+            where.append(f"w.well IN ({', '.join('?' * len(wells))})")
+            params += list(wells)
+        if fingerprint:
+            where.append("w.fingerprint = ?")
+            params.append(fingerprint)
+
+        sql = (
+            "SELECT w.well AS WELL, w.uwi AS UWI, w.field AS FIELD,"
+            " s.top AS TOP, s.bottom AS BOTTOM, s.thickness AS THICKNESS,"
+            " s.mean_clas AS MEAN_CLAS, s.min_clas AS MIN_CLAS, s.coal_conf AS COAL_CONF,"
+            " w.fingerprint AS FINGERPRINT, w.las_path AS LAS_PATH"
+            " FROM seams s JOIN wells w ON w.well_id = s.well_id"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY w.well, w.las_path, s.top"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def wells(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT well AS WELL, uwi AS UWI, field AS FIELD, seam_count AS SEAM_COUNT,"
+            " depth_min AS DEPTH_MIN, depth_max AS DEPTH_MAX, fingerprint AS FINGERPRINT,"
+            " las_path AS LAS_PATH, ingested_at AS INGESTED_AT"
+            " FROM wells ORDER BY well, las_path",
+            self.conn,
+        )
+
+
+# -------------------------
+# CLI
+# -------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="clas query",
+        description="Query the cross-well seam catalog written by `clas --catalog`.",
+    )
+    parser.add_argument("--catalog", type=Path, required=True, metavar="DB", help="Seam catalog database")
+    parser.add_argument(
+        "--depth", type=float, nargs=2, metavar=("TOP", "BOTTOM"),
+        help="Seams overlapping this depth interval"
+    )
+    parser.add_argument("--min-thickness", type=float, metavar="M", help="Minimum seam thickness")
+    parser.add_argument("--min-conf", type=float, metavar="C", help="Minimum COAL_CONF")
+    parser.add_argument("--well", nargs="+", metavar="NAME", help="Restrict to these wells")
+    parser.add_argument("--fingerprint", metavar="HEX", help="Restrict to one config fingerprint")
+    parser.add_argument("--config", type=Path, metavar="YAML", help="Restrict to the fingerprint of this config")
+    parser.add_argument("--limit", type=int, metavar="N", help="Return at most N seams")
+    parser.add_argument("--wells", action="store_true", help="List catalogued wells instead of seams")
+    parser.add_argument("--csv", type=Path, metavar="FILE", help="Write results to CSV instead of printing")
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    parser.add_argument("--quiet", action="store_true", help="Suppress non-error output")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    from core.cli import setup_logging
+    from core.config import CLASConfig
+
+    args = parse_args(argv)
+    setup_logging(args.verbose, args.quiet)
+
+    if not args.catalog.exists():
+        raise SystemExit(f"Catalog not found: {args.catalog}")
+
+    fingerprint = args.fingerprint
+    if args.config:
+        fingerprint = CLASConfig.from_yaml(args.config).fingerprint()
+
+    start = perf_counter()
+    with SeamCatalog(args.catalog) as catalog:
+        if args.wells:
+            table = catalog.wells()
+        else:
+            table = catalog.query(
+                depth=args.depth,
+                min_thickness=args.min_thickness,
+                min_conf=args.min_conf,
+                wells=args.well,
+                fingerprint=fingerprint,
+                limit=args.limit,
+            )
+    elapsed = perf_counter() - start
+
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+        logger.info(f"✔ {len(table)} row(s) written to {args.csv}")
+    elif not table.empty:
+        print(table.to_string(index=False))
+
+    logger.info(f"{len(table)} row(s) in {elapsed * 1000:.1f} ms")
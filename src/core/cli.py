@@ -1,8 +1,26 @@
 import argparse
 import logging
+import os
 from pathlib import Path
 
-def parse_args():
+EXPORT_FORMATS = ("parquet", "csv", "json")
+
+
+def _export_format(value: str) -> str:
+    if value == "parquet":
+        from importlib.util import find_spec
+
+        if find_spec("pyarrow") is None:
+            raise argparse.ArgumentTypeError("parquet needs pyarrow (pip install pyarrow), or use csv / json")
+    return value
+
+
+def add_export_arg(parser: argparse.ArgumentParser, help_text: str) -> None:
+    """``--export FORMAT`` as every command takes it; parquet is refused when pyarrow is missing."""
+    parser.add_argument("--export", type=_export_format, choices=EXPORT_FORMATS, metavar="FORMAT", help=help_text)
+
+
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(
         prog="clas",
         description="Deterministic coal seam screening from LAS well-log data.",
@@ -24,6 +42,68 @@ def parse_args():
 
     parser.add_argument("--output", default="outputs", metavar="DIR",help="Path to custom output directory")
     parser.add_argument("--dry-run", action="store_true",help="Developer run")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Reprocess wells the output manifest lists as up to date"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, metavar="N",
+        help="Process wells on N worker processes (0 = one per CPU)"
+    )
+
+    parser.add_argument(
+        "--prefetch", type=int, default=2, metavar="N",
+        help="Serial runs: read up to N LAS files ahead and write outputs in the background (0 = off)"
+    )
+
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Score long logs in depth chunks with bounded memory (no plots)"
+    )
+    parser.add_argument(
+        "--chunk-mb", type=float, default=8, metavar="MB",
+        help="Data-section chunk size for --stream"
+    )
+
+    parser.add_argument(
+        "--depth-range", type=float, nargs=2, metavar=("TOP", "BOTTOM"),
+        help="Only score depths TOP..BOTTOM (seeks via a .clasidx index saved next to each LAS file)"
+    )
+
+    parser.add_argument(
+        "--common-grid", type=float, nargs="?", const=0.0, metavar="STEP",
+        help="Score wells together on a shared depth grid (STEP in m; default: median well step)"
+    )
+
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Write per-stage time / CPU / memory to clas_profile.json per well and a batch summary"
+    )
+    parser.add_argument(
+        "--cprofile", action="store_true",
+        help="With --profile, also save cProfile stats per well (clas_profile.prof)"
+    )
+
+    add_export_arg(parser, "Write per-sample results and seams per well plus a field seam table (parquet, csv or json)")
+
+    parser.add_argument(
+        "--catalog", type=Path, metavar="DB",
+        help="Add detected seams to a cross-well SQLite catalog (see `clas query`)"
+    )
+
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--cache-dir", type=Path, metavar="DIR",
+        default=os.environ.get("CLAS_CACHE_DIR") or None,
+        help="Cache parsed LAS curves in DIR (default: $CLAS_CACHE_DIR)"
+    )
+    cache_group.add_argument(
+        "--no-cache", action="store_true", help="Do not read or write the LAS cache"
+    )
+    parser.add_argument(
+        "--cache-size", type=float, default=2048, metavar="MB",
+        help="Evict least recently used cache entries above this size"
+    )
 
     parser.add_argument(
         "--verbose", action="store_true", help="Verbose logging"
@@ -32,11 +112,41 @@ def parse_args():
         "--quiet", action="store_true", help="Suppress non-error output"
     )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.las_dir and args.plot:
         parser.error("--plot cannot be used with --las-dir (use --save-plot)")
 
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
+
+    if args.prefetch < 0:
+        parser.error("--prefetch must be >= 0")
+
+    if args.stream and (args.plot or args.save_plot):
+        parser.error("--stream does not keep per-sample data for plotting")
+
+    if args.cprofile:
+        args.profile = True
+
+    if args.depth_range is not None:
+        if not args.depth_range[0] < args.depth_range[1]:
+            parser.error("--depth-range TOP must be above BOTTOM")
+        if args.stream or args.common_grid is not None:
+            parser.error("--depth-range cannot be combined with --stream or --common-grid")
+        if args.catalog:
+            # window seams are cut at the window edges and would replace the well's full-log entry
+            parser.error("--depth-range cannot be combined with --catalog")
+
+    if args.common_grid is not None:
+        if args.common_grid < 0:
+            parser.error("--common-grid STEP must be positive")
+        if args.stream or args.profile or args.jobs != 1:
+            parser.error("--common-grid cannot be combined with --stream, --profile or --jobs")
+
+    if args.plot and args.jobs != 1:
+        parser.error("--plot cannot be used with --jobs (use --save-plot)")
+
     return args
 
 def setup_logging(verbose: bool, quiet: bool) -> None:
@@ -0,0 +1,609 @@
+"""
+`clas cluster`: several nodes sharing one batch through a common filesystem.
+
+Every node runs ``clas cluster run`` against the same LAS directory and
+output directory. Wells are claimed one at a time by creating
+``<output>/.clas_claims/<well>.lock`` with O_CREAT|O_EXCL, which at most
+one node can win (also on NFS v3+). A heartbeat thread keeps the lock's
+mtime fresh; a lock not touched for ``--lease`` seconds belongs to a node
+that died or hung, and the next node to find it renames it away and claims
+the well itself. A finished well leaves ``<well>.done`` holding its
+manifest entry (or the error), so no node picks it up again while the LAS
+file, config and options are unchanged (``run --retry-failed`` clears the
+failed ones). A worker that dies (OOM kill, segfault) settles nothing: the
+pool is restarted and the wells it held are released and retried one at a
+time, and a well that alone takes a worker down more than ``MAX_CRASHES``
+times is left for the other nodes.
+
+Outputs land in the usual ``<output>/<well>/`` layout. Nodes do not share
+any append-only file: each writes its own summary under ``.clas_nodes``,
+and ``clas cluster merge`` folds the done markers into
+``clas_manifest.jsonl``, the node summaries into
+``clas_cluster_summary.json`` and, with --export, the per-well seam files
+into the field seam table. Nodes keep polling until every well is
+settled, so work held by a node that disappears is still finished by the
+others. The share must be mounted at the same path on every node, and
+node clocks should agree to well within the lease.
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from pathlib import Path
+from time import monotonic, sleep, time
+from typing import Dict, List, Optional, Sequence
+import argparse
+import hashlib
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+import uuid
+
+from core.fsutil import atomic_path
+
+logger = logging.getLogger("clas")
+
+CLAIMS_DIR = ".clas_claims"
+NODES_DIR = ".clas_nodes"
+SUMMARY_NAME = "clas_cluster_summary.json"
+
+# seconds without a heartbeat after which a claim may be taken over
+LEASE_S = 120.0
+# seconds between claim attempts while other nodes hold the remaining wells
+POLL_S = 5.0
+
+
+def default_node() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _write_json(path: Path, data: dict) -> None:
+    with atomic_path(path) as tmp:
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+# -------------------------
+# CLAIMS
+# -------------------------
+class ClaimDir:
+    """Lock files with leases, one per well, in a directory every node can see."""
+
+    def __init__(self, root: Path, node: str, lease: float = LEASE_S):
+        self.root = root
+        self.node = node
+        self.lease = lease
+        self.held: Dict[str, str] = {}  # key -> token written into our lock
+        self.recovered = 0
+        self._lock = threading.Lock()
+        root.mkdir(parents=True, exist_ok=True)
+
+    def lock_path(self, key: str) -> Path:
+        return self.root / f"{key}.lock"
+
+    def done_path(self, key: str) -> Path:
+        return self.root / f"{key}.done"
+
+    def holder(self, key: str) -> Optional[dict]:
+        return _read_json(self.lock_path(key))
+
+    def done_entry(self, key: str) -> Optional[dict]:
+        return _read_json(self.done_path(key))
+
+    def try_claim(self, key: str) -> bool:
+        path = self.lock_path(key)
+        for attempt in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if attempt or not self._take_over(key):
+                    return False
+                continue
+
+            token = uuid.uuid4().hex
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({
+                    "node": self.node, "host": socket.gethostname(), "pid": os.getpid(),
+                    "claimed_at": _now(), "token": token,
+                }, f)
+            with self._lock:
+                self.held[key] = token
+            return True
+        return False
+
+    def _take_over(self, key: str) -> bool:
+        """Remove ``key``'s lock if its lease ran out; True when the lock is gone."""
+        path = self.lock_path(key)
+        try:
+            if time() - path.stat().st_mtime < self.lease:
+                return False
+        except FileNotFoundError:
+            return True
+
+        # only one node can rename the stale lock away
+        grave = path.with_name(f"{path.name}.stale-{uuid.uuid4().hex[:8]}")
+        try:
+            os.rename(path, grave)
+        except FileNotFoundError:
+            return False
+
+        if time() - grave.stat().st_mtime < self.lease:
+            # another node re-claimed between our stat and rename: give its lock back
+            try:
+                os.link(grave, path)
+            except FileExistsError:
+                pass
+            grave.unlink()
+            return False
+
+        holder = _read_json(grave) or {}
+        grave.unlink()
+        self.recovered += 1
+        logger.warning(f"Claim on {key} held by {holder.get('node', '?')} expired; taking it over")
+        return True
+
+    def owns(self, key: str) -> bool:
+        """Whether ``key``'s lock file is still the one this node wrote."""
+        token = self.held.get(key)
+        return token is not None and (self.holder(key) or {}).get("token") == token
+
+    def renew(self) -> List[str]:
+        """Refresh the lease of every held claim; returns (and drops) claims found lost."""
+        lost = []
+        with self._lock:
+            keys = list(self.held)
+        for key in keys:
+            try:
+                if not self.owns(key):
+                    raise FileNotFoundError
+                os.utime(self.lock_path(key))
+            except FileNotFoundError:
+                lost.append(key)
+                with self._lock:
+                    self.held.pop(key, None)
+        return lost
+
+    def release(self, key: str) -> None:
+        """Drop the claim; a lock another node has since taken over is left alone."""
+        with self._lock:
+            token = self.held.pop(key, None)
+        if token is None:
+            return
+
+        # move the lock aside first, so the token check and removal act on the same file
+        path = self.lock_path(key)
+        grave = path.with_name(f"{path.name}.release-{uuid.uuid4().hex[:8]}")
+        try:
+            os.rename(path, grave)
+        except FileNotFoundError:
+            return
+        if (_read_json(grave) or {}).get("token") != token:
+            try:
+                os.link(grave, path)
+            except FileExistsError:
+                pass
+            logger.error(f"Claim on {key} was taken over by another node; leaving its lock in place")
+        grave.unlink()
+
+    def settle(self, key: str, entry: dict) -> None:
+        """Record ``key`` as finished, then drop the claim."""
+        _write_json(self.done_path(key), entry)
+        self.release(key)
+
+    def clear_failed(self) -> List[str]:
+        """Remove the done markers of failed wells so they are claimed again; returns their keys."""
+        cleared = []
+        for path in sorted(self.root.glob("*.done")):
+            if "error" in (_read_json(path) or {}):
+                path.unlink(missing_ok=True)
+                cleared.append(path.stem)
+        return cleared
+
+
+# -------------------------
+# NODE
+# -------------------------
+def _node_order(las_files: Sequence[Path], node: str) -> List[Path]:
+    # each node starts at a different well, so claims rarely collide
+    if not las_files:
+        return []
+    start = int(hashlib.sha1(node.encode()).hexdigest(), 16) % len(las_files)
+    return list(las_files[start:]) + list(las_files[:start])
+
+
+class ClusterNode:
+    def __init__(
+        self,
+        las_files: Sequence[Path],
+        cfg,
+        output_root: Path,
+        *,
+        node: Optional[str] = None,
+        jobs: int = 1,
+        lease: float = LEASE_S,
+        poll: float = POLL_S,
+        save_plot: bool = False,
+        export: Optional[str] = None,
+    ):
+        from core.manifest import Manifest, run_options
+
+        self.las_files = list(las_files)
+        self.cfg = cfg
+        self.output_root = output_root
+        self.node = node or default_node()
+        self.jobs = jobs
+        self.poll = poll
+        self.save_plot = save_plot
+        self.export = export
+
+        self.options = run_options(save_plot=save_plot, export=export)
+
+        self.claims = ClaimDir(output_root / CLAIMS_DIR, self.node, lease)
+        self.manifest = Manifest.in_dir(output_root)
+        self.outcomes = []
+        self._inflight: Dict[Future, Path] = {}
+        self._crashes: Dict[Path, int] = {}
+        self._suspects: set = set()  # wells in flight when a worker died; retried one at a time
+        self._retry: List[Path] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stop = threading.Event()
+
+    # --- settled wells ---
+    def settled(self, las_path: Path) -> bool:
+        if self.manifest.is_current(las_path, self.cfg, self.options):
+            return True
+        entry = self.claims.done_entry(las_path.stem)
+        if entry is None:
+            return False
+        return (
+            self.manifest.entry_current(entry, las_path, self.cfg, self.options)
+            or self.manifest.failure_current(entry, las_path, self.cfg, self.options)
+        )
+
+    # --- processing ---
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.claims.lease / 4):
+            for key in self.claims.renew():
+                logger.error(f"Claim on {key} was taken over by another node; its outputs may be written twice")
+
+    def _start_pool(self) -> None:
+        from core.batch import warm_worker
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=warm_worker,
+            initargs=(logging.getLogger().getEffectiveLevel(), self.save_plot),
+        )
+
+    def _restart_pool(self) -> None:
+        logger.warning("A worker process died; restarting the worker pool")
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._start_pool()
+
+    def _submit(self, las_path: Path) -> None:
+        from core.batch import process_las, process_las_captured
+
+        if self._pool is None:
+            self.finish(process_las(las_path, self.cfg, self.output_root, save_plot=self.save_plot, export=self.export))
+            return
+
+        def submit() -> Future:
+            return self._pool.submit(
+                process_las_captured, las_path, self.cfg, self.output_root,
+                save_plot=self.save_plot, export=self.export,
+            )
+
+        try:
+            future = submit()
+        except BrokenProcessPool:
+            self._restart_pool()
+            future = submit()
+        self._inflight[future] = las_path
+
+    def _collect(self, timeout: Optional[float] = None) -> None:
+        from core.batch import MAX_CRASHES
+        from core.types import WellOutcome
+
+        done, _ = wait(list(self._inflight), timeout=timeout, return_when=FIRST_COMPLETED)
+        crashed = []
+        for future in done:
+            las_path = self._inflight.pop(future)
+            try:
+                outcome, records = future.result()
+            except BrokenProcessPool:
+                crashed.append(las_path)
+                continue
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                outcome, records = WellOutcome(las_path, self.output_root / las_path.stem, 0.0, error=error), []
+            self._crashes.pop(las_path, None)
+            self._suspects.discard(las_path)
+            for record in records:
+                logging.getLogger(record.name).handle(record)
+            self.finish(outcome)
+
+        if not crashed:
+            return
+        # every well in flight fails with the pool; none of them is settled, so
+        # they are retried on a fresh pool (here or by another node). Only a
+        # well that was alone in the pool is blamed for the crash.
+        self._restart_pool()
+        for las_path in crashed:
+            self.claims.release(las_path.stem)
+            self._suspects.add(las_path)
+            if len(crashed) == 1:
+                self._crashes[las_path] = self._crashes.get(las_path, 0) + 1
+            if self._crashes.get(las_path, 0) > MAX_CRASHES:
+                logger.error(f"✘ {las_path.name} took down a worker {self._crashes[las_path]} times; skipping it")
+                self.outcomes.append(WellOutcome(
+                    las_path, self.output_root / las_path.stem, 0.0,
+                    error=f"BrokenProcessPool: worker died {self._crashes[las_path]} times",
+                ))
+                continue
+            self._retry.append(las_path)
+
+    def finish(self, outcome) -> None:
+        from core.manifest import make_entry
+
+        if outcome.ok:
+            logger.info(
+                f"✔ {outcome.las_path.name}: {outcome.well}, {outcome.seam_count} seam(s) "
+                f"in {outcome.elapsed:.2f}s -> {outcome.output_dir}"
+            )
+        entry = make_entry(outcome, self.cfg, self.options)
+        entry["node"] = self.node
+        entry["elapsed_s"] = outcome.elapsed
+
+        self.claims.settle(outcome.las_path.stem, entry)
+        self.outcomes.append(outcome)
+
+    def run(self) -> List:
+        """Claim and process wells until every well is settled; returns this node's outcomes."""
+        self.started = time()
+        if self.jobs > 1:
+            self._start_pool()
+        heartbeat = threading.Thread(target=self._heartbeat, name="clas-heartbeat", daemon=True)
+        heartbeat.start()
+
+        remaining = _node_order(self.las_files, self.node)
+        reported_wait = False
+        try:
+            while remaining or self._inflight:
+                held_elsewhere = []
+                for las_path in remaining:
+                    if self.settled(las_path):
+                        continue
+                    limit = 1 if las_path in self._suspects else self.jobs
+                    while len(self._inflight) >= limit or self._suspects.intersection(self._inflight.values()):
+                        self._collect()
+                    if not self.claims.try_claim(las_path.stem):
+                        held_elsewhere.append(las_path)
+                        continue
+                    # it may have been finished between the check and the claim
+                    if self.settled(las_path):
+                        self.claims.release(las_path.stem)
+                        continue
+                    self._submit(las_path)
+
+                remaining = held_elsewhere
+                if self._inflight:
+                    self._collect(timeout=self.poll if remaining else None)
+                elif remaining:
+                    if not reported_wait:
+                        logger.info(f"Waiting for {len(remaining)} well(s) claimed by other nodes")
+                        reported_wait = True
+                    sleep(self.poll)
+                remaining += self._retry
+                self._retry = []
+        finally:
+            self._stop.set()
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+            for key in list(self.claims.held):
+                self.claims.release(key)
+            self.write_summary()
+
+        return self.outcomes
+
+    def write_summary(self) -> Path:
+        nodes = self.output_root / NODES_DIR
+        nodes.mkdir(parents=True, exist_ok=True)
+        ok = [o for o in self.outcomes if o.ok]
+        path = nodes / f"{self.node}.json"
+        _write_json(path, {
+            "node": self.node,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "jobs": self.jobs,
+            "started": self.started,
+            "finished": time(),
+            "wells": len(ok),
+            "failed": len(self.outcomes) - len(ok),
+            "seams": sum(o.seam_count for o in ok),
+            "busy_s": sum(o.elapsed for o in self.outcomes),
+            "recovered_claims": self.claims.recovered,
+        })
+        return path
+
+
+# -------------------------
+# MERGE
+# -------------------------
+def merge(output_root: Path, export: Optional[str] = None) -> dict:
+    """Fold done markers into the manifest and node summaries into one cluster summary."""
+    from core.manifest import Manifest
+
+    manifest = Manifest.in_dir(output_root)
+    entries = [_read_json(p) for p in sorted((output_root / CLAIMS_DIR).glob("*.done"))]
+    entries = [e for e in entries if e is not None]
+    done = [e for e in entries if "error" not in e]
+    failed = [e for e in entries if "error" in e]
+
+    for entry in done:
+        manifest.entries[entry["las_path"]] = entry
+    manifest.compact()
+
+    nodes = [_read_json(p) for p in sorted((output_root / NODES_DIR).glob("*.json"))]
+    nodes = [n for n in nodes if n is not None]
+    wall = max((n["finished"] for n in nodes), default=0.0) - min((n["started"] for n in nodes), default=0.0)
+    wells = sum(n["wells"] for n in nodes)
+
+    summary = {
+        "merged_at": _now(),
+        "nodes": nodes,
+        "wells": len(done),
+        "failed": [{"las_path": e["las_path"], "node": e.get("node"), "error": e["error"]} for e in failed],
+        "wall_s": wall,
+        "busy_s": sum(n["busy_s"] for n in nodes),
+        "wells_per_s": wells / wall if wall > 0 else None,
+    }
+    _write_json(output_root / SUMMARY_NAME, summary)
+
+    if export:
+        from core.export import FIELD_SEAMS_NAME, SEAMS_NAME, FieldSeamTable, export_path, read_table
+
+        with FieldSeamTable(export_path(output_root, FIELD_SEAMS_NAME, export), export) as table:
+            for entry in sorted(done, key=lambda e: e["las_path"]):
+                seams = export_path(output_root / Path(entry["las_path"]).stem, SEAMS_NAME, export)
+                if seams.exists():
+                    table.append_frame(read_table(seams))
+        summary["field_seams"] = str(table.path)
+
+    return summary
+
+
+# -------------------------
+# CLI
+# -------------------------
+def parse_args(argv=None):
+    from core.cli import add_export_arg
+
+    parser = argparse.ArgumentParser(
+        prog="clas cluster",
+        description="Share one batch between several nodes through a common filesystem.",
+    )
+    sub = parser.add_subparsers(dest="action", required=True)
+
+    run = sub.add_parser("run", help="Claim and process wells until the batch is done")
+    run.add_argument("las_dir", type=Path, metavar="DIR", help="Shared LAS directory")
+    run.add_argument("--output", default="outputs", metavar="DIR", help="Shared output directory")
+    run.add_argument("--config", type=Path, metavar="YAML", help="Path to CLAS configuration YAML file")
+    run.add_argument("--node", metavar="NAME", help="Node name (default: host-pid)")
+    run.add_argument("--jobs", type=int, default=1, metavar="N", help="Worker processes on this node (0 = one per CPU)")
+    run.add_argument(
+        "--lease", type=float, default=LEASE_S, metavar="S",
+        help="Take over claims whose node has not renewed them for S seconds"
+    )
+    run.add_argument(
+        "--poll", type=float, default=POLL_S, metavar="S",
+        help="Retry interval while other nodes hold the remaining wells"
+    )
+    run.add_argument("--save-plot", action="store_true", help="Save the QC plot (png) for every well")
+    add_export_arg(run, "Write per-sample results and seams per well (parquet, csv or json)")
+    run.add_argument(
+        "--retry-failed", action="store_true",
+        help="Clear the failure markers of wells that failed in earlier runs, so they are processed again"
+    )
+
+    merge_p = sub.add_parser("merge", help="Combine node results into the manifest and a cluster summary")
+    merge_p.add_argument("--output", default="outputs", metavar="DIR", help="Shared output directory")
+    add_export_arg(merge_p, "Also build the field seam table from the per-well seam files")
+
+    for p in (run, merge_p):
+        p.add_argument("--verbose", action="store_true", help="Verbose logging")
+        p.add_argument("--quiet", action="store_true", help="Suppress non-error output")
+
+    args = parser.parse_args(argv)
+
+    if args.action == "run":
+        if not args.las_dir.is_dir():
+            parser.error(f"not a directory: {args.las_dir}")
+        if args.jobs < 0:
+            parser.error("--jobs must be >= 0")
+        if args.lease <= 0 or args.poll <= 0:
+            parser.error("--lease and --poll must be positive")
+
+    return args
+
+
+def _interrupt(*_):
+    raise KeyboardInterrupt
+
+
+def main(argv=None) -> None:
+    from core.cli import setup_logging
+
+    args = parse_args(argv)
+    setup_logging(args.verbose, args.quiet)
+    output_root = Path(args.output).resolve()
+
+    if args.action == "merge":
+        summary = merge(output_root, args.export)
+        for n in summary["nodes"]:
+            logger.info(
+                f"{n['node']}: {n['wells']} well(s), {n['failed']} failed, "
+                f"{n['busy_s']:.1f}s busy, {n['recovered_claims']} claim(s) taken over"
+            )
+        rate = f", {summary['wells_per_s']:.2f} wells/s" if summary["wells_per_s"] else ""
+        logger.info(
+            f"Merged {summary['wells']} well(s) from {len(summary['nodes'])} node(s) "
+            f"in {summary['wall_s']:.1f}s{rate} -> {output_root / SUMMARY_NAME}"
+        )
+        for f in summary["failed"]:
+            logger.error(f"✘ {Path(f['las_path']).name} ({f['node']}): {f['error']}")
+        if summary["failed"]:
+            raise SystemExit(1)
+        return
+
+    from core.config import CLASConfig
+
+    cfg = CLASConfig.from_yaml(args.config) if args.config else CLASConfig()
+    las_files = sorted(args.las_dir.resolve().glob("*.las"))
+    if not las_files:
+        raise SystemExit("No LAS files found")
+    output_root.mkdir(parents=True, exist_ok=True)
+
+    node = ClusterNode(
+        las_files,
+        cfg,
+        output_root,
+        node=args.node,
+        jobs=args.jobs or os.cpu_count() or 1,
+        lease=args.lease,
+        poll=args.poll,
+        save_plot=args.save_plot,
+        export=args.export,
+    )
+    if args.retry_failed:
+        cleared = node.claims.clear_failed()
+        logger.info(f"Retrying {len(cleared)} failed well(s)")
+    signal.signal(signal.SIGTERM, _interrupt)
+    logger.info(f"Node {node.node} joining batch of {len(las_files)} well(s) in {args.las_dir}")
+
+    start = monotonic()
+    try:
+        outcomes = node.run()
+    except KeyboardInterrupt:
+        logger.warning(f"Node {node.node} stopped; its unfinished claims were released")
+        raise SystemExit(130)
+
+    failed = [o for o in outcomes if not o.ok]
+    logger.info(
+        f"Node {node.node} done: {len(outcomes) - len(failed)} well(s) processed here "
+        f"in {monotonic() - start:.2f}s; all wells settled (run `clas cluster merge`)"
+    )
+    if failed:
+        raise SystemExit(1)
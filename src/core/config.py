@@ -1,6 +1,7 @@
-from dataclasses import dataclass, replace
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
-import yaml
+import hashlib
+import json
 from typing import Any, Dict
 
 @dataclass(frozen=True)
@@ -17,13 +18,25 @@ class CLASConfig:
     neighbor_window: int = 5
     max_no_data_run: float = 1.0
 
+    def fingerprint(self) -> str:
+        """Stable hash of every field, used to detect config changes between runs."""
+        payload = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
     @classmethod
     def from_yaml(cls, path: Path) -> "CLASConfig":
-        base = cls()
+        import yaml
 
         with path.open("r") as f:
             raw: Dict[str, Any] = yaml.safe_load(f) or {}
 
+        return cls.from_dict(raw)
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any], base: "CLASConfig" = None) -> "CLASConfig":
+        """Config from the YAML layout (``weights`` / ``thresholds``); unset values come from ``base``."""
+        base = base or cls()
+
         weights = raw.get("weights", {})
         thresholds = raw.get("thresholds", {})
 
@@ -0,0 +1,311 @@
+"""
+Depth-window processing backed by a LAS byte-offset index.
+
+``build_index`` reads a plain LAS 2.0 file once and records the byte
+offset and first depth of every ``INDEX_BLOCK_BYTES`` of the ~A section,
+together with the whole-well normalization statistics and depth step. The
+index is saved next to the file (``<name>.las.clasidx``) and reused while
+the file's size and mtime are unchanged.
+
+``process_window`` then seeks straight to the blocks covering
+[top, bottom] plus enough rows either side for the rolling windows, and
+scores them against the stored statistics, so CLAS and IS_COAL in the
+window are the values a whole-well run gives and the cost follows the
+window rather than the well. Seams crossing the window edges are cut at
+the first / last window row.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from core.config import CLASConfig
+from core.fsutil import atomic_path
+from core.io import resolve_curves
+from core.lasreader import UnsupportedLAS, iter_blocks, parse_block, read_header
+from core.preprocessing import depth_step
+from core.profiling import NULL_PROFILER
+from core.scoring import (
+    NormStats,
+    combine_scores,
+    compute_subscores,
+    curve_array,
+    density_curve,
+    flag_coal,
+    rolling_std,
+    score_halo,
+)
+from core.seams import seam_bounds, seam_table
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".clasidx"
+INDEX_VERSION = 1
+
+# granularity of the index; a window read overshoots by at most one block per side
+INDEX_BLOCK_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class DepthIndex:
+    size: int
+    mtime_ns: int
+    well: str
+    null: float
+    n_curves: int
+    names: List[str]  # pipeline curves present, in file order
+    usecols: List[int]
+    offsets: np.ndarray  # byte offset of each indexed block; last entry = end of data
+    tops: np.ndarray  # first depth in each block
+    step: float
+    stats: NormStats
+
+    def fresh(self, las_path: Path) -> bool:
+        st = las_path.stat()
+        return st.st_size == self.size and st.st_mtime_ns == self.mtime_ns
+
+    def to_json(self) -> dict:
+        return {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "well": self.well,
+            "null": self.null,
+            "n_curves": self.n_curves,
+            "names": self.names,
+            "usecols": self.usecols,
+            "offsets": self.offsets.tolist(),
+            "tops": self.tops.tolist(),
+            "step": self.step,
+            "stats": {
+                "gr": [float(v[0]) for v in self.stats.gr],
+                "dens": [float(v[0]) for v in self.stats.dens],
+                "cal": [float(v[0]) for v in self.stats.cal],
+                "stab_ref": float(self.stats.stab_ref[0]),
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "DepthIndex":
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"index version {data.get('version')}")
+        s = data["stats"]
+        stats = NormStats(
+            gr=tuple(np.array([v]) for v in s["gr"]),
+            dens=tuple(np.array([v]) for v in s["dens"]),
+            cal=tuple(np.array([v]) for v in s["cal"]),
+            stab_ref=np.array([s["stab_ref"]]),
+        )
+        return cls(
+            size=data["size"],
+            mtime_ns=data["mtime_ns"],
+            well=data["well"],
+            null=data["null"],
+            n_curves=data["n_curves"],
+            names=data["names"],
+            usecols=data["usecols"],
+            offsets=np.asarray(data["offsets"], dtype=np.int64),
+            tops=np.asarray(data["tops"], dtype=np.float64),
+            step=data["step"],
+            stats=stats,
+        )
+
+
+def index_path(las_path: Path) -> Path:
+    return las_path.with_name(las_path.name + INDEX_SUFFIX)
+
+
+# -------------------------
+# BUILD / LOAD
+# -------------------------
+def _columns(header) -> Tuple[List[str], List[int]]:
+    curves = resolve_curves(header.curves)
+    if "DEPT" not in curves:
+        raise ValueError("Depth column not found in LAS file")
+    if len(set(header.curves)) != len(header.curves):
+        raise UnsupportedLAS("Duplicate curve mnemonics")
+
+    names = sorted(curves, key=lambda std: header.curves.index(curves[std]))
+    return names, [header.curves.index(curves[std]) for std in names]
+
+
+def _frame(data: np.ndarray, names: List[str], null: float) -> pd.DataFrame:
+    data[data == null] = np.nan
+    df = pd.DataFrame(data, columns=names)
+    return df[df["DEPT"].notna()].reset_index(drop=True)
+
+
+def build_index(las_path: Path, block_bytes: int = INDEX_BLOCK_BYTES) -> DepthIndex:
+    """Scan ``las_path`` once; raises UnsupportedLAS for files the native reader cannot seek in."""
+    st = las_path.stat()
+    with open(las_path, "rb") as f:
+        header = read_header(f)
+        names, usecols = _columns(header)
+
+        offsets, tops, parts = [], [], []
+        pos = header.data_offset
+        for block in iter_blocks(f, block_bytes):
+            data = parse_block(block, len(header.curves), usecols)
+            depth = data[:, 0]
+            valid = depth[~np.isnan(depth) & (depth != header.null)]
+            if len(valid):
+                offsets.append(pos)
+                tops.append(valid[0])
+            parts.append(data)
+            pos += len(block)
+        offsets.append(pos)
+
+    df = _frame(np.concatenate(parts) if parts else np.empty((0, len(names))), names, header.null)
+    depth = df["DEPT"].to_numpy()
+    if np.any(depth[1:] < depth[:-1]):
+        raise UnsupportedLAS("Depth is not increasing; depth windows need sorted logs")
+
+    gr, ld, sd, cl = (curve_array(df, c) for c in ("GR", "LD", "SD", "CL"))
+    stats = NormStats.from_curves(gr, density_curve(ld, sd), cl, rolling_std(gr, 5, min_periods=2))
+
+    return DepthIndex(
+        size=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        well=header.well["WELL"] if "WELL" in header.well else las_path.stem,
+        null=header.null,
+        n_curves=len(header.curves),
+        names=names,
+        usecols=usecols,
+        offsets=np.asarray(offsets, dtype=np.int64),
+        tops=np.asarray(tops, dtype=np.float64),
+        step=depth_step(depth),
+        stats=stats,
+    )
+
+
+def load_index(las_path: Path) -> DepthIndex:
+    """The saved index for ``las_path`` if still fresh, else a new one (saved when possible)."""
+    path = index_path(las_path)
+    try:
+        index = DepthIndex.from_json(json.loads(path.read_text(encoding="utf-8")))
+        if index.fresh(las_path):
+            return index
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logger.debug(f"Ignoring index {path.name}: {exc}")
+
+    logger.info(f"Indexing {las_path.name}")
+    index = build_index(las_path)
+
+    try:
+        with atomic_path(path) as tmp:
+            tmp.write_text(json.dumps(index.to_json()), encoding="utf-8")
+    except OSError as exc:
+        logger.debug(f"Could not save index next to {las_path.name}: {exc}")
+
+    return index
+
+
+# -------------------------
+# WINDOW
+# -------------------------
+def read_window(las_path: Path, index: DepthIndex, top: float, bottom: float, halo: int):
+    """
+    Rows around [top, bottom] as a depth-trimmed frame, plus the (lo, hi)
+    row range inside the window. The frame extends ``halo`` rows beyond
+    it on each side unless the log ends there.
+    """
+    n_blocks = len(index.tops)
+    a = max(int(np.searchsorted(index.tops, top, side="right")) - 1, 0)
+    b = min(int(np.searchsorted(index.tops, bottom, side="right")), n_blocks)
+    b = max(b, a + 1)
+
+    with open(las_path, "rb") as f:
+        while True:
+            f.seek(index.offsets[a])
+            raw = f.read(int(index.offsets[b] - index.offsets[a]))
+            df = _frame(parse_block(raw, index.n_curves, index.usecols), index.names, index.null)
+
+            depth = df["DEPT"].to_numpy()
+            lo = int(np.searchsorted(depth, top, side="left"))
+            hi = int(np.searchsorted(depth, bottom, side="right"))
+
+            need_above = lo < halo and a > 0
+            need_below = len(depth) - hi < halo and b < n_blocks
+            if not (need_above or need_below):
+                return df, lo, hi
+            a -= need_above
+            b += need_below
+
+
+def window_seams(df: pd.DataFrame, step: float, cfg: CLASConfig) -> pd.DataFrame:
+    """Seams of scored window rows; a zone still open at the last row is closed there."""
+    depth = df["DEPT"].to_numpy(dtype=np.float64)
+    clas = df["CLAS"].to_numpy(dtype=np.float64)
+
+    starts, ends, open_start = seam_bounds(df["IS_COAL"].to_numpy(dtype=bool), np.isnan(clas), step, cfg.max_no_data_run)
+    if open_start >= 0:
+        starts, ends = np.append(starts, open_start), np.append(ends, len(df) - 1)
+
+    return seam_table(depth, clas, starts, ends, step, cfg)
+
+
+def _result(well: str, df: pd.DataFrame, step: float, cfg: CLASConfig) -> dict:
+    seams = window_seams(df, step, cfg)
+    return {
+        "well": well,
+        "df": df,
+        "seams": seams,
+        "seam_count": len(seams),
+        "depth_min": df["DEPT"].min(),
+        "depth_max": df["DEPT"].max(),
+    }
+
+
+def process_window(
+    las_path: Path,
+    cfg: CLASConfig,
+    top: float,
+    bottom: float,
+    profiler=NULL_PROFILER,
+) -> dict:
+    """
+    ``process_well`` restricted to depths [top, bottom].
+
+    Files without a usable index (lasio-only formats, unsorted depth) are
+    scored whole and cropped to the window.
+    """
+    try:
+        with profiler.stage("load_index"):
+            index = load_index(las_path)
+    except UnsupportedLAS as exc:
+        logger.warning(f"{las_path.name}: {exc}; scoring the whole well for the window")
+        return _crop(las_path, cfg, top, bottom, profiler)
+
+    halo = score_halo(cfg)
+    with profiler.stage("read_window") as rec:
+        ext, lo, hi = read_window(las_path, index, top, bottom, halo)
+        rec["rows"] = len(ext)
+
+    with profiler.stage("compute_clas", rows=len(ext)):
+        gr, ld, sd, cl = (curve_array(ext, c) for c in ("GR", "LD", "SD", "CL"))
+        clas = combine_scores(compute_subscores(gr, ld, sd, cl, cfg, index.stats), cfg)
+        is_coal = flag_coal(clas, cfg.point_threshold)
+
+    df = ext.iloc[lo:hi].reset_index(drop=True)
+    df["CLAS"] = clas[lo:hi]
+    df["IS_COAL"] = is_coal[lo:hi]
+
+    with profiler.stage("extract_seams", rows=len(df)):
+        return _result(index.well, df, index.step, cfg)
+
+
+def _crop(las_path: Path, cfg: CLASConfig, top: float, bottom: float, profiler) -> dict:
+    from core.process import process_well
+    from core.preprocessing import infer_depth_step
+
+    res = process_well(las_path, cfg, profiler=profiler)
+    full = res["df"]
+    step = infer_depth_step(full)
+    df = full[(full["DEPT"] >= top) & (full["DEPT"] <= bottom)].reset_index(drop=True)
+    return _result(res["well"], df, step, cfg)
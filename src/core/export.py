@@ -0,0 +1,248 @@
+"""
+Structured export of per-well results.
+
+``--export FORMAT`` writes each well's per-sample curves with CLAS and
+IS_COAL (``clas_samples``) and its seams (``clas_seams``) into the well's
+output directory, and appends every well's seams to one field-wide table
+(``clas_field_seams``) in the output root as wells finish.
+
+Parquet (zstd-compressed, needs pyarrow) is the format for bulk analysis:
+``load_samples`` / ``load_seams`` read a whole field back in one call.
+CSV and JSON Lines suit small runs and need nothing beyond pandas.
+"""
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Union
+import logging
+
+import numpy as np
+import pandas as pd
+
+from core.fsutil import atomic_path, temp_path
+from core.types import PipelineResult
+
+logger = logging.getLogger(__name__)
+
+SUFFIXES = {"parquet": ".parquet", "csv": ".csv", "json": ".jsonl"}
+
+SAMPLES_NAME = "clas_samples"
+SEAMS_NAME = "clas_seams"
+FIELD_SEAMS_NAME = "clas_field_seams"
+
+SAMPLE_COLUMNS = ("DEPT", "GR", "LD", "SD", "CL", "CLAS", "IS_COAL")
+SEAM_COLUMNS = ("TOP", "BOTTOM", "THICKNESS", "MEAN_CLAS", "MIN_CLAS", "COAL_CONF")
+
+# seam rows buffered before the field table writes a Parquet row group
+ROW_GROUP_ROWS = 50_000
+
+
+def export_path(out_dir: Path, name: str, fmt: str) -> Path:
+    return out_dir / f"{name}{SUFFIXES[fmt]}"
+
+
+def write_table(df: pd.DataFrame, path: Path, fmt: str) -> Path:
+    """Write ``df`` via a temporary file, so an interrupted run leaves no torn table."""
+    with atomic_path(path) as tmp:
+        if fmt == "parquet":
+            df.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False)
+        elif fmt == "csv":
+            df.to_csv(tmp, index=False)
+        else:
+            df.to_json(tmp, orient="records", lines=True)
+    return path
+
+
+def read_table(path: Path) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, engine="pyarrow")
+    if path.suffix == ".csv":
+        return pd.read_csv(path)
+    if path.stat().st_size == 0:
+        return pd.DataFrame()
+    return pd.read_json(path, orient="records", lines=True)
+
+
+# -------------------------
+# PER WELL
+# -------------------------
+def samples_frame(df: pd.DataFrame, well: str) -> pd.DataFrame:
+    out = df[[c for c in SAMPLE_COLUMNS if c in df]].reset_index(drop=True)
+    out.insert(0, "WELL", pd.Categorical([well] * len(out)))
+    return out
+
+
+def seams_frame(seams: Optional[pd.DataFrame], well: str, las_path: Union[str, Path] = "") -> pd.DataFrame:
+    """Seams with WELL / LAS_FILE columns and a fixed schema, also when there are none."""
+    n = 0 if seams is None or seams.empty else len(seams)
+    out = pd.DataFrame({
+        "WELL": [well] * n,
+        "LAS_FILE": [str(las_path)] * n,
+    })
+    for col in SEAM_COLUMNS:
+        out[col] = seams[col].to_numpy(dtype=np.float64) if n else np.empty(0)
+    return out
+
+
+def export_well(result: PipelineResult, fmt: str, las_path: Union[str, Path] = "") -> List[Path]:
+    """Write the well's samples (when kept) and seams; returns the files written."""
+    written = []
+    df = result.df
+    if df is not None:
+        written.append(write_table(
+            samples_frame(df, result.well),
+            export_path(result.output_dir, SAMPLES_NAME, fmt),
+            fmt,
+        ))
+    written.append(write_table(
+        seams_frame(result.seams, result.well, las_path),
+        export_path(result.output_dir, SEAMS_NAME, fmt),
+        fmt,
+    ))
+    return written
+
+
+# -------------------------
+# FIELD SEAM TABLE
+# -------------------------
+class FieldSeamTable:
+    """
+    Seams of every well in one table, appended as wells finish.
+
+    CSV and JSON Lines rows are flushed per well, Parquet rows in row
+    groups of about ``row_group_rows``. Either way rows go to a temporary
+    file that replaces ``path`` on ``close()``, so readers never see a
+    Parquet file without its footer and an interrupted run (``abort()``,
+    or leaving the ``with`` block on an exception) keeps the previous table.
+    """
+
+    def __init__(self, path: Path, fmt: str, row_group_rows: int = ROW_GROUP_ROWS):
+        self.path = path
+        self.fmt = fmt
+        self.row_group_rows = row_group_rows
+        self.rows = 0
+        self._tmp = temp_path(path)
+        self._buffer: List[pd.DataFrame] = []
+        self._buffered = 0
+        self._writer = None
+
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self._schema = _seam_schema()
+            self._writer = pq.ParquetWriter(self._tmp, self._schema, compression="zstd")
+            self._file = None
+        else:
+            self._file = self._tmp.open("w", encoding="utf-8", newline="")
+            if fmt == "csv":
+                self._file.write(",".join(("WELL", "LAS_FILE") + SEAM_COLUMNS) + "\n")
+
+    def __enter__(self) -> "FieldSeamTable":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def append(self, well: str, las_path: Union[str, Path], seams: Optional[pd.DataFrame]) -> None:
+        self.append_frame(seams_frame(seams, well, las_path))
+
+    def append_frame(self, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        self.rows += len(frame)
+
+        if self._writer is not None:
+            self._buffer.append(frame)
+            self._buffered += len(frame)
+            if self._buffered >= self.row_group_rows:
+                self._flush()
+            return
+
+        if self.fmt == "csv":
+            frame.to_csv(self._file, header=False, index=False)
+        else:
+            frame.to_json(self._file, orient="records", lines=True)
+        self._file.flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        import pyarrow as pa
+
+        frame = pd.concat(self._buffer, ignore_index=True)
+        self._writer.write_table(pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False))
+        self._buffer, self._buffered = [], 0
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+            self._tmp.replace(self.path)
+        elif self._file is not None:
+            self._file.close()
+            self._file = None
+            self._tmp.replace(self.path)
+
+    def abort(self) -> None:
+        """Stop without touching ``path``; the rows written so far are discarded."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        elif self._file is not None:
+            self._file.close()
+            self._file = None
+        self._tmp.unlink(missing_ok=True)
+
+
+def _seam_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [("WELL", pa.string()), ("LAS_FILE", pa.string())]
+        + [(col, pa.float64()) for col in SEAM_COLUMNS]
+    )
+
+
+# -------------------------
+# LOADING
+# -------------------------
+def _well_files(root: Path, name: str, fmt: str) -> List[Path]:
+    return sorted(root.glob(f"*/{name}{SUFFIXES[fmt]}"))
+
+
+def load_samples(
+    root: Path,
+    fmt: str = "parquet",
+    columns: Optional[Sequence[str]] = None,
+    wells: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """Per-sample results of every exported well under ``root`` in one frame."""
+    files = _well_files(Path(root), SAMPLES_NAME, fmt)
+    if not files:
+        return pd.DataFrame()
+
+    if fmt == "parquet":
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(files, format="parquet")
+        filt = ds.field("WELL").isin(list(wells)) if wells is not None else None
+        return dataset.to_table(columns=list(columns) if columns else None, filter=filt).to_pandas()
+
+    frames = [read_table(p) for p in files]
+    df = pd.concat(frames, ignore_index=True)
+    if wells is not None:
+        df = df[df["WELL"].isin(list(wells))]
+    return df[list(columns)] if columns else df
+
+
+def load_seams(root: Path, fmt: str = "parquet") -> pd.DataFrame:
+    """The field seam table under ``root``; falls back to the per-well seam files."""
+    root = Path(root)
+    path = export_path(root, FIELD_SEAMS_NAME, fmt)
+    if path.exists():
+        return read_table(path)
+
+    frames = [read_table(p) for p in _well_files(root, SEAMS_NAME, fmt)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,189 @@
+"""
+Cross-well scoring on a common depth grid.
+
+Wells are resampled onto one regular depth grid and stacked into
+(wells x depth) arrays, so normalization, sub-scores, CLAS and IS_COAL
+voting run as a single vectorized pass for the whole group instead of
+once per well. Results are split back into per-well frames for seam
+extraction.
+
+Wells sampled on the grid itself (every grid node in their depth range
+holds a sample) are placed on it exactly and score the same as on their
+own; other wells, including coarser ones, are linearly interpolated
+between neighbouring samples. Rows of the grid outside a well's depth
+range are NaN, which every scoring kernel ignores.
+"""
+from typing import List, Optional, Sequence
+import logging
+
+import numpy as np
+import pandas as pd
+
+from core.config import CLASConfig
+from core.preprocessing import depth_step, infer_depth_step
+from core.scoring import combine_scores, compute_subscores, curve_array, flag_coal
+from core.seams import seam_bounds, seam_table
+
+logger = logging.getLogger(__name__)
+
+CURVES = ("GR", "LD", "SD", "CL")
+
+# samples of one grid group (wells x depth); bounds the 2-D temporaries
+MAX_FIELD_ELEMENTS = 4_000_000
+
+# a sample this close to a grid node (in steps) is taken as lying on it
+ON_GRID_TOL = 1e-3
+
+
+def grid_step(frames: Sequence[pd.DataFrame]) -> float:
+    """Median of the wells' own depth steps."""
+    return float(np.median([infer_depth_step(df) for df in frames]))
+
+
+def common_grid(frames: Sequence[pd.DataFrame], step: float) -> np.ndarray:
+    top = min(float(df["DEPT"].iloc[0]) for df in frames)
+    bottom = max(float(df["DEPT"].iloc[-1]) for df in frames)
+    return top + np.arange(int(np.floor((bottom - top) / step + ON_GRID_TOL)) + 1) * step
+
+
+def resample(df: pd.DataFrame, grid: np.ndarray, step: float):
+    """
+    One well's curves on ``grid``.
+
+    Returns the (lo, hi) slice of the grid covering the well, its DEPT
+    values (the well's own depths where samples sit on the grid) and a
+    (curves x rows) array.
+    """
+    depth = df["DEPT"].to_numpy(dtype=np.float64)
+    pos = (depth - grid[0]) / step
+    k = np.rint(pos).astype(np.int64)
+
+    lo = int(np.ceil(pos[0] - ON_GRID_TOL))
+    hi = int(np.floor(pos[-1] + ON_GRID_TOL)) + 1
+    dept = grid[lo:hi].copy()
+    out = np.full((len(CURVES), hi - lo), np.nan)
+
+    # exact placement only when the well fills its slice of the grid; a coarser
+    # well would land on every Nth row and leave NaN rows between its samples
+    on_grid = np.all(np.abs(pos - k) <= ON_GRID_TOL) and np.all(np.diff(k) == 1)
+    if on_grid:
+        dept[k - lo] = depth
+        for c, name in enumerate(CURVES):
+            out[c, k - lo] = curve_array(df, name)
+        return (lo, hi), dept, out
+
+    # interpolate between neighbours, but not across gaps in the log
+    max_gap = 1.5 * infer_depth_step(df)
+    for c, name in enumerate(CURVES):
+        values = curve_array(df, name)
+        valid = ~np.isnan(values)
+        if valid.sum() < 2:
+            continue
+        d, v = depth[valid], values[valid]
+
+        right = np.clip(np.searchsorted(d, dept), 1, len(d) - 1)
+        left = right - 1
+        near = np.minimum(np.abs(dept - d[left]), np.abs(dept - d[right])) <= ON_GRID_TOL * step
+        bridged = (d[right] - d[left] <= max_gap) & (dept >= d[0]) & (dept <= d[-1])
+
+        out[c] = np.where(bridged | near, np.interp(dept, d, v), np.nan)
+
+    return (lo, hi), dept, out
+
+
+def _score_group(frames: Sequence[pd.DataFrame], cfg: CLASConfig, step: float) -> List[dict]:
+    """Per-well column arrays (DEPT, curves, CLAS, IS_COAL) scored in one pass."""
+    grid = common_grid(frames, step)
+    logger.debug(f"Field grid: {len(frames)} well(s) x {len(grid)} rows at {step:g} m")
+
+    stack = np.full((len(CURVES), len(frames), len(grid)), np.nan)
+    inside = np.zeros((len(frames), len(grid)), dtype=bool)
+    spans, depths = [], []
+    for w, df in enumerate(frames):
+        (lo, hi), dept, values = resample(df, grid, step)
+        stack[:, w, lo:hi] = values
+        inside[w, lo:hi] = True
+        spans.append((lo, hi))
+        depths.append(dept)
+
+    sub = compute_subscores(*stack, cfg, inside=inside)
+    clas = combine_scores(sub, cfg)
+    is_coal = flag_coal(clas, cfg.point_threshold)
+
+    columns = []
+    for w, (df, (lo, hi), dept) in enumerate(zip(frames, spans, depths)):
+        out = {"DEPT": dept}
+        for c, name in enumerate(CURVES):
+            if name in df:
+                out[name] = stack[c, w, lo:hi]
+        out["CLAS"] = clas[w, lo:hi]
+        out["IS_COAL"] = is_coal[w, lo:hi]
+        columns.append(out)
+
+    return columns
+
+
+def score_field(
+    frames: Sequence[pd.DataFrame],
+    cfg: CLASConfig,
+    step: Optional[float] = None,
+) -> List[pd.DataFrame]:
+    """
+    Score trimmed, depth-sorted wells together; returns one frame per well
+    on the grid with DEPT, the curves it has, CLAS and IS_COAL.
+    """
+    if not frames:
+        return []
+    return [pd.DataFrame(c) for c in _score_group(frames, cfg, step or grid_step(frames))]
+
+
+def field_groups(frames: Sequence[pd.DataFrame], step: float, max_elements: int = MAX_FIELD_ELEMENTS) -> List[List[int]]:
+    """Consecutive runs of well indices whose common grid fits ``max_elements``."""
+    groups: List[List[int]] = []
+    top = bottom = None
+
+    for i, df in enumerate(frames):
+        t, b = float(df["DEPT"].iloc[0]), float(df["DEPT"].iloc[-1])
+        if groups:
+            nt, nb = min(top, t), max(bottom, b)
+            if (len(groups[-1]) + 1) * ((nb - nt) / step + 1) <= max_elements:
+                groups[-1].append(i)
+                top, bottom = nt, nb
+                continue
+        groups.append([i])
+        top, bottom = t, b
+
+    return groups
+
+
+def process_field(
+    frames: Sequence[pd.DataFrame],
+    wells: Sequence[str],
+    cfg: CLASConfig,
+    step: Optional[float] = None,
+) -> List[dict]:
+    """``process_frame`` for many wells at once; frames must be trimmed and depth-sorted."""
+    if not frames:
+        return []
+
+    step = step or grid_step(frames)
+    results: List[Optional[dict]] = [None] * len(frames)
+
+    for group in field_groups(frames, step):
+        for i, cols in zip(group, _score_group([frames[i] for i in group], cfg, step)):
+            dept, clas = cols["DEPT"], cols["CLAS"]
+            well_step = depth_step(dept)
+
+            starts, ends, _ = seam_bounds(cols["IS_COAL"], np.isnan(clas), well_step, cfg.max_no_data_run)
+            seams = seam_table(dept, clas, starts, ends, well_step, cfg)
+
+            results[i] = {
+                "well": wells[i],
+                "df": pd.DataFrame(cols),
+                "seams": seams,
+                "seam_count": len(seams),
+                "depth_min": dept.min(),
+                "depth_max": dept.max(),
+            }
+
+    return results
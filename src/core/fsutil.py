@@ -0,0 +1,31 @@
+"""
+Atomic file replacement.
+
+Result files (tables, manifests, indexes, cluster markers) are written to a
+temporary file next to their final path and renamed over it, so readers
+only ever see the previous or the complete new file. Temporary names are
+unique per write, so processes and nodes sharing a directory never write
+into each other's temporaries.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+import os
+import uuid
+
+
+def temp_path(path: Path) -> Path:
+    """A fresh temporary name in ``path``'s directory."""
+    return path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+@contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """Yield a temporary path that replaces ``path`` when the block completes, or is removed if it raises."""
+    tmp = temp_path(path)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
@@ -1,46 +1,149 @@
-import lasio
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List
+from typing import BinaryIO, Dict, List, Optional
+import io
 import logging
 
+from core.cache import LasCache, bytes_digest
+from core.lasreader import UnsupportedLAS, read_data, read_header
+
 logger = logging.getLogger(__name__)
 
-def read_las(path: Path):
-    las = lasio.read(str(path))
+# Curves used by the pipeline, with the mnemonics they are found under
+CURVE_ALIASES: Dict[str, List[str]] = {
+    "DEPT": ["DEPT", "DEPTH", "MD"],
+    "GR": ["GR", "GAPI", "GR_CPS"],
+    "LD": ["LD", "LDT", "LDS"],
+    "SD": ["SD", "RHOB"],
+    "CL": ["CL", "CAL", "CALI", "CALIPER"]
+}
+
+def resolve_curves(mnemonics: List[str]) -> Dict[str, str]:
+    """Map each standard curve name to the first matching mnemonic."""
+    found = {}
+    for std, opts in CURVE_ALIASES.items():
+        for o in opts:
+            if o in mnemonics:
+                found[std] = o
+                break
+    return found
+
+def _sort_by_depth(df: pd.DataFrame) -> pd.DataFrame:
+    if "DEPT" not in df.columns:
+        raise ValueError("Depth column not found in LAS file")
+
+    if df["DEPT"].is_monotonic_increasing:
+        return df
+    return df.sort_values("DEPT", kind="stable").reset_index(drop=True)
+
+def _read_native(path: Path):
+    with open(path, "rb") as f:
+        return _parse_native(f, path.stem)
+
+def _parse_native(f: BinaryIO, default_name: str):
+    header = read_header(f)
+
+    curves = resolve_curves(header.curves)
+    if "DEPT" not in curves:
+        raise ValueError("Depth column not found in LAS file")
+
+    # keep file order; duplicated mnemonics are left to lasio
+    if len(set(header.curves)) != len(header.curves):
+        raise UnsupportedLAS("Duplicate curve mnemonics")
+
+    names = sorted(curves, key=lambda std: header.curves.index(curves[std]))
+    usecols = [header.curves.index(curves[std]) for std in names]
+
+    data = read_data(f, header, usecols)
+
+    well_name = header.well["WELL"] if "WELL" in header.well else default_name
+    df = pd.DataFrame(data, columns=names)
+
+    return df, well_name
+
+def _read_lasio(source, default_name: Optional[str] = None):
+    """``source`` is a path or a text file object."""
+    import lasio
+
+    las = lasio.read(source if hasattr(source, "read") else str(source))
 
     well_name = (
         str(las.well.WELL.value).strip()
         if "WELL" in las.well
-        else path.stem
+        else default_name or Path(source).stem
     )
 
-    logger.info(f"Reading LAS: {path.name}")
-    
+    # lasio already replaces the header NULL value with NaN
     df = las.df().reset_index()
     df.columns = df.columns.str.upper()
-    df = df.replace(-999, np.nan)
-
-    col_variants: Dict[str, List[str]] = {
-        "DEPT": ["DEPT", "DEPTH", "MD"],
-        "GR": ["GR", "GAPI", "GR_CPS"],
-        "LD": ["LD", "LDT", "LDS"],
-        "SD": ["SD", "RHOB"],
-        "CL": ["CL", "CAL", "CALI", "CALIPER"]
-    }
-
-    rename = {}
-    for std, opts in col_variants.items():
-        for o in opts:
-            if o in df.columns:
-                rename[o] = std
-                break
 
-    df = df.rename(columns=rename)
-    df = df.sort_values("DEPT").reset_index(drop=True)
+    curves = resolve_curves(list(df.columns))
+    names = sorted(curves, key=lambda std: df.columns.get_loc(curves[std]))
+    df = df[[curves[std] for std in names]]
+    df.columns = names
 
-    if "DEPT" not in df.columns:
-        raise ValueError("Depth column not found in LAS file")
+    return df, well_name
+
+def read_las_bytes(data: bytes, name: str = "upload", cache: Optional[LasCache] = None):
+    """``read_las`` for a LAS file held in memory, such as an upload."""
+    logger.info(f"Reading LAS: {name}")
+
+    if cache is not None:
+        key = cache.key_for_digest(bytes_digest(data))
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+    stem = Path(name).stem
+    try:
+        df, well_name = _parse_native(io.BytesIO(data), stem)
+    except UnsupportedLAS as exc:
+        logger.debug(f"{name}: {exc}; falling back to lasio")
+        df, well_name = _read_lasio(io.StringIO(data.decode("utf-8", errors="replace")), stem)
+
+    df = _sort_by_depth(df)
+
+    if cache is not None:
+        try:
+            cache.put(key, df, well_name, source=name)
+        except OSError as exc:
+            logger.warning(f"Could not write LAS cache entry for {name}: {exc}")
+
+    return df, well_name
+
+def read_well_info(path: Path) -> Dict[str, str]:
+    """~W section items (mnemonic -> value) without reading the data."""
+    try:
+        with open(path, "rb") as f:
+            return dict(read_header(f).well)
+    except UnsupportedLAS:
+        import lasio
+
+        las = lasio.read(str(path), ignore_data=True)
+        return {item.mnemonic.upper(): str(item.value).strip() for item in las.well}
+
+def read_las(path: Path, cache: Optional[LasCache] = None):
+    logger.info(f"Reading LAS: {path.name}")
+
+    if cache is not None:
+        key = cache.key_for(path)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+    try:
+        df, well_name = _read_native(path)
+    except UnsupportedLAS as exc:
+        logger.debug(f"{path.name}: {exc}; falling back to lasio")
+        df, well_name = _read_lasio(path)
+
+    df = _sort_by_depth(df)
+
+    if cache is not None:
+        try:
+            cache.put(key, df, well_name, source=str(path))
+        except OSError as exc:
+            logger.warning(f"Could not write LAS cache entry for {path.name}: {exc}")
 
-    return df, well_name
\ No newline at end of file
+    return df, well_name
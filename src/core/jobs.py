@@ -0,0 +1,228 @@
+"""
+Background processing of uploaded LAS files.
+
+``JobQueue`` runs ``process_bytes`` on a worker pool and tracks one ``Job``
+per upload, so a front end can submit many wells, return immediately and
+poll for per-well status while results arrive. Identical uploads (same
+content digest and config fingerprint) share one job, and finished
+results are handed to an optional ``MemoryCache`` so later submissions of
+the same well complete instantly. With a cache, a job only refers to its
+result there, so memory stays within the cache's bound; a job whose result
+was evicted reports ``expired`` and is re-queued when the well is
+submitted again. Without one, at most ``max_finished`` finished jobs are
+kept.
+"""
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from time import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+
+from core.batch import worker_ready
+from core.cache import LasCache, bytes_digest
+from core.config import CLASConfig
+from core.memcache import MemoryCache
+from core.process import process_bytes
+from core.welllog import compact_result
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED, EXPIRED = "queued", "running", "done", "failed", "expired"
+
+# finished jobs kept (with their results) when there is no result cache
+MAX_FINISHED = 256
+
+
+class QueueFull(RuntimeError):
+    """Raised by ``JobQueue.submit`` when ``max_pending`` jobs are already waiting or running."""
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    key: tuple
+    submitted: float = field(default_factory=time)
+    finished: Optional[float] = None
+    error: Optional[str] = None
+    future: Optional[Future] = field(default=None, repr=False)
+    cache: Optional[MemoryCache] = field(default=None, repr=False)
+    done: bool = False
+    _result: Optional[dict] = field(default=None, repr=False)
+
+    @property
+    def result(self) -> Optional[dict]:
+        if self._result is not None or not self.done or self.cache is None:
+            return self._result
+        return self.cache.get(self.key)
+
+    def set_result(self, result: dict) -> None:
+        # with a cache the result lives only there, within its memory bound
+        if self.cache is not None:
+            self.cache.put(self.key, result)
+        else:
+            self._result = result
+        self.done = True
+
+    @property
+    def status(self) -> str:
+        if self.error is not None:
+            return FAILED
+        if self.done:
+            return DONE if self.result is not None else EXPIRED
+        # a done future whose callback has not stored the result yet is still running
+        if self.future is not None and (self.future.running() or self.future.done()):
+            return RUNNING
+        return QUEUED
+
+    @property
+    def pending(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time()) - self.submitted
+
+
+def result_key(digest: str, cfg: CLASConfig) -> tuple:
+    return ("result", digest, cfg.fingerprint())
+
+
+def process_upload(data: bytes, cfg: CLASConfig, name: str, las_cache: Optional[LasCache] = None) -> dict:
+    """``process_bytes`` with the result compacted (``log`` instead of ``df``) before it leaves the worker."""
+    return compact_result(process_bytes(data, cfg, name, las_cache))
+
+
+class JobQueue:
+    """
+    Worker pool for uploads. ``processes`` runs wells in separate
+    interpreters (true parallelism for the pandas parts of the pipeline);
+    threads avoid the result pickling for small wells.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        processes: bool = True,
+        cache: Optional[MemoryCache] = None,
+        las_cache: Optional[LasCache] = None,
+        keep_for: float = 3600.0,
+        max_pending: Optional[int] = None,
+        max_finished: int = MAX_FINISHED,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.cache = cache
+        self.las_cache = las_cache
+        self.keep_for = keep_for
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[tuple, Job] = {}
+        self._lock = threading.Lock()
+
+        if processes:
+            # a forked child would inherit the web server's threads and locks
+            self._pool: Executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="clas-job")
+
+    def submit(self, data: bytes, name: str, cfg: CLASConfig) -> Job:
+        return self.submit_many([(data, name)], cfg)[0]
+
+    def submit_many(self, uploads: Sequence[Tuple[bytes, str]], cfg: CLASConfig) -> List[Job]:
+        """Submit (data, name) uploads together: all are accepted, or none (``QueueFull``)."""
+        keyed = [(result_key(bytes_digest(data), cfg), data, name) for data, name in uploads]
+
+        with self._lock:
+            self._prune()
+
+            if self.max_pending is not None:
+                new = {
+                    key for key, _, _ in keyed
+                    if self._reusable(key) is None and not (self.cache is not None and key in self.cache)
+                }
+                if new and self._pending() + len(new) > self.max_pending:
+                    raise QueueFull(
+                        f"{len(new)} new job(s) do not fit: {self._pending()} of {self.max_pending} already pending"
+                    )
+
+            return [self._submit(key, data, name, cfg) for key, data, name in keyed]
+
+    def _reusable(self, key: tuple) -> Optional[Job]:
+        job = self._by_key.get(key)
+        return job if job is not None and job.status not in (FAILED, EXPIRED) else None
+
+    def _submit(self, key: tuple, data: bytes, name: str, cfg: CLASConfig) -> Job:
+        job = self._reusable(key)
+        if job is not None:
+            return job
+
+        job = Job(id=uuid.uuid4().hex[:12], name=name, key=key, cache=self.cache)
+        self._jobs[job.id] = job
+        self._by_key[key] = job
+
+        if self.cache is not None and key in self.cache:
+            job.done, job.finished = True, time()
+            return job
+
+        job.future = self._pool.submit(process_upload, data, cfg, name, self.las_cache)
+        job.future.add_done_callback(lambda fut, job=job: self._finish(job, fut))
+        logger.info(f"Queued {name} ({job.id})")
+        return job
+
+    def _finish(self, job: Job, fut: Future) -> None:
+        job.finished = time()
+        try:
+            result = fut.result()
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            logger.error(f"✘ Failed to process {job.name}: {job.error}")
+            return
+
+        job.set_result(result)
+        logger.info(f"✔ {job.name} done in {job.elapsed:.2f}s")
+
+    def warm(self) -> None:
+        """Start every worker now (spawned workers also import the pipeline) instead of on first use."""
+        for fut in [self._pool.submit(worker_ready) for _ in range(self.workers)]:
+            fut.result()
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending()
+
+    def _pending(self) -> int:
+        return sum(job.pending for job in self._jobs.values())
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs(self, ids: Sequence[str]) -> List[Job]:
+        """Jobs for ``ids`` in the given order; unknown or pruned ids are skipped."""
+        return [self._jobs[i] for i in ids if i in self._jobs]
+
+    def _prune(self) -> None:
+        cutoff = time() - self.keep_for
+        for job_id, job in list(self._jobs.items()):
+            if job.finished is not None and job.finished < cutoff:
+                del self._jobs[job_id]
+                self._forget(job)
+
+        if self.cache is None:
+            finished = sorted((j for j in self._jobs.values() if j.finished is not None), key=lambda j: j.finished)
+            for job in finished[:max(len(finished) - self.max_finished, 0)]:
+                del self._jobs[job.id]
+                self._forget(job)
+
+    def _forget(self, job: Job) -> None:
+        if self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
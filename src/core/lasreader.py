@@ -0,0 +1,165 @@
+"""
+Native reader for plain LAS 2.0 files.
+
+Parses the header sections line by line and the ~A data section in bulk
+with NumPy, keeping only the requested curves. Anything outside the simple
+case (wrapped data, LAS 1.2/3.0, ragged or non-numeric rows) raises
+UnsupportedLAS so callers can fall back to lasio.
+"""
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import BinaryIO, Dict, Iterator, List, Sequence
+import warnings
+
+import numpy as np
+
+DEFAULT_NULL = -999.25
+BLOCK_BYTES = 8 * 1024 * 1024
+
+
+class UnsupportedLAS(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class LasHeader:
+    version: str
+    wrap: bool
+    null: float
+    curves: List[str]
+    well: Dict[str, str] = field(default_factory=dict)
+    data_offset: int = 0
+
+
+def _decode(line: bytes) -> str:
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        return line.decode("latin-1")
+
+
+def _parse_item(line: str):
+    """Split 'MNEM.UNIT  VALUE : DESCRIPTION' into (mnemonic, value)."""
+    mnem, dot, rest = line.partition(".")
+    if not dot:
+        return None
+
+    # unit runs up to the first space after the dot
+    _, _, rest = rest.partition(" ")
+    value = rest.rpartition(":")[0] if ":" in rest else rest
+
+    return mnem.strip().upper(), value.strip()
+
+
+def read_header(f: BinaryIO) -> LasHeader:
+    """Read header sections, leaving ``f`` positioned at the first ~A row."""
+    section = ""
+    version: Dict[str, str] = {}
+    well: Dict[str, str] = {}
+    curves: List[str] = []
+
+    while True:
+        raw = f.readline()
+        if not raw:
+            raise UnsupportedLAS("No ~A section found")
+
+        line = _decode(raw).strip()
+        if not line or line.startswith("#"):
+            continue
+
+        if line.startswith("~"):
+            section = line[1:2].upper()
+            if section == "A":
+                break
+            continue
+
+        item = _parse_item(line)
+        if item is None:
+            continue
+
+        if section == "V":
+            version[item[0]] = item[1]
+        elif section == "W":
+            well.setdefault(item[0], item[1])
+        elif section == "C":
+            curves.append(item[0])
+
+    vers = version.get("VERS", "")
+    wrap = version.get("WRAP", "NO").upper().startswith("Y")
+
+    if not vers.startswith("2"):
+        raise UnsupportedLAS(f"LAS version {vers or '?'} is not supported")
+    if wrap:
+        raise UnsupportedLAS("Wrapped LAS data is not supported")
+    if not curves:
+        raise UnsupportedLAS("No curves defined in ~C section")
+
+    try:
+        null = float(well.get("NULL", DEFAULT_NULL))
+    except ValueError:
+        raise UnsupportedLAS(f"Invalid NULL value: {well['NULL']!r}")
+
+    return LasHeader(
+        version=vers,
+        wrap=wrap,
+        null=null,
+        curves=curves,
+        well=well,
+        data_offset=f.tell(),
+    )
+
+
+def iter_blocks(f: BinaryIO, block_bytes: int = BLOCK_BYTES) -> Iterator[bytes]:
+    """Yield chunks of the data section that end on a line boundary."""
+    while True:
+        block = f.read(block_bytes)
+        if not block:
+            return
+        if not block.endswith(b"\n"):
+            block += f.readline()
+        yield block
+
+
+def parse_block(block: bytes, n_curves: int, usecols: Sequence[int]) -> np.ndarray:
+    """Parse whitespace-delimited rows, returning only ``usecols``."""
+    with warnings.catch_warnings():
+        # a block of only comments / blank lines is not an error
+        warnings.simplefilter("ignore", UserWarning)
+        try:
+            rows = np.loadtxt(BytesIO(block), dtype=np.float64, comments="#", ndmin=2)
+        except ValueError as exc:
+            raise UnsupportedLAS(f"Unparseable data section: {exc}")
+
+    if not rows.size:
+        return np.empty((0, len(usecols)))
+
+    if rows.shape[1] != n_curves:
+        raise UnsupportedLAS(
+            f"Data rows have {rows.shape[1]} values, header defines {n_curves} curves"
+        )
+
+    return rows[:, usecols]
+
+
+def read_data(
+    f: BinaryIO,
+    header: LasHeader,
+    usecols: Sequence[int],
+    block_bytes: int = BLOCK_BYTES,
+) -> np.ndarray:
+    """
+    Read the data section block by block, keeping only ``usecols``.
+
+    Only one block is ever parsed at full width, so peak memory is the
+    projected output plus one block. Header NULL values become NaN.
+    """
+    f.seek(header.data_offset)
+
+    parts = [
+        parse_block(block, len(header.curves), usecols)
+        for block in iter_blocks(f, block_bytes)
+    ]
+    data = np.concatenate(parts) if parts else np.empty((0, len(usecols)))
+
+    data[data == header.null] = np.nan
+    return data
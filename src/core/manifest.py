@@ -0,0 +1,158 @@
+"""
+Batch manifest for resumable runs.
+
+One JSON line is appended to ``clas_manifest.jsonl`` in the output root for
+every well that completes, recording the LAS file hash, the config
+fingerprint, the code version and the outputs written. On a rerun, wells
+whose entry still matches are skipped. Appending keeps the manifest valid
+if a batch dies part-way; the last entry for a file wins.
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence
+import json
+import logging
+
+from core import __version__
+from core.cache import file_digest
+from core.config import CLASConfig
+from core.fsutil import atomic_path
+from core.types import WellOutcome
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "clas_manifest.jsonl"
+
+
+def run_options(
+    save_plot: bool = False,
+    stream: bool = False,
+    export: Optional[str] = None,
+    common_grid: Optional[float] = None,
+    depth_range: Optional[Sequence[float]] = None,
+) -> dict:
+    """Output-affecting options stored with each entry; every front end builds them here so they compare equal."""
+    options = {"save_plot": save_plot, "stream": stream}
+    if common_grid is not None:
+        options["common_grid"] = common_grid
+    if export:
+        options["export"] = export
+    if depth_range is not None:
+        options["depth_range"] = list(depth_range)
+    return options
+
+
+class Manifest:
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+
+        if path.exists():
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # torn final line from an interrupted run
+                        continue
+                    self.entries[entry["las_path"]] = entry
+
+    def compact(self) -> None:
+        """Rewrite the manifest with only the latest entry per file."""
+        with atomic_path(self.path) as tmp, tmp.open("w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+
+    @classmethod
+    def in_dir(cls, output_root: Path) -> "Manifest":
+        return cls(output_root / MANIFEST_NAME)
+
+    def _file_hash(self, las_path: Path, entry: Optional[dict]) -> str:
+        # unchanged size + mtime: trust the recorded hash instead of re-reading
+        st = las_path.stat()
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["file_hash"]
+        return file_digest(las_path)
+
+    def is_current(self, las_path: Path, cfg: CLASConfig, options: Mapping) -> bool:
+        return self.entry_current(self.entries.get(str(las_path.resolve())), las_path, cfg, options)
+
+    def entry_current(self, entry: Optional[dict], las_path: Path, cfg: CLASConfig, options: Mapping) -> bool:
+        """Whether ``entry`` (as written by ``record``) still describes ``las_path``."""
+        if entry is None or "error" in entry or not _same_run(entry, cfg, options):
+            return False
+
+        if not all(Path(p).exists() for p in entry["outputs"]):
+            return False
+
+        try:
+            return self._file_hash(las_path, entry) == entry["file_hash"]
+        except OSError:
+            return False
+
+    def failure_current(self, entry: Optional[dict], las_path: Path, cfg: CLASConfig, options: Mapping) -> bool:
+        """Whether a failed ``entry`` is for the same file and run, so retrying would fail again."""
+        if entry is None or "error" not in entry or not _same_run(entry, cfg, options):
+            return False
+        try:
+            st = las_path.stat()
+        except OSError:
+            return False
+        return entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+
+    def record(self, outcome: WellOutcome, cfg: CLASConfig, options: Mapping) -> None:
+        self.append(make_entry(outcome, cfg, options))
+
+    def append(self, entry: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+
+        self.entries[entry["las_path"]] = entry
+
+
+def _same_run(entry: dict, cfg: CLASConfig, options: Mapping) -> bool:
+    return (
+        entry["config"] == cfg.fingerprint()
+        and entry["version"] == __version__
+        and entry["options"] == dict(options)
+    )
+
+
+def make_entry(outcome: WellOutcome, cfg: CLASConfig, options: Mapping) -> dict:
+    """Manifest entry for ``outcome``; failed wells get an ``error`` entry (no hash or outputs)."""
+    las_path = outcome.las_path.resolve()
+    run = {
+        "config": cfg.fingerprint(),
+        "version": __version__,
+        "options": dict(options),
+    }
+
+    if not outcome.ok:
+        try:
+            st = las_path.stat()
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+        except OSError:
+            size, mtime_ns = None, None
+        return {
+            "las_path": str(las_path),
+            "size": size,
+            "mtime_ns": mtime_ns,
+            **run,
+            "error": outcome.error,
+            "completed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+    st = las_path.stat()
+    return {
+        "las_path": str(las_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "file_hash": file_digest(las_path),
+        **run,
+        "well": outcome.well,
+        "seam_count": outcome.seam_count,
+        "outputs": [str(p) for p in outcome.outputs],
+        "completed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
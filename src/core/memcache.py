@@ -0,0 +1,125 @@
+"""
+Bounded in-memory cache for long-running front ends.
+
+Entries are evicted least-recently-used once their estimated size passes
+``max_bytes``, and expire ``ttl`` seconds after they were stored. Sizes
+are estimated from the arrays, frames and byte strings an entry holds, so
+a shared server can be capped by RAM rather than by entry count.
+"""
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Callable, Hashable, Optional, Tuple
+import logging
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(obj: Any, _depth: int = 0) -> int:
+    """Approximate bytes held by ``obj``; objects may report their own ``nbytes``."""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray) or hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    if _depth < 3 and isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(v, _depth + 1) for v in obj.values())
+    if _depth < 3 and isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_size(v, _depth + 1) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class MemoryCache:
+    def __init__(
+        self,
+        max_bytes: int = 512 * 1024**2,
+        ttl: Optional[float] = 3600.0,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _missing) is not _missing
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, _, expires = entry
+            if expires < monotonic():
+                self._drop(key)
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {key!r}: {size} bytes exceeds the cache size")
+            return
+
+        expires = monotonic() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, expires)
+            self.bytes += size
+            self._evict()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value for ``key``, computing it once even under concurrent callers."""
+        value = self.get(key, _missing)
+        if value is not _missing:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                value = self.get(key, _missing)
+                if value is _missing:
+                    value = compute()
+                    self.put(key, value)
+                return value
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def _evict(self) -> None:
+        now = monotonic()
+        for key in [k for k, (_, _, expires) in self._entries.items() if expires < now]:
+            self._drop(key)
+
+        while self.bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._drop(key)
+            logger.debug(f"Evicted {key!r} from memory cache")
+
+
+_missing = object()
@@ -1,23 +1,36 @@
 from pathlib import Path
+from typing import Optional, Tuple
 import logging
 
+from core.cache import LasCache
+from core.depthindex import process_window
+from core.lasreader import BLOCK_BYTES
 from core.process import process_well
+from core.profiling import NULL_PROFILER
+from core.streaming import process_well_streaming
 from core.types import PipelineResult
+from core.welllog import compact_result
 
 logger = logging.getLogger("clas")
 
 
-def run_single_well(las_path: Path, cfg, output_dir: Path) -> PipelineResult:
+def run_single_well(
+    las_path: Path,
+    cfg,
+    output_dir: Path,
+    cache: Optional[LasCache] = None,
+    stream: bool = False,
+    block_bytes: int = BLOCK_BYTES,
+    profiler=NULL_PROFILER,
+    depth_range: Optional[Tuple[float, float]] = None,
+) -> PipelineResult:
     logger.info(f"Processing LAS: {las_path.name}")
 
-    result = process_well(las_path, cfg)
+    if depth_range is not None:
+        result = process_window(las_path, cfg, *depth_range, profiler=profiler)
+    elif stream:
+        result = process_well_streaming(las_path, cfg, block_bytes, profiler=profiler)
+    else:
+        result = process_well(las_path, cfg, cache=cache, profiler=profiler)
 
-    return PipelineResult(
-        well=result["well"],
-        df=result["df"],
-        seams=result["seams"],
-        seam_count=result["seam_count"],
-        depth_min=result["depth_min"],
-        depth_max=result["depth_max"],
-        output_dir=output_dir,
-    )
\ No newline at end of file
+    return PipelineResult(output_dir=output_dir, **compact_result(result))
\ No newline at end of file
@@ -26,7 +26,10 @@ def auto_trim(df: pd.DataFrame) -> pd.DataFrame:
     return df.reset_index(drop=True)
 
 def infer_depth_step(df):
-    d = np.diff(df["DEPT"].astype(float))
+    return depth_step(df["DEPT"].to_numpy(dtype=float))
+
+def depth_step(depth: np.ndarray) -> float:
+    d = np.diff(depth)
     d = d[(d > 0) & ~np.isnan(d)]
     return float(np.median(d)) if len(d) else DEPTH_STEP
 
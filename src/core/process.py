@@ -1,28 +1,67 @@
 from pathlib import Path
+from typing import Optional
 import pandas as pd
 
-from core.io import read_las
+from core.cache import LasCache, bytes_digest
+from core.io import read_las, read_las_bytes
 from core.preprocessing import auto_trim, infer_depth_step
-from core.scoring import compute_clas
+from core.profiling import NULL_PROFILER
+from core.scoring import compute_clas, flag_coal
 from core.seams import extract_seams
+from core.stages import StageMemo
 
-def process_well(las_path: Path, cfg) -> dict:
-    df, well = read_las(las_path)
+def process_well(
+    las_path: Path,
+    cfg,
+    cache: Optional[LasCache] = None,
+    profiler=NULL_PROFILER,
+) -> dict:
+    with profiler.stage("read_las") as rec:
+        df, well = read_las(las_path, cache=cache)
+        rec["rows"] = len(df)
 
-    df = auto_trim(df)
+    memo = StageMemo.for_file(cache, las_path) if cache is not None else None
+    return process_frame(df, well, cfg, profiler=profiler, memo=memo)
 
-    df["CLAS"] = compute_clas(df, cfg)
+def process_bytes(
+    data: bytes,
+    cfg,
+    name: str = "upload",
+    cache: Optional[LasCache] = None,
+    profiler=NULL_PROFILER,
+) -> dict:
+    """``process_well`` for a LAS file held in memory."""
+    with profiler.stage("read_las") as rec:
+        df, well = read_las_bytes(data, name=name, cache=cache)
+        rec["rows"] = len(df)
 
-    # conservative coal decision
-    coal_votes = (df["CLAS"] >= cfg.point_threshold).rolling(
-        window=3,
-        center=True,
-        min_periods=1
-    ).sum()
+    memo = StageMemo(cache, cache.key_for_digest(bytes_digest(data)), name) if cache is not None else None
+    return process_frame(df, well, cfg, profiler=profiler, memo=memo)
+
+def process_frame(
+    df: pd.DataFrame,
+    well: str,
+    cfg,
+    profiler=NULL_PROFILER,
+    memo: Optional[StageMemo] = None,
+) -> dict:
+    """Score a parsed well; with ``memo``, stage outputs are reused / stored (see ``core.stages``)."""
+    with profiler.stage("auto_trim") as rec:
+        df = auto_trim(df)
+        rec["rows"] = len(df)
 
-    df["IS_COAL"] = coal_votes >= 2
+    with profiler.stage("compute_clas", rows=len(df)) as rec:
+        if memo is None:
+            df["CLAS"] = compute_clas(df, cfg)
+        else:
+            df["CLAS"], rec["reused"] = memo.clas(df, cfg)
+
+    # conservative coal decision
+    with profiler.stage("is_coal", rows=len(df)):
+        df["IS_COAL"] = flag_coal(df["CLAS"].to_numpy(), cfg.point_threshold)
 
-    seams = extract_seams(df, cfg)
+    with profiler.stage("extract_seams", rows=len(df)):
+        seams = extract_seams(df, cfg)
 
     return {
         "well": well,
@@ -31,4 +70,4 @@ def process_well(las_path: Path, cfg) -> dict:
         "seam_count": len(seams),
         "depth_min": df["DEPT"].min(),
         "depth_max": df["DEPT"].max(),
-    }
\ No newline at end of file
+    }
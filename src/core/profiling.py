@@ -0,0 +1,138 @@
+"""
+Per-stage profiling for ``--profile``.
+
+Pipeline code wraps its stages in ``profiler.stage(name)``; each stage
+records wall time, CPU time, rows handled and (with tracemalloc) the peak
+memory allocated while it ran. ``NULL_PROFILER`` is the default and does
+nothing, so unprofiled runs only pay for a context manager per stage.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter, process_time
+from typing import Dict, Iterable, Iterator, List, Optional
+import cProfile
+import json
+import tracemalloc
+
+PROFILE_NAME = "clas_profile.json"
+CPROFILE_NAME = "clas_profile.prof"
+SUMMARY_NAME = "clas_profile_summary.json"
+
+
+class NullProfiler:
+    enabled = False
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[dict]:
+        yield {}
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class StageProfiler:
+    enabled = True
+
+    def __init__(self, memory: bool = True, cprofile: bool = False):
+        self.memory = memory
+        self.stages: List[dict] = []
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._own_tracemalloc = False
+
+    def start(self) -> None:
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracemalloc = True
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+            self._own_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[dict]:
+        """Time the enclosed block; callers may set ``record["rows"]`` once known."""
+        record = {"stage": name, "rows": rows}
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            mem_before = tracemalloc.get_traced_memory()[0]
+
+        cpu, wall = process_time(), perf_counter()
+        try:
+            yield record
+        finally:
+            record["wall_s"] = perf_counter() - wall
+            record["cpu_s"] = process_time() - cpu
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                record["peak_alloc_mb"] = (peak - mem_before) / 1024**2
+                record["net_alloc_mb"] = (current - mem_before) / 1024**2
+            self.stages.append(record)
+
+    def write(self, out_dir: Path, **meta) -> Path:
+        """Write the stage records (and cProfile stats) into ``out_dir``."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        report = dict(meta, stages=self.stages)
+
+        if self._cprofile is not None:
+            prof_path = out_dir / CPROFILE_NAME
+            self._cprofile.dump_stats(str(prof_path))
+            report["cprofile"] = str(prof_path)
+
+        path = out_dir / PROFILE_NAME
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        return path
+
+
+def summarize(per_well: Iterable[Iterable[dict]]) -> Dict[str, dict]:
+    """Aggregate stage records of many wells by stage name."""
+    summary: Dict[str, dict] = {}
+
+    for stages in per_well:
+        for rec in stages:
+            s = summary.setdefault(rec["stage"], {
+                "wells": 0, "wall_s": 0.0, "cpu_s": 0.0, "max_wall_s": 0.0,
+                "rows": 0, "max_peak_alloc_mb": None,
+            })
+            s["wells"] += 1
+            s["wall_s"] += rec["wall_s"]
+            s["cpu_s"] += rec["cpu_s"]
+            s["max_wall_s"] = max(s["max_wall_s"], rec["wall_s"])
+            s["rows"] += rec.get("rows") or 0
+            if "peak_alloc_mb" in rec:
+                s["max_peak_alloc_mb"] = max(s["max_peak_alloc_mb"] or 0.0, rec["peak_alloc_mb"])
+
+    for s in summary.values():
+        s["mean_wall_s"] = s["wall_s"] / s["wells"]
+        s["rows_per_s"] = s["rows"] / s["wall_s"] if s["rows"] and s["wall_s"] else None
+
+    return summary
+
+
+def write_summary(path: Path, summary: Dict[str, dict], **meta) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(dict(meta, stages=summary), f, indent=2)
+
+
+def format_summary(summary: Dict[str, dict]) -> str:
+    total = sum(s["wall_s"] for s in summary.values()) or 1.0
+    lines = [f"{'stage':<18}{'wells':>6}{'wall s':>10}{'share':>8}{'cpu s':>10}{'max MB':>9}"]
+    for name, s in sorted(summary.items(), key=lambda kv: -kv[1]["wall_s"]):
+        mb = "-" if s["max_peak_alloc_mb"] is None else f"{s['max_peak_alloc_mb']:.1f}"
+        lines.append(
+            f"{name:<18}{s['wells']:>6}{s['wall_s']:>10.3f}{s['wall_s'] / total:>8.0%}"
+            f"{s['cpu_s']:>10.3f}{mb:>9}"
+        )
+    return "\n".join(lines)
@@ -1,76 +1,232 @@
+from dataclasses import dataclass
+import warnings
+
 import pandas as pd
 import numpy as np
-from core.preprocessing import robust_normalize, neighbor_context
 from core.config import CLASConfig
 
+# Scoring works on plain float arrays along the last axis, so the same
+# kernel serves a single well (n,) or a stack of wells (wells, n).
+
+# -------------------------
+# ROLLING WINDOWS
+# -------------------------
+def _shifted_apply(x, window, op, out):
+    """Fold the centered window of ``x`` into ``out`` with a binary ufunc."""
+    left, right = window // 2, (window - 1) // 2
+    for k in range(1, left + 1):
+        op(out[..., k:], x[..., :-k], out=out[..., k:])
+    for k in range(1, right + 1):
+        op(out[..., :-k], x[..., k:], out=out[..., :-k])
+    return out
+
+def rolling_mean(x, window, min_periods=1):
+    """Centered rolling mean ignoring NaN, like ``Series.rolling(center=True)``."""
+    valid = ~np.isnan(x)
+    filled = np.where(valid, x, 0.0)
+
+    total = _shifted_apply(filled, window, np.add, filled.copy())
+    count = _shifted_apply(valid, window, np.add, valid.astype(np.int32))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    mean[count < min_periods] = np.nan
+    return mean
+
+def rolling_std(x, window, min_periods=2):
+    """Centered rolling sample std (ddof=1) ignoring NaN."""
+    valid = ~np.isnan(x)
+    mean = rolling_mean(x, window, min_periods=1)
+    left, right = window // 2, (window - 1) // 2
+    n = x.shape[-1]
+
+    # second pass: squared deviations from each window's own mean
+    sq = np.zeros_like(mean)
+    for k in range(-left, right + 1):
+        lo, hi = max(0, -k), min(n, n - k)
+        dev = x[..., lo + k:hi + k] - mean[..., lo:hi]
+        sq[..., lo:hi] += np.where(valid[..., lo + k:hi + k], dev * dev, 0.0)
+
+    count = _shifted_apply(valid, window, np.add, valid.astype(np.int32))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.sqrt(sq / (count - 1))
+
+    # windows of identical values are exactly 0, whatever the rounding
+    hi_val = _shifted_apply(x, window, np.fmax, x.copy())
+    lo_val = _shifted_apply(x, window, np.fmin, x.copy())
+    std[hi_val == lo_val] = 0.0
+
+    std[count < min_periods] = np.nan
+    return std
+
+# -------------------------
+# NORMALIZATION
+# -------------------------
+def percentile_bounds(x, pmin=5, pmax=95):
+    """Per-row (lo, hi) percentiles, NaN where the curve cannot be scaled."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows
+        lo, hi = np.nanpercentile(x, [pmin, pmax], axis=-1, keepdims=True)
+
+    bad = ~(hi > lo)
+    lo[bad] = np.nan
+    hi[bad] = np.nan
+    return lo, hi
+
+def scale(x, lo, hi):
+    return np.clip((x - lo) / (hi - lo), 0, 1)
+
+# -------------------------
+# SUB-SCORES
+# -------------------------
 def score_gr(gr_n):
-    return (1.0 - gr_n / 0.6).clip(0, 1)
+    return np.clip(1.0 - gr_n / 0.6, 0, 1)
 
 def score_density(dens_n):
-    return ((dens_n - 0.6) / 0.4).clip(0, 1)
-
-def score_stability(gr, window=5):
-    std = gr.rolling(window, center=True, min_periods=2).std()
-    ref = std.median()
-
-    if ref == 0 or np.isnan(ref):
-        return pd.Series(0.0, index=gr.index)
-
-    return (1.0 - std / (2 * ref)).clip(0, 1)
-
-def score_caliper(cal):
-    return (1.0 - robust_normalize(cal)).clip(0, 1)
-
-def score_data_quality(df):
-    n_valid = df[["GR","LD","SD","CL"]].notna().sum(axis=1)
-    return (n_valid / 4.0).clip(0, 1)
-
-def compute_clas(df: pd.DataFrame, cfg: CLASConfig) -> pd.Series:
-    df = df.copy()
-
-    gr_n = robust_normalize(df["GR"])
-    dens_n = robust_normalize(df[["LD","SD"]].median(axis=1))
-    cal = df["CL"] if "CL" in df else pd.Series(np.nan, index=df.index)
-
-    s_gr   = score_gr(gr_n)
-    s_dens = score_density(dens_n)
-    s_stab = score_stability(df["GR"])
-    s_cal  = score_caliper(cal)
-
-    s_gr   = neighbor_context(s_gr,   cfg.neighbor_window)
-    s_dens = neighbor_context(s_dens, cfg.neighbor_window)
-    s_cal  = neighbor_context(s_cal,  cfg.neighbor_window)
-
-    score_sum = (
-        cfg.w_gr   * s_gr +
-        cfg.w_dens * s_dens +
-        cfg.w_stab * s_stab +
-        cfg.w_cal  * s_cal
+    return np.clip((dens_n - 0.6) / 0.4, 0, 1)
+
+def stability_ref(std):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(std, axis=-1, keepdims=True)
+
+def score_stability(std, ref):
+    # a flat or empty GR log carries no stability information
+    flat = (ref == 0) | np.isnan(ref)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s = np.clip(1.0 - std / (2 * ref), 0, 1)
+    return np.where(flat, 0.0, s)
+
+def score_caliper(cal_n):
+    return np.clip(1.0 - cal_n, 0, 1)
+
+def density_curve(ld, sd):
+    """Row median of LD/SD: their mean where both exist, else whichever does."""
+    both = np.isnan(ld) == np.isnan(sd)
+    with np.errstate(invalid="ignore"):
+        return np.where(both, (ld + sd) / 2, np.where(np.isnan(ld), sd, ld))
+
+@dataclass(frozen=True)
+class NormStats:
+    """Whole-well statistics the scores are scaled against."""
+    gr: tuple
+    dens: tuple
+    cal: tuple
+    stab_ref: np.ndarray
+
+    @classmethod
+    def from_curves(cls, gr, dens, cl, gr_std) -> "NormStats":
+        return cls(
+            gr=percentile_bounds(gr),
+            dens=percentile_bounds(dens),
+            cal=percentile_bounds(cl),
+            stab_ref=stability_ref(gr_std),
+        )
+
+@dataclass(frozen=True)
+class SubScores:
+    s_gr: np.ndarray
+    s_dens: np.ndarray
+    s_stab: np.ndarray
+    s_cal: np.ndarray
+    quality: np.ndarray
+    has_gr: np.ndarray
+    has_dens: np.ndarray
+    has_cal: np.ndarray
+    votes: np.ndarray
+
+def compute_subscores(gr, ld, sd, cl, cfg: CLASConfig, stats: NormStats = None, inside=None) -> SubScores:
+    """
+    Per-sample sub-scores for float curve arrays.
+
+    ``stats`` supplies the normalization bounds; by default they are taken
+    from the curves themselves. ``inside`` marks the rows that belong to
+    each well when wells are padded onto a shared grid, so rolling values
+    spilling into the padding stay out of the statistics.
+    """
+    dens = density_curve(ld, sd)
+    gr_std = rolling_std(gr, 5, min_periods=2)
+
+    if stats is None:
+        ref_std = gr_std if inside is None else np.where(inside, gr_std, np.nan)
+        stats = NormStats.from_curves(gr, dens, cl, ref_std)
+
+    s_gr = rolling_mean(score_gr(scale(gr, *stats.gr)), cfg.neighbor_window)
+    s_dens = rolling_mean(score_density(scale(dens, *stats.dens)), cfg.neighbor_window)
+    s_cal = rolling_mean(score_caliper(scale(cl, *stats.cal)), cfg.neighbor_window)
+    s_stab = score_stability(gr_std, stats.stab_ref)
+
+    has_gr = ~np.isnan(gr)
+    has_ld = ~np.isnan(ld)
+    has_sd = ~np.isnan(sd)
+    has_cal = ~np.isnan(cl)
+
+    quality = (
+        has_gr.astype(np.int8) + has_ld + has_sd + has_cal
+    ) / 4.0
+
+    votes = (s_gr > 0.6).astype(np.int8) + (s_dens > 0.6) + (s_cal > 0.6)
+
+    return SubScores(
+        s_gr=s_gr,
+        s_dens=s_dens,
+        s_stab=s_stab,
+        s_cal=s_cal,
+        quality=quality,
+        has_gr=has_gr,
+        has_dens=has_ld | has_sd,
+        has_cal=has_cal,
+        votes=votes,
     )
 
-    weight_sum = (
-        cfg.w_gr   * df["GR"].notna().astype(int) +
-        cfg.w_dens * df[["LD","SD"]].notna().any(axis=1).astype(int) +
-        cfg.w_stab * df["GR"].notna().astype(int) +
-        cfg.w_cal  * df["CL"].notna().astype(int)
-    )
+def combine_scores(sub: SubScores, cfg: CLASConfig) -> np.ndarray:
+    """
+    Weighted CLAS from sub-scores. Config fields may also be arrays shaped
+    to broadcast against the samples, e.g. (n_configs, 1) for a sweep.
+    """
+    score_sum = cfg.w_gr * sub.s_gr
+    score_sum += cfg.w_dens * sub.s_dens
+    score_sum += cfg.w_stab * sub.s_stab
+    score_sum += cfg.w_cal * sub.s_cal
+
+    weight_sum = cfg.w_gr * sub.has_gr
+    weight_sum += cfg.w_dens * sub.has_dens
+    weight_sum += cfg.w_stab * sub.has_gr
+    weight_sum += cfg.w_cal * sub.has_cal
 
     max_weight = cfg.w_gr + cfg.w_dens + cfg.w_stab + cfg.w_cal
-    effective_weight = weight_sum / max_weight
+    low_weight = weight_sum / max_weight < cfg.min_effective_weight
 
-    raw_clas = score_sum / weight_sum.replace(0, np.nan)
+    weight_sum[weight_sum == 0] = np.nan
+    clas = score_sum
+    clas /= weight_sum
+    clas *= sub.quality
+    clas *= sub.votes >= 2
 
-    q = score_data_quality(df)
-    clas = raw_clas * q
+    clas[low_weight] = np.nan
+    return np.clip(clas, 0, 1, out=clas)
 
-    votes = (
-        (s_gr > 0.6).astype(int) +
-        (s_dens > 0.6).astype(int) +
-        (s_cal > 0.6).astype(int)
-    )
+def flag_coal(clas, threshold):
+    """Conservative coal decision: at least 2 of 3 neighbouring samples pass."""
+    hits = (clas >= threshold).astype(np.int8)
+    return _shifted_apply(hits, 3, np.add, hits.copy()) >= 2
 
-    clas = clas * (votes >= 2)
+def score_halo(cfg: CLASConfig) -> int:
+    """Rows of context either side for CLAS (smoothing window) and IS_COAL (one more row)."""
+    return max(cfg.neighbor_window // 2, 2) + 1
 
-    clas[effective_weight < cfg.min_effective_weight] = np.nan
+def curve_array(df: pd.DataFrame, name: str) -> np.ndarray:
+    if name in df:
+        return df[name].to_numpy(dtype=np.float64)
+    return np.full(len(df), np.nan)
+
+def compute_clas(df: pd.DataFrame, cfg: CLASConfig) -> pd.Series:
+    sub = compute_subscores(
+        curve_array(df, "GR"),
+        curve_array(df, "LD"),
+        curve_array(df, "SD"),
+        curve_array(df, "CL"),
+        cfg,
+    )
 
-    return clas.clip(0, 1)
\ No newline at end of file
+    return pd.Series(combine_scores(sub, cfg), index=df.index)
@@ -1,60 +1,122 @@
+import numpy as np
 import pandas as pd
 from core.config import CLASConfig
 from core.preprocessing import infer_depth_step
 import logging
 
 logger = logging.getLogger(__name__)
+
+
+def _runs(mask: np.ndarray):
+    """Start / inclusive end indices of the True runs in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+
+
+def seam_bounds(is_coal: np.ndarray, clas_nan: np.ndarray, step: float, max_gap: float):
+    """
+    Row bounds of closed seam zones, plus the start row of a zone still
+    open at the end of the arrays (-1 if none).
+
+    A zone opens on a coal row. Each non-coal row adds one depth step of
+    gap (two if it has a valid CLAS) and a coal row resets the gap; the
+    zone closes on the row where the gap exceeds ``max_gap`` and ends on
+    the row before it. Zones still open at the end of the log are not closed.
+    """
+    run_start, run_end = _runs(np.asarray(is_coal, dtype=bool))
+    if not len(run_start):
+        return np.empty(0, np.intp), np.empty(0, np.intp), -1
+
+    n = len(is_coal)
+    inc = np.where(clas_nan, step, step * 2)
+
+    # non-coal gap following each coal run (the last one runs to the end)
+    gap_lo = run_end + 1
+    gap_len = np.append(run_start[1:], n) - gap_lo
+
+    # Accumulate every gap in lockstep so the float sums are added in the
+    # same order as a row-by-row walk (threshold ties must match exactly).
+    acc = np.zeros(len(run_start))
+    close_at = np.full(len(run_start), -1, dtype=np.intp)
+    active = np.flatnonzero(gap_len > 0)
+    j = 0
+    while active.size:
+        rows = gap_lo[active] + j
+        acc[active] += inc[rows]
+        hit = acc[active] > max_gap
+        close_at[active[hit]] = rows[hit]
+        active = active[~hit & (j + 1 < gap_len[active])]
+        j += 1
+
+    closing = np.flatnonzero(close_at >= 0)
+    first_run = np.concatenate(([0], closing + 1))
+
+    starts = run_start[first_run[:-1]]
+    ends = close_at[closing] - 1
+    open_start = run_start[first_run[-1]] if first_run[-1] < len(run_start) else -1
+
+    return starts, ends, int(open_start)
+
+
+def seam_table(
+    depth: np.ndarray,
+    clas: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    step: float,
+    cfg: CLASConfig,
+) -> pd.DataFrame:
+    top = depth[starts]
+    bottom = depth[ends]
+    thick = bottom - top + step
+
+    keep = thick >= cfg.min_thickness
+    top, bottom, thick = top[keep], bottom[keep], thick[keep]
+
+    if not len(top):
+        return pd.DataFrame()
+
+    # rows inside [TOP, BOTTOM] by depth value, as a depth filter would select
+    if np.all(depth[1:] >= depth[:-1]):
+        lo = np.searchsorted(depth, top, side="left")
+        hi = np.searchsorted(depth, bottom, side="right")
+        segments = [slice(a, b) for a, b in zip(lo, hi)]
+    else:
+        segments = [(depth >= a) & (depth <= b) for a, b in zip(top, bottom)]
+
+    valid = ~np.isnan(clas)
+    filled = np.where(valid, clas, 0.0)
+    hits = valid & (clas >= cfg.point_threshold)
+
+    mean_clas = np.full(len(top), np.nan)
+    min_clas = np.full(len(top), np.nan)
+    coal_conf = np.full(len(top), np.nan)
+
+    for k, seg in enumerate(segments):
+        n_valid = np.count_nonzero(valid[seg])
+        if n_valid:
+            # per-slice sum keeps pandas' pairwise summation order
+            mean_clas[k] = filled[seg].sum() / n_valid
+            min_clas[k] = np.nanmin(clas[seg])
+            coal_conf[k] = np.count_nonzero(hits[seg]) / n_valid
+
+    return pd.DataFrame({
+        "TOP": top,
+        "BOTTOM": bottom,
+        "THICKNESS": thick,
+        "MEAN_CLAS": mean_clas,
+        "MIN_CLAS": min_clas,
+        "COAL_CONF": coal_conf,
+    })
+
+
 def extract_seams(df: pd.DataFrame, cfg: CLASConfig):
     step = infer_depth_step(df)
-    seams = []
-
-    in_zone = False
-    gap = 0.0
-    start = None
-
-    for i in range(len(df)):
-        is_coal = bool(df.loc[i, "IS_COAL"])
-        clas = df.loc[i, "CLAS"]
-
-        if is_coal and not in_zone:
-            start = df.loc[i, "DEPT"]
-            in_zone = True
-            gap = 0.0
-
-        elif in_zone:
-            if not is_coal:
-                if pd.isna(clas):
-                    gap += step
-                else:
-                    gap += step * 2  
-
-                if gap > cfg.max_no_data_run:
-                    end = df.loc[i - 1, "DEPT"]
-                    thick = end - start + step # type: ignore
-
-                    if thick >= cfg.min_thickness: # type: ignore
-                        seg = df[(df["DEPT"] >= start) & (df["DEPT"] <= end)]
-
-                        valid = seg["CLAS"].notna()
-                        if valid.any():
-                            coal_conf = (
-                                seg.loc[valid, "CLAS"] >= cfg.point_threshold
-                            ).mean()
-                        else:
-                            coal_conf = float("nan")
-
-                        seams.append({
-                            "TOP": start,
-                            "BOTTOM": end,
-                            "THICKNESS": thick,
-                            "MEAN_CLAS": seg["CLAS"].mean(),
-                            "MIN_CLAS": seg["CLAS"].min(),
-                            "COAL_CONF": coal_conf
-                        })
-
-                    in_zone = False
-
-            else:
-                gap = 0.0
-
-    return pd.DataFrame(seams)
\ No newline at end of file
+
+    depth = df["DEPT"].to_numpy(dtype=float)
+    clas = df["CLAS"].to_numpy(dtype=float)
+    is_coal = df["IS_COAL"].to_numpy(dtype=bool)
+
+    starts, ends, _ = seam_bounds(is_coal, np.isnan(clas), step, cfg.max_no_data_run)
+
+    return seam_table(depth, clas, starts, ends, step, cfg)
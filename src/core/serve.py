@@ -0,0 +1,368 @@
+"""
+`clas serve`: the pipeline as a local HTTP service.
+
+One process keeps a warm ``JobQueue`` (worker pool, result cache) that any
+number of clients share, instead of each tool importing and running
+``process_well`` itself.
+
+    POST /jobs                 LAS file as the request body (?name=well.las)
+    POST /jobs                 JSON {"wells": [{"path": ...} | {"name": ..., "data": <base64>}],
+                                     "config": {"weights": {...}, "thresholds": {...}}}
+    GET  /jobs?ids=a,b         status of several jobs
+    GET  /jobs/<id>[?wait=S]   status, with seams as JSON once done (waits up to S seconds)
+    GET  /jobs/<id>/samples    per-sample results as a columnar binary payload
+    GET  /health               worker and queue counts
+
+``?config=<json>`` overrides the server config for a raw upload. Paths
+are only accepted under the ``--root`` directories. A full queue answers
+429 with Retry-After; ``decode_columns`` reads the binary payload.
+"""
+from concurrent.futures import wait as wait_futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+import argparse
+import base64
+import json
+import logging
+import struct
+
+import numpy as np
+
+from core.config import CLASConfig
+from core.jobs import FAILED, Job, JobQueue, QueueFull
+
+logger = logging.getLogger("clas")
+
+COLUMNS_TYPE = "application/vnd.clas.columns"
+COLUMNS_MAGIC = b"CLASCOL1"
+_HEADER_LEN = struct.Struct("<I")
+
+MAX_WAIT_S = 60.0
+
+
+# -------------------------
+# COLUMNAR PAYLOAD
+# -------------------------
+def encode_columns(columns: Dict[str, np.ndarray]) -> bytes:
+    """
+    ``CLASCOL1``, a little-endian uint32 header length, a JSON header
+    ``{"rows": n, "columns": [{"name", "dtype", "offset"}]}``, then each
+    column's raw little-endian values at its offset (8-byte aligned,
+    counted from the start of the data section).
+    """
+    meta, parts, offset = [], [], 0
+    for name, values in columns.items():
+        arr = np.ascontiguousarray(values)
+        arr = arr.astype(arr.dtype.newbyteorder("<"), copy=False)
+        meta.append({"name": name, "dtype": arr.dtype.str, "offset": offset})
+        raw = arr.tobytes()
+        pad = -len(raw) % 8
+        parts.append(raw + b"\0" * pad)
+        offset += len(raw) + pad
+
+    rows = len(next(iter(columns.values()))) if columns else 0
+    header = json.dumps({"rows": rows, "columns": meta}).encode()
+    return COLUMNS_MAGIC + _HEADER_LEN.pack(len(header)) + header + b"".join(parts)
+
+
+def decode_columns(payload: bytes) -> Dict[str, np.ndarray]:
+    if not payload.startswith(COLUMNS_MAGIC):
+        raise ValueError("Not a CLAS columnar payload")
+    start = len(COLUMNS_MAGIC)
+    (length,) = _HEADER_LEN.unpack_from(payload, start)
+    start += _HEADER_LEN.size
+    header = json.loads(payload[start:start + length])
+    data = memoryview(payload)[start + length:]
+
+    return {
+        col["name"]: np.frombuffer(data, dtype=col["dtype"], count=header["rows"], offset=col["offset"])
+        for col in header["columns"]
+    }
+
+
+# -------------------------
+# SERVICE
+# -------------------------
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def job_json(job: Job, seams: bool = True) -> dict:
+    out = {"id": job.id, "name": job.name, "status": job.status, "elapsed_s": round(job.elapsed, 3)}
+    if job.error is not None:
+        out["error"] = job.error
+    res = job.result
+    if res is not None:
+        out.update(
+            well=res["well"],
+            seam_count=res["seam_count"],
+            depth_min=_num(res["depth_min"]),
+            depth_max=_num(res["depth_max"]),
+        )
+        if seams:
+            out["seams"] = json.loads(res["seams"].to_json(orient="records"))
+    return out
+
+
+def _num(x) -> Optional[float]:
+    x = float(x)
+    return None if np.isnan(x) else x
+
+
+class Service:
+    def __init__(
+        self,
+        queue: JobQueue,
+        cfg: CLASConfig,
+        roots: Sequence[Path] = (),
+        max_upload: int = 512 * 1024**2,
+    ):
+        self.queue = queue
+        self.cfg = cfg
+        self.roots = [Path(r).resolve() for r in roots]
+        self.max_upload = max_upload
+
+    def config(self, override) -> CLASConfig:
+        if not override:
+            return self.cfg
+        try:
+            if isinstance(override, str):
+                override = json.loads(override)
+            cfg = CLASConfig.from_dict(override, base=self.cfg)
+            for value in (cfg.w_gr, cfg.w_dens, cfg.w_cal, cfg.w_stab, cfg.point_threshold, cfg.min_thickness):
+                float(value)
+        except (ValueError, TypeError, AttributeError) as exc:
+            raise HTTPError(400, f"Invalid config: {exc}")
+        return cfg
+
+    def read_path(self, raw: str) -> bytes:
+        path = Path(raw).resolve()
+        if not any(path.is_relative_to(root) for root in self.roots):
+            raise HTTPError(403, f"Path not under a served root: {raw}")
+        try:
+            return path.read_bytes()
+        except OSError as exc:
+            raise HTTPError(404, f"Cannot read {raw}: {exc.strerror}")
+
+    def submit(self, data: bytes, name: str, cfg: CLASConfig) -> Job:
+        try:
+            return self.queue.submit(data, name, cfg)
+        except QueueFull as exc:
+            raise HTTPError(429, str(exc))
+
+    def submit_batch(self, body: dict) -> List[Job]:
+        """Read and check every well before queueing any, so an error leaves no orphaned jobs."""
+        wells = body.get("wells")
+        if not isinstance(wells, list) or not wells:
+            raise HTTPError(400, "Expected a non-empty 'wells' list")
+        cfg = self.config(body.get("config"))
+
+        uploads = []
+        for item in wells:
+            if "path" in item:
+                uploads.append((self.read_path(item["path"]), Path(item["path"]).name))
+            elif "data" in item:
+                uploads.append((base64.b64decode(item["data"], validate=True), item.get("name", "upload.las")))
+            else:
+                raise HTTPError(400, "Each well needs 'path' or 'data'")
+
+        try:
+            return self.queue.submit_many(uploads, cfg)
+        except QueueFull as exc:
+            raise HTTPError(429, str(exc))
+
+    def job(self, job_id: str) -> Job:
+        job = self.queue.get(job_id)
+        if job is None:
+            raise HTTPError(404, f"Unknown job {job_id}")
+        return job
+
+    def wait(self, job: Job, timeout: float) -> None:
+        deadline = monotonic() + min(timeout, MAX_WAIT_S)
+        if job.future is not None:
+            wait_futures([job.future], timeout=max(deadline - monotonic(), 0))
+        # the done-callback stores the result just after the future completes
+        while job.pending and monotonic() < deadline:
+            sleep(0.01)
+
+    def samples(self, job: Job) -> bytes:
+        if job.status == FAILED:
+            raise HTTPError(409, job.error)
+        res = job.result
+        if res is None:
+            raise HTTPError(409, f"Job {job.id} is {job.status}")
+        log = res["log"]
+        return encode_columns({name: log[name] for name in log.columns})
+
+
+def make_handler(service: Service):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "clas"
+
+        def log_message(self, fmt, *args):
+            logger.debug(f"{self.address_string()} {fmt % args}")
+
+        # --------------------------------------------------
+        # responses
+        # --------------------------------------------------
+        def _send(self, status: int, body: bytes, content_type: str, headers: Optional[dict] = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, status: int, obj) -> None:
+            self._send(status, json.dumps(obj).encode(), "application/json")
+
+        def _handle(self, route) -> None:
+            try:
+                route(urlparse(self.path))
+            except HTTPError as exc:
+                headers = {"Retry-After": "1"} if exc.status == 429 else None
+                self._send(exc.status, json.dumps({"error": str(exc)}).encode(), "application/json", headers)
+            except Exception as exc:
+                logger.exception(f"{self.command} {self.path} failed")
+                self._json(500, {"error": f"{type(exc).__name__}: {exc}"})
+
+        def _body(self) -> bytes:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > service.max_upload:
+                raise HTTPError(413, f"Upload larger than {service.max_upload} bytes")
+            return self.rfile.read(length)
+
+        # --------------------------------------------------
+        # routes
+        # --------------------------------------------------
+        def do_GET(self):
+            self._handle(self._get)
+
+        def do_POST(self):
+            self._handle(self._post)
+
+        def _get(self, url) -> None:
+            query = parse_qs(url.query)
+            parts = [p for p in url.path.split("/") if p]
+
+            if parts == ["health"]:
+                return self._json(200, {
+                    "status": "ok",
+                    "workers": service.queue.workers,
+                    "pending": service.queue.pending(),
+                })
+
+            if parts == ["jobs"]:
+                ids = [i for v in query.get("ids", []) for i in v.split(",") if i]
+                return self._json(200, {"jobs": [job_json(j, seams=False) for j in service.queue.jobs(ids)]})
+
+            if len(parts) >= 2 and parts[0] == "jobs":
+                job = service.job(parts[1])
+                if "wait" in query:
+                    try:
+                        timeout = float(query["wait"][0])
+                        if not timeout >= 0 or timeout == float("inf"):
+                            raise ValueError
+                    except ValueError:
+                        raise HTTPError(400, f"Invalid wait: {query['wait'][0]!r}")
+                    service.wait(job, timeout)
+
+                if len(parts) == 2:
+                    return self._json(200, job_json(job))
+                if parts[2:] == ["samples"]:
+                    return self._send(200, service.samples(job), COLUMNS_TYPE)
+
+            raise HTTPError(404, f"No route for {url.path}")
+
+        def _post(self, url) -> None:
+            if url.path.rstrip("/") != "/jobs":
+                raise HTTPError(404, f"No route for {url.path}")
+
+            body = self._body()
+            if self.headers.get("Content-Type", "").startswith("application/json"):
+                try:
+                    jobs = service.submit_batch(json.loads(body))
+                except (ValueError, AttributeError) as exc:
+                    raise HTTPError(400, f"Invalid request: {exc}")
+                return self._json(202, {"jobs": [job_json(j, seams=False) for j in jobs]})
+
+            if not body:
+                raise HTTPError(400, "Empty upload")
+            query = parse_qs(url.query)
+            name = query.get("name", ["upload.las"])[0]
+            cfg = service.config(query.get("config", [None])[0])
+            self._json(202, job_json(service.submit(body, name, cfg), seams=False))
+
+    return Handler
+
+
+def make_server(service: Service, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+# -------------------------
+# CLI
+# -------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="clas serve",
+        description="Serve the C-LAS pipeline over HTTP on a warm worker pool.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--config", type=Path, metavar="YAML", help="Default CLAS configuration")
+    parser.add_argument("--workers", type=int, default=0, metavar="N", help="Worker processes (0 = one per CPU)")
+    parser.add_argument(
+        "--max-pending", type=int, default=256, metavar="N",
+        help="Queued + running jobs before new uploads get 429"
+    )
+    parser.add_argument(
+        "--root", type=Path, action="append", default=[], metavar="DIR",
+        help="Allow submitting LAS paths under DIR (repeatable)"
+    )
+    parser.add_argument("--max-upload-mb", type=float, default=512, metavar="MB", help="Largest accepted upload")
+    parser.add_argument("--cache-mb", type=float, default=1024, metavar="MB", help="Result cache size")
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    parser.add_argument("--quiet", action="store_true", help="Suppress non-error output")
+
+    args = parser.parse_args(argv)
+    if args.workers < 0 or args.max_pending < 1:
+        parser.error("--workers must be >= 0 and --max-pending >= 1")
+    return args
+
+
+def main(argv=None) -> None:
+    from core.cli import setup_logging
+    from core.memcache import MemoryCache
+
+    args = parse_args(argv)
+    setup_logging(args.verbose, args.quiet)
+
+    cfg = CLASConfig.from_yaml(args.config) if args.config else CLASConfig()
+    queue = JobQueue(
+        workers=args.workers,
+        cache=MemoryCache(max_bytes=int(args.cache_mb * 1024**2)),
+        max_pending=args.max_pending,
+    )
+    queue.warm()
+
+    service = Service(queue, cfg, roots=args.root, max_upload=int(args.max_upload_mb * 1024**2))
+    server = make_server(service, args.host, args.port)
+    logger.info(f"Serving on http://{args.host}:{server.server_port} with {queue.workers} worker(s)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        queue.shutdown(wait=False)
+        logger.info("Server stopped")
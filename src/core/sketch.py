@@ -0,0 +1,79 @@
+"""
+Mergeable quantile sketch for streaming statistics.
+
+A compactor stack in the style of KLL: level ``h`` holds values that each
+stand for ``2**h`` samples. When a level outgrows ``k`` items it is
+sorted and every other item (alternating offset) is promoted, so memory
+stays at ``O(k log(n / k))`` however many values are fed in. Until the
+first compaction the sketch is exact and answers like ``np.percentile``.
+"""
+from typing import List
+
+import numpy as np
+
+
+class QuantileSketch:
+    def __init__(self, k: int = 8192):
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._offset = 0
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+
+        self.count += len(values)
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate((self.levels[h], items))
+        self.count += other.count
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                keep = items[len(items) - len(items) % 2:]
+                pairs = items[:len(items) - len(items) % 2]
+
+                promoted = pairs[self._offset::2]
+                self._offset ^= 1
+
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate((self.levels[h + 1], promoted))
+            h += 1
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def percentile(self, q):
+        """Approximate ``np.nanpercentile`` of everything fed in so far."""
+        q = np.asarray(q, dtype=np.float64)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        if self.exact:
+            return np.percentile(self.levels[0], q)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+
+        ranks = q / 100.0 * (cum[-1] - 1)
+        idx = np.searchsorted(cum, ranks, side="right")
+        return items[np.minimum(idx, len(items) - 1)]
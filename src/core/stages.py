@@ -0,0 +1,123 @@
+"""
+Pipeline stages and memoization of their outputs.
+
+After ``read_las`` / ``auto_trim`` a well goes through four stages, each
+reading only some config fields:
+
+    subscores  neighbor_window                       normalized sub-scores
+    clas       w_gr, w_dens, w_stab, w_cal,          weighted CLAS
+               min_effective_weight
+    is_coal    point_threshold                       2-of-3 coal voting
+    seams      min_thickness, point_threshold,       seam table
+               max_no_data_run
+
+A stage's key hashes its own fields, the code version and the key of the
+stage before it, with the LAS cache key of the file at the root. When a LAS
+cache is in use (``--cache-dir``), the ``subscores`` and ``clas`` outputs
+are stored there next to the parsed curves, and share its size cap and LRU
+eviction. A rerun then starts from the last stage whose key is unchanged.
+For example, after editing only seam thresholds, it reads the cached
+curves and CLAS and recomputes only the voting and the seams.
+"""
+from dataclasses import dataclass, fields
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from core import __version__
+from core.cache import LasCache
+from core.config import CLASConfig
+from core.scoring import SubScores, combine_scores, compute_subscores, curve_array
+
+logger = logging.getLogger(__name__)
+
+# bump when a stage's output changes for the same inputs
+STAGE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fields: Tuple[str, ...]  # CLASConfig fields the stage reads
+    persisted: bool = False
+
+    def key(self, cfg: CLASConfig, upstream: str) -> str:
+        params = {f: getattr(cfg, f) for f in self.fields}
+        payload = json.dumps([STAGE_VERSION, __version__, self.name, upstream, params], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+SUBSCORES = Stage("subscores", ("neighbor_window",), persisted=True)
+CLAS = Stage("clas", ("w_gr", "w_dens", "w_stab", "w_cal", "min_effective_weight"), persisted=True)
+IS_COAL = Stage("is_coal", ("point_threshold",))
+SEAMS = Stage("seams", ("min_thickness", "point_threshold", "max_no_data_run"))
+
+STAGES = (SUBSCORES, CLAS, IS_COAL, SEAMS)
+
+
+def stage_keys(cfg: CLASConfig, source: str) -> Dict[str, str]:
+    """Key of every stage for the well whose LAS cache key is ``source``."""
+    keys = {}
+    upstream = source
+    for stage in STAGES:
+        upstream = keys[stage.name] = stage.key(cfg, upstream)
+    return keys
+
+
+_BOOL_FIELDS = ("has_gr", "has_dens", "has_cal")
+
+
+class StageMemo:
+    """Persisted stage outputs of one well, stored as entries of a ``LasCache``."""
+
+    def __init__(self, cache: LasCache, source: str, name: str = ""):
+        self.cache = cache
+        self.source = source
+        self.name = name
+
+    @classmethod
+    def for_file(cls, cache: LasCache, path) -> "StageMemo":
+        return cls(cache, cache.key_for(path), str(path))
+
+    def _get(self, key: str, rows: int) -> Optional[pd.DataFrame]:
+        hit = self.cache.get(self.cache.key_for_digest(key))
+        if hit is None or len(hit[0]) != rows:
+            return None
+        return hit[0]
+
+    def _put(self, stage: Stage, key: str, columns: Dict[str, np.ndarray]) -> None:
+        try:
+            self.cache.put(self.cache.key_for_digest(key), pd.DataFrame(columns), stage.name, source=f"{self.name}:{stage.name}")
+        except OSError as exc:
+            logger.warning(f"Could not store {stage.name} for {self.name}: {exc}")
+
+    def subscores(self, df: pd.DataFrame, cfg: CLASConfig, key: str) -> Tuple[SubScores, bool]:
+        hit = self._get(key, len(df))
+        if hit is not None:
+            values = {
+                f.name: hit[f.name].to_numpy(dtype=bool if f.name in _BOOL_FIELDS else None)
+                for f in fields(SubScores)
+            }
+            values["votes"] = values["votes"].astype(np.int8)
+            return SubScores(**values), True
+
+        sub = compute_subscores(*(curve_array(df, c) for c in ("GR", "LD", "SD", "CL")), cfg)
+        self._put(SUBSCORES, key, {f.name: getattr(sub, f.name) for f in fields(SubScores)})
+        return sub, False
+
+    def clas(self, df: pd.DataFrame, cfg: CLASConfig) -> Tuple[np.ndarray, Optional[str]]:
+        """CLAS for ``df`` and the name of the last stage reused from the store (None: computed)."""
+        keys = stage_keys(cfg, self.source)
+
+        hit = self._get(keys[CLAS.name], len(df))
+        if hit is not None:
+            return hit["CLAS"].to_numpy(copy=True), CLAS.name
+
+        sub, reused = self.subscores(df, cfg, keys[SUBSCORES.name])
+        clas = combine_scores(sub, cfg)
+        self._put(CLAS, keys[CLAS.name], {"CLAS": clas})
+        return clas, SUBSCORES.name if reused else None
@@ -0,0 +1,254 @@
+"""
+Bounded-memory scoring for very long logs.
+
+The data section is read in byte blocks, twice:
+
+1. a statistics pass feeds quantile sketches with GR, density, caliper,
+   the GR rolling std and the depth steps, giving the whole-well
+   normalization bounds, stability reference and depth step;
+2. a scoring pass runs the regular scoring kernel on each block plus an
+   overlap of neighbouring rows, so centered windows see exactly the rows
+   they would in a whole-well run, and emits CLAS / IS_COAL and any seams
+   closed so far.
+
+Peak memory is a few blocks plus the rows of a seam still open at the
+block edge, independent of log length.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from core.config import CLASConfig
+from core.io import resolve_curves
+from core.lasreader import BLOCK_BYTES, UnsupportedLAS, iter_blocks, parse_block, read_header
+from core.preprocessing import DEPTH_STEP
+from core.profiling import NULL_PROFILER
+from core.scoring import (
+    NormStats,
+    combine_scores,
+    compute_subscores,
+    density_curve,
+    flag_coal,
+    rolling_std,
+    score_halo,
+)
+from core.seams import seam_bounds, seam_table
+from core.sketch import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+CURVES = ("DEPT", "GR", "LD", "SD", "CL")
+
+Block = Dict[str, np.ndarray]
+
+
+@dataclass(frozen=True)
+class ScoredChunk:
+    samples: pd.DataFrame
+    seams: pd.DataFrame
+
+
+def _read_blocks(las_path: Path, block_bytes: int) -> Iterator[Block]:
+    """Yield depth-trimmed curve blocks; raises UnsupportedLAS on unsorted depth."""
+    with open(las_path, "rb") as f:
+        header = read_header(f)
+        curves = resolve_curves(header.curves)
+        if "DEPT" not in curves:
+            raise ValueError("Depth column not found in LAS file")
+
+        usecols = [header.curves.index(curves.get(c, curves["DEPT"])) for c in CURVES]
+        last_depth = -np.inf
+
+        for raw in iter_blocks(f, block_bytes):
+            data = parse_block(raw, len(header.curves), usecols)
+            data[data == header.null] = np.nan
+
+            block = {c: data[:, i] for i, c in enumerate(CURVES)}
+            for c in CURVES:
+                if c not in curves:
+                    block[c] = np.full(len(data), np.nan)
+
+            keep = ~np.isnan(block["DEPT"])
+            if not keep.all():
+                block = {c: v[keep] for c, v in block.items()}
+
+            depth = block["DEPT"]
+            if len(depth):
+                if depth[0] < last_depth or np.any(depth[1:] < depth[:-1]):
+                    raise UnsupportedLAS("Depth is not increasing; streaming needs sorted logs")
+                last_depth = depth[-1]
+                yield block
+
+
+def _with_overlap(blocks: Iterator[Block], halo: int) -> Iterator[Tuple[Block, int, int]]:
+    """
+    Re-chunk blocks so every emitted row has ``halo`` rows of context.
+
+    Yields ``(ext, lo, hi)``: rows ``lo:hi`` of ``ext`` are final, and
+    ``ext`` extends at least ``halo`` rows beyond them on each side unless
+    the log ends there.
+    """
+    carry: Optional[Block] = None
+    emitted = 0  # rows of carry already emitted
+
+    for block in blocks:
+        ext = block if carry is None else {
+            c: np.concatenate((carry[c], block[c])) for c in block
+        }
+        n = len(ext["DEPT"])
+        hi = max(emitted, n - halo)
+
+        if hi > emitted:
+            yield ext, emitted, hi
+
+        start = max(0, hi - halo)
+        carry = {c: v[start:] for c, v in ext.items()}
+        emitted = hi - start
+
+    if carry is not None and len(carry["DEPT"]) > emitted:
+        yield carry, emitted, len(carry["DEPT"])
+
+
+def _bounds(sketch: QuantileSketch, pmin=5, pmax=95):
+    lo, hi = sketch.percentile([pmin, pmax])
+    if not hi > lo:
+        return np.array([np.nan]), np.array([np.nan])
+    return np.array([lo]), np.array([hi])
+
+
+def scan_statistics(
+    las_path: Path,
+    block_bytes: int = BLOCK_BYTES,
+    sketch_size: int = 32768,
+) -> Tuple[NormStats, float]:
+    """First pass: whole-well normalization statistics and depth step."""
+    gr, dens, cal, std, steps = (QuantileSketch(sketch_size) for _ in range(5))
+    last_depth = np.nan
+
+    for ext, lo, hi in _with_overlap(_read_blocks(las_path, block_bytes), halo=2):
+        rows = slice(lo, hi)
+        gr.update(ext["GR"][rows])
+        dens.update(density_curve(ext["LD"][rows], ext["SD"][rows]))
+        cal.update(ext["CL"][rows])
+        std.update(rolling_std(ext["GR"], 5, min_periods=2)[rows])
+
+        depth = np.concatenate(([last_depth], ext["DEPT"][rows]))
+        d = np.diff(depth)
+        steps.update(d[d > 0])
+        last_depth = depth[-1]
+
+    stats = NormStats(
+        gr=_bounds(gr),
+        dens=_bounds(dens),
+        cal=_bounds(cal),
+        stab_ref=std.percentile([50.0]),
+    )
+    step = float(steps.percentile(50.0)) if steps.count else DEPTH_STEP
+
+    return stats, step
+
+
+def stream_well(
+    las_path: Path,
+    cfg: CLASConfig,
+    block_bytes: int = BLOCK_BYTES,
+    sketch_size: int = 32768,
+) -> Tuple[str, Iterator[ScoredChunk]]:
+    """
+    Score a LAS file block by block.
+
+    Returns the well name and an iterator of scored chunks; each chunk
+    carries its samples with CLAS / IS_COAL and the seams that closed
+    inside it. Statistics are gathered eagerly, so unsupported files
+    raise UnsupportedLAS here rather than mid-iteration. Percentiles are
+    exact up to ``sketch_size`` samples and approximate beyond.
+    """
+    with open(las_path, "rb") as f:
+        header = read_header(f)
+    well = header.well["WELL"] if "WELL" in header.well else las_path.stem
+
+    stats, step = scan_statistics(las_path, block_bytes, sketch_size)
+
+    halo = score_halo(cfg)
+
+    def chunks() -> Iterator[ScoredChunk]:
+        open_rows: Optional[Block] = None
+
+        for ext, lo, hi in _with_overlap(_read_blocks(las_path, block_bytes), halo):
+            sub = compute_subscores(ext["GR"], ext["LD"], ext["SD"], ext["CL"], cfg, stats)
+            clas = combine_scores(sub, cfg)
+            is_coal = flag_coal(clas, cfg.point_threshold)
+
+            rows = slice(lo, hi)
+            samples = {c: ext[c][rows] for c in CURVES}
+            samples["CLAS"] = clas[rows]
+            samples["IS_COAL"] = is_coal[rows]
+
+            # carry the rows of a still-open seam zone into the next chunk
+            buf = samples if open_rows is None else {
+                c: np.concatenate((open_rows[c], samples[c])) for c in ("DEPT", "CLAS", "IS_COAL")
+            }
+            starts, ends, open_start = seam_bounds(
+                buf["IS_COAL"], np.isnan(buf["CLAS"]), step, cfg.max_no_data_run
+            )
+            seams = seam_table(buf["DEPT"], buf["CLAS"], starts, ends, step, cfg)
+
+            open_rows = None if open_start < 0 else {
+                c: buf[c][open_start:] for c in ("DEPT", "CLAS", "IS_COAL")
+            }
+
+            yield ScoredChunk(samples=pd.DataFrame(samples), seams=seams)
+
+    return well, chunks()
+
+
+def process_well_streaming(
+    las_path: Path,
+    cfg: CLASConfig,
+    block_bytes: int = BLOCK_BYTES,
+    profiler=NULL_PROFILER,
+) -> dict:
+    """
+    Streaming counterpart of ``process_well``.
+
+    Per-sample results are not kept (``df`` is None); files the native
+    reader cannot stream fall back to the in-memory pipeline.
+    """
+    from core.process import process_well
+
+    try:
+        with profiler.stage("scan_statistics"):
+            well, chunks = stream_well(las_path, cfg, block_bytes)
+    except UnsupportedLAS as exc:
+        logger.warning(f"{las_path.name}: {exc}; processing in memory")
+        return process_well(las_path, cfg, profiler=profiler)
+
+    seams = []
+    depth_min, depth_max = np.nan, np.nan
+
+    with profiler.stage("score_chunks") as rec:
+        rows = 0
+        for chunk in chunks:
+            if not chunk.seams.empty:
+                seams.append(chunk.seams)
+            depth = chunk.samples["DEPT"]
+            rows += len(depth)
+            if len(depth):
+                depth_min = depth.iloc[0] if np.isnan(depth_min) else depth_min
+                depth_max = depth.iloc[-1]
+        rec["rows"] = rows
+
+    seams = pd.concat(seams, ignore_index=True) if seams else pd.DataFrame()
+
+    return {
+        "well": well,
+        "df": None,
+        "seams": seams,
+        "seam_count": len(seams),
+        "depth_min": depth_min,
+        "depth_max": depth_max,
+    }
@@ -0,0 +1,246 @@
+"""
+Parameter sweeps over CLASConfig grids.
+
+Each well is read, trimmed and scored into sub-scores once; every
+weight / threshold combination is then evaluated as one broadcast array
+operation over (configs x samples), followed by seam extraction per
+config. Only ``neighbor_window`` changes the sub-scores themselves, so
+configs are grouped by it.
+
+    clas sweep --las-dir wells/ --grid grid.yaml --output sweep_out
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields, replace
+from itertools import product
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from core.cache import LasCache
+from core.config import CLASConfig
+from core.io import read_las
+from core.preprocessing import auto_trim, infer_depth_step
+from core.scoring import combine_scores, compute_subscores, curve_array, flag_coal
+from core.seams import seam_bounds, seam_table
+
+logger = logging.getLogger("clas")
+
+# cap on configs x samples evaluated at once (float64 elements)
+MAX_BATCH_ELEMENTS = 8_000_000
+
+FIELD_TYPES = {f.name: f.type for f in fields(CLASConfig)}
+
+
+def expand_grid(base: CLASConfig, grid: Dict[str, Sequence]) -> List[CLASConfig]:
+    """Cartesian product of the grid values applied on top of ``base``."""
+    for name in grid:
+        if name not in FIELD_TYPES:
+            raise ValueError(f"Unknown CLASConfig field in grid: {name}")
+
+    names = list(grid)
+    cast = [int if FIELD_TYPES[n] in (int, "int") else float for n in names]
+
+    return [
+        replace(base, **{n: c(v) for n, c, v in zip(names, cast, values)})
+        for values in product(*(grid[n] for n in names))
+    ]
+
+
+def _stack(configs: Sequence[CLASConfig]) -> SimpleNamespace:
+    """Config fields as (n_configs, 1) columns that broadcast over samples."""
+    return SimpleNamespace(**{
+        name: np.array([[getattr(c, name)] for c in configs], dtype=np.float64)
+        for name in FIELD_TYPES
+    })
+
+
+def sweep_frame(df: pd.DataFrame, configs: Sequence[CLASConfig]) -> pd.DataFrame:
+    """Seam statistics of one trimmed well for every config, in config order."""
+    depth = df["DEPT"].to_numpy(dtype=np.float64)
+    curves = [curve_array(df, c) for c in ("GR", "LD", "SD", "CL")]
+    step = infer_depth_step(df)
+    n = max(len(df), 1)
+
+    rows: List[Optional[dict]] = [None] * len(configs)
+    groups: Dict[int, List[int]] = {}
+    for i, cfg in enumerate(configs):
+        groups.setdefault(cfg.neighbor_window, []).append(i)
+
+    for members in groups.values():
+        sub = compute_subscores(*curves, configs[members[0]])
+        batch = max(1, MAX_BATCH_ELEMENTS // n)
+
+        for b in range(0, len(members), batch):
+            idx = members[b:b + batch]
+            grid = _stack([configs[i] for i in idx])
+
+            clas = combine_scores(sub, grid)
+            is_coal = flag_coal(clas, grid.point_threshold)
+            clas_nan = np.isnan(clas)
+
+            for k, i in enumerate(idx):
+                cfg = configs[i]
+                starts, ends, _ = seam_bounds(is_coal[k], clas_nan[k], step, cfg.max_no_data_run)
+                seams = seam_table(depth, clas[k], starts, ends, step, cfg)
+
+                rows[i] = {
+                    "seam_count": len(seams),
+                    "total_thickness": float(seams["THICKNESS"].sum()) if len(seams) else 0.0,
+                    "max_thickness": float(seams["THICKNESS"].max()) if len(seams) else 0.0,
+                    "mean_coal_conf": float(seams["COAL_CONF"].mean()) if len(seams) else np.nan,
+                    "coal_fraction": float(is_coal[k].mean()) if len(df) else 0.0,
+                }
+
+    return pd.DataFrame(rows)
+
+
+def sweep_las(las_path: Path, configs: Sequence[CLASConfig], cache: Optional[LasCache] = None) -> pd.DataFrame:
+    df, well = read_las(las_path, cache=cache)
+    df = auto_trim(df)
+
+    table = sweep_frame(df, configs)
+    table.insert(0, "config_id", range(len(configs)))
+    table.insert(0, "well", well)
+    table.insert(0, "las_file", las_path.name)
+    return table
+
+
+def run_sweep(
+    las_files: Sequence[Path],
+    configs: Sequence[CLASConfig],
+    jobs: int = 1,
+    cache: Optional[LasCache] = None,
+) -> pd.DataFrame:
+    """Per-well, per-config seam table for a set of LAS files."""
+    if jobs > 1 and len(las_files) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            tables = list(pool.map(sweep_las, las_files, [configs] * len(las_files), [cache] * len(las_files)))
+    else:
+        tables = [sweep_las(p, configs, cache) for p in las_files]
+
+    return pd.concat(tables, ignore_index=True)
+
+
+# -------------------------
+# CLI
+# -------------------------
+def _parse_values(text: str) -> List[float]:
+    """'0.3,0.4,0.5' or an inclusive range 'start:stop:step'."""
+    if ":" in text:
+        parts = text.split(":")
+        if len(parts) != 3:
+            raise ValueError(f"range {text!r} must be start:stop:step")
+        start, stop, step = (float(v) for v in parts)
+        if step == 0 or (stop - start) * step < 0:
+            raise ValueError(f"range {text!r} needs a non-zero step going from start to stop")
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 10) for i in range(count)]
+    return [float(v) for v in text.split(",") if v]
+
+
+def load_grid(path: Optional[Path], overrides: Sequence[str]) -> Dict[str, List[float]]:
+    grid: Dict[str, List[float]] = {}
+
+    if path is not None:
+        import yaml
+
+        with path.open("r") as f:
+            raw = yaml.safe_load(f) or {}
+        raw = raw.get("grid", raw)
+        for name, values in raw.items():
+            grid[name] = [values] if np.isscalar(values) else list(values)
+
+    for item in overrides:
+        name, sep, values = item.partition("=")
+        if not sep:
+            raise ValueError(f"--set expects NAME=VALUES, got {item!r}")
+        grid[name.strip()] = _parse_values(values)
+
+    return grid
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="clas sweep",
+        description="Evaluate a grid of CLAS weights / thresholds on LAS files.",
+    )
+
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument("--las", nargs="+", metavar="FILE", help="Path to LAS file")
+    input_group.add_argument("--las-dir", metavar="DIR", help="Path to LAS directory")
+
+    parser.add_argument("--grid", type=Path, metavar="YAML", help="YAML mapping of field -> list of values")
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="NAME=VALUES",
+        help="Sweep a field over 'a,b,c' or 'start:stop:step' (repeatable)"
+    )
+    parser.add_argument("--config", type=Path, metavar="YAML", help="Base CLAS configuration")
+    parser.add_argument("--output", default="outputs", metavar="DIR", help="Directory for sweep tables")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N", help="Worker processes (0 = one per CPU)")
+    parser.add_argument("--cache-dir", type=Path, metavar="DIR", help="Cache parsed LAS curves in DIR")
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    parser.add_argument("--quiet", action="store_true", help="Suppress non-error output")
+
+    args = parser.parse_args(argv)
+    if not args.grid and not args.set:
+        parser.error("give a --grid file and/or --set NAME=VALUES")
+    try:
+        load_grid(None, args.set)
+    except ValueError as exc:
+        parser.error(str(exc))
+    return args
+
+
+def main(argv=None) -> None:
+    import os
+    from core.cli import setup_logging
+
+    args = parse_args(argv)
+    setup_logging(args.verbose, args.quiet)
+
+    if args.las:
+        las_files = [Path(p).resolve() for p in args.las]
+    else:
+        las_files = sorted(Path(args.las_dir).glob("*.las"))
+    if not las_files:
+        raise SystemExit("No LAS files found")
+
+    base = CLASConfig.from_yaml(args.config) if args.config else CLASConfig()
+    try:
+        configs = expand_grid(base, load_grid(args.grid, args.set))
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+
+    cache = LasCache(args.cache_dir.resolve()) if args.cache_dir else None
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(las_files)))
+
+    logger.info(f"Sweeping {len(configs)} config(s) over {len(las_files)} well(s)")
+    start = perf_counter()
+
+    table = run_sweep(las_files, configs, jobs=jobs, cache=cache)
+
+    params = pd.DataFrame([asdict(c) for c in configs])
+    params.insert(0, "config_id", range(len(configs)))
+    table = table.merge(params, on="config_id")
+
+    summary = table.groupby("config_id").agg(
+        wells=("well", "count"),
+        seams=("seam_count", "sum"),
+        total_thickness=("total_thickness", "sum"),
+        mean_coal_conf=("mean_coal_conf", "mean"),
+    ).reset_index().merge(params, on="config_id")
+
+    out = Path(args.output).resolve()
+    out.mkdir(parents=True, exist_ok=True)
+    table.to_csv(out / "sweep.csv", index=False)
+    summary.to_csv(out / "sweep_configs.csv", index=False)
+
+    elapsed = perf_counter() - start
+    logger.info(f"✔ Evaluated {len(configs) * len(las_files)} well-config pair(s) in {elapsed:.2f}s")
+    logger.info(f"✔ Tables written to {out}")
@@ -1,13 +1,38 @@
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional, Tuple
 import pandas as pd
 
+from core.welllog import WellLog
+
 @dataclass(frozen=True)
 class PipelineResult:
     well: str
-    df: pd.DataFrame
+    log: Optional[WellLog]  # None for streamed wells
     seams: pd.DataFrame
     seam_count: int
     depth_min: float
     depth_max: float
-    output_dir: Path
\ No newline at end of file
+    output_dir: Path
+
+    @property
+    def df(self) -> Optional[pd.DataFrame]:
+        return None if self.log is None else self.log.to_pandas()
+
+@dataclass(frozen=True)
+class WellOutcome:
+    las_path: Path
+    output_dir: Path
+    elapsed: float
+    well: Optional[str] = None
+    seam_count: int = 0
+    outputs: Tuple[Path, ...] = ()
+    seams: Optional[pd.DataFrame] = None
+    depth_min: Optional[float] = None
+    depth_max: Optional[float] = None
+    profile: Tuple[dict, ...] = ()
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
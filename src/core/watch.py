@@ -0,0 +1,468 @@
+"""
+`clas watch DIR`: process LAS files as they land in a directory.
+
+New or modified ``*.las`` files are picked up through inotify (or by
+polling, for network shares whose writes inotify does not see), held back
+until they stop changing, and scored on a pool of worker processes that
+are started, and have imported the pipeline, before the first file
+arrives. Outputs, the manifest and the optional catalog are written the
+same way as by the batch CLI, so a file already processed by either one
+is skipped while unchanged.
+"""
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import signal
+import struct
+import threading
+
+logger = logging.getLogger("clas")
+
+# inotify(7)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_Q_OVERFLOW = 0x4000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+# seconds a file must stay unchanged after a close-write / any other change
+SETTLE_S = 0.2
+QUIET_S = 2.0
+
+
+def _is_las(name: str) -> bool:
+    return name.lower().endswith(".las")
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+# -------------------------
+# WATCHERS
+# -------------------------
+class InotifyWatcher:
+    """Directory events from inotify; ``poll`` returns (path, closed) pairs."""
+
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+        self.overflowed = False
+
+    def poll(self, timeout: float) -> List[Tuple[Path, bool]]:
+        ready, _, _ = select.select([self._fd], [], [], max(timeout, 0.0))
+        if not ready:
+            return []
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(buf):
+            _, mask, _, length = _EVENT.unpack_from(buf, offset)
+            offset += _EVENT.size
+            name = buf[offset:offset + length].rstrip(b"\0").decode(errors="surrogateescape")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # events were dropped; the caller rescans the directory
+                self.overflowed = True
+            elif name and _is_las(name):
+                events.append((self.directory / name, bool(mask & (IN_CLOSE_WRITE | IN_MOVED_TO))))
+        return events
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Directory changes found by comparing file sizes / mtimes every ``interval`` seconds."""
+
+    def __init__(self, directory: Path, interval: float = 1.0):
+        self.directory = directory
+        self.interval = interval
+        self.overflowed = False
+        self._seen = self._scan()
+        self._next = monotonic() + interval
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        seen = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                try:
+                    if _is_las(entry.name) and entry.is_file():
+                        st = entry.stat()
+                        seen[Path(entry.path)] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    # removed or renamed while scanning
+                    continue
+        return seen
+
+    def poll(self, timeout: float) -> List[Tuple[Path, bool]]:
+        wait = min(timeout, self._next - monotonic())
+        if wait > 0:
+            sleep(wait)
+        if monotonic() < self._next:
+            return []
+
+        self._next = monotonic() + self.interval
+        seen = self._scan()
+        changed = [(p, False) for p, sig in seen.items() if self._seen.get(p) != sig]
+        self._seen = seen
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(directory: Path, poll: bool = False, interval: float = 1.0):
+    if not poll:
+        try:
+            return InotifyWatcher(directory)
+        except OSError as exc:
+            logger.warning(f"inotify unavailable ({exc}); polling every {interval:g}s")
+    return PollingWatcher(directory, interval)
+
+
+class Debouncer:
+    """
+    Holds changed files back until they stop changing: ``settle`` seconds
+    after a close-write, ``quiet`` seconds after any other change, and in
+    either case only once size and mtime match the last look.
+    """
+
+    def __init__(self, quiet: float = QUIET_S, settle: float = SETTLE_S):
+        self.quiet = quiet
+        self.settle = settle
+        self._pending: Dict[Path, Tuple[float, Optional[Tuple[int, int]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def touch(self, path: Path, closed: bool = False, now: Optional[float] = None) -> None:
+        now = monotonic() if now is None else now
+        self._pending[path] = (now + (self.settle if closed else self.quiet), _signature(path))
+
+    def next_deadline(self) -> Optional[float]:
+        return min((d for d, _ in self._pending.values()), default=None)
+
+    def ready(self, now: Optional[float] = None) -> List[Path]:
+        now = monotonic() if now is None else now
+        out = []
+        for path, (deadline, sig) in list(self._pending.items()):
+            if deadline > now:
+                continue
+            current = _signature(path)
+            if current is None:
+                # removed or renamed away before it settled
+                del self._pending[path]
+            elif current != sig:
+                self._pending[path] = (now + self.quiet, current)
+            else:
+                del self._pending[path]
+                out.append(path)
+        return out
+
+
+# -------------------------
+# DAEMON
+# -------------------------
+class WatchDaemon:
+    def __init__(
+        self,
+        directory: Path,
+        cfg,
+        output_root: Path,
+        *,
+        jobs: int = 2,
+        save_plot: bool = False,
+        export: Optional[str] = None,
+        catalog=None,
+        poll: bool = False,
+        interval: float = 1.0,
+        quiet: float = QUIET_S,
+        settle: float = SETTLE_S,
+        on_outcome: Optional[Callable] = None,
+    ):
+        from core.manifest import Manifest, run_options
+
+        self.directory = directory
+        self.cfg = cfg
+        self.output_root = output_root
+        self.jobs = jobs
+        self.save_plot = save_plot
+        self.export = export
+        self.catalog = catalog
+        self.on_outcome = on_outcome
+
+        self.options = run_options(save_plot=save_plot, export=export)
+
+        self.manifest = Manifest.in_dir(output_root)
+        self.watcher = make_watcher(directory, poll, interval)
+        self.debouncer = Debouncer(quiet, settle)
+        self.stop_event = threading.Event()
+        self._inflight: Dict[Path, Future] = {}
+        self._changed_while_running: set = set()
+        self._crashes: Dict[Path, int] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start_pool(self) -> None:
+        from core.batch import warm_worker, worker_ready
+
+        start = monotonic()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=warm_worker,
+            initargs=(logging.getLogger().getEffectiveLevel(), self.save_plot),
+        )
+        # one task per worker starts them all now rather than on the first file
+        pids = {f.result() for f in [self._pool.submit(worker_ready) for _ in range(self.jobs)]}
+        logger.info(f"{len(pids)} worker(s) ready in {monotonic() - start:.2f}s")
+
+    def scan(self) -> None:
+        """Queue every LAS file in the directory (up-to-date ones are skipped on dispatch)."""
+        for path in sorted(self.directory.iterdir()):
+            if _is_las(path.name) and path.is_file():
+                self.debouncer.touch(path, closed=True)
+
+    def dispatch(self, path: Path) -> None:
+        from core.batch import process_las_captured
+
+        if path in self._inflight:
+            self._changed_while_running.add(path)
+            return
+        if self.manifest.is_current(path, self.cfg, self.options):
+            logger.debug(f"{path.name} is up to date")
+            return
+
+        logger.info(f"Queued {path.name}")
+        def submit() -> Future:
+            return self._pool.submit(
+                process_las_captured, path, self.cfg, self.output_root,
+                save_plot=self.save_plot, export=self.export,
+            )
+
+        try:
+            self._inflight[path] = submit()
+        except BrokenProcessPool:
+            self.restart_pool()
+            self._inflight[path] = submit()
+
+    def restart_pool(self) -> None:
+        logger.warning("A worker process died; restarting the worker pool")
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self.start_pool()
+
+    def collect(self) -> None:
+        from core.batch import MAX_CRASHES
+
+        crashed = []
+        for path, future in list(self._inflight.items()):
+            if not future.done():
+                continue
+            del self._inflight[path]
+
+            try:
+                outcome, records = future.result()
+            except BrokenProcessPool:
+                crashed.append(path)
+                continue
+            except Exception as exc:
+                logger.error(f"✘ Worker failed on {path.name}: {exc}")
+                continue
+
+            self._crashes.pop(path, None)
+            for record in records:
+                logging.getLogger(record.name).handle(record)
+            self.finish(outcome)
+
+            if path in self._changed_while_running:
+                self._changed_while_running.discard(path)
+                self.debouncer.touch(path)
+
+        if crashed and self._pool is not None:
+            # every file in flight fails with the pool; retry them on a fresh one
+            self.restart_pool()
+            for path in crashed:
+                self._crashes[path] = self._crashes.get(path, 0) + 1
+                if self._crashes[path] > MAX_CRASHES:
+                    logger.error(f"✘ {path.name} took down a worker {self._crashes[path]} times; skipping it")
+                    continue
+                self._changed_while_running.discard(path)
+                self.debouncer.touch(path, closed=True)
+
+    def finish(self, outcome) -> None:
+        if outcome.ok:
+            if self.catalog is not None:
+                from core.io import read_well_info
+
+                self.catalog.add_well(
+                    outcome.las_path,
+                    self.cfg.fingerprint(),
+                    outcome.seams,
+                    read_well_info(outcome.las_path),
+                    depth_range=(outcome.depth_min, outcome.depth_max),
+                )
+            self.manifest.record(outcome, self.cfg, self.options)
+            logger.info(
+                f"✔ {outcome.las_path.name}: {outcome.well}, {outcome.seam_count} seam(s) "
+                f"in {outcome.elapsed:.2f}s -> {outcome.output_dir}"
+            )
+
+        if self.on_outcome is not None:
+            self.on_outcome(outcome)
+
+    def run(self, initial_scan: bool = True) -> None:
+        if self._pool is None:
+            self.start_pool()
+        if initial_scan:
+            self.scan()
+
+        logger.info(f"Watching {self.directory} (Ctrl+C to stop)")
+        try:
+            while not self.stop_event.is_set():
+                timeout = 0.5
+                deadline = self.debouncer.next_deadline()
+                if deadline is not None:
+                    timeout = min(timeout, max(deadline - monotonic(), 0.0))
+                if self._inflight:
+                    timeout = min(timeout, 0.05)
+
+                for path, closed in self.watcher.poll(timeout):
+                    self.debouncer.touch(path, closed)
+                if self.watcher.overflowed:
+                    logger.warning("Watch event queue overflowed; rescanning")
+                    self.watcher.overflowed = False
+                    self.scan()
+
+                for path in self.debouncer.ready():
+                    self.dispatch(path)
+                self.collect()
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self.collect()
+        self.watcher.close()
+
+
+# -------------------------
+# CLI
+# -------------------------
+def parse_args(argv=None):
+    from core.cli import add_export_arg
+
+    parser = argparse.ArgumentParser(
+        prog="clas watch",
+        description="Process LAS files as they are written into a directory.",
+    )
+    parser.add_argument("directory", type=Path, metavar="DIR", help="Directory to watch")
+    parser.add_argument("--config", type=Path, metavar="YAML", help="Path to CLAS configuration YAML file")
+    parser.add_argument("--output", default="outputs", metavar="DIR", help="Path to custom output directory")
+    parser.add_argument("--save-plot", action="store_true", help="Save the QC plot (png) for every well")
+    add_export_arg(parser, "Write per-sample results and seams per well (parquet, csv or json)")
+    parser.add_argument("--catalog", type=Path, metavar="DB", help="Add detected seams to a seam catalog")
+    parser.add_argument("--jobs", type=int, default=2, metavar="N", help="Worker processes kept warm")
+    parser.add_argument(
+        "--poll", action="store_true",
+        help="Poll for changes instead of using inotify (network shares)"
+    )
+    parser.add_argument("--interval", type=float, default=1.0, metavar="S", help="Polling interval")
+    parser.add_argument(
+        "--debounce", type=float, default=QUIET_S, metavar="S",
+        help="Wait until a file has not changed for S seconds (after a close-write: 0.2s)"
+    )
+    parser.add_argument(
+        "--no-initial-scan", action="store_true",
+        help="Ignore LAS files already in DIR at start-up"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Verbose logging")
+    parser.add_argument("--quiet", action="store_true", help="Suppress non-error output")
+
+    args = parser.parse_args(argv)
+
+    if not args.directory.is_dir():
+        parser.error(f"not a directory: {args.directory}")
+    if args.jobs < 1:
+        parser.error("--jobs must be >= 1")
+
+    return args
+
+
+def main(argv=None) -> None:
+    from core.cli import setup_logging
+    from core.config import CLASConfig
+
+    args = parse_args(argv)
+    setup_logging(args.verbose, args.quiet)
+
+    cfg = CLASConfig.from_yaml(args.config) if args.config else CLASConfig()
+    output_root = Path(args.output).resolve()
+    output_root.mkdir(parents=True, exist_ok=True)
+
+    catalog = None
+    if args.catalog:
+        from core.catalog import SeamCatalog
+
+        catalog = SeamCatalog(Path(args.catalog).resolve())
+
+    daemon = WatchDaemon(
+        args.directory.resolve(),
+        cfg,
+        output_root,
+        jobs=args.jobs,
+        save_plot=args.save_plot,
+        export=args.export,
+        catalog=catalog,
+        poll=args.poll,
+        interval=args.interval,
+        quiet=args.debounce,
+    )
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+
+    try:
+        daemon.run(initial_scan=not args.no_initial_scan)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if catalog is not None:
+            catalog.close()
+        logger.info("Stopped watching")
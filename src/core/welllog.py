@@ -0,0 +1,132 @@
+"""
+Compact container for a scored well.
+
+Results that outlive the pipeline (batch outputs, background jobs, the
+Streamlit cache) keep a ``WellLog`` instead of the working DataFrame: a
+regularly sampled depth column is stored as (top, step, decimals) when
+that rebuilds it exactly and as float64 otherwise, every other curve is
+one contiguous float32 array, IS_COAL is packed eight samples to a byte,
+and curves the pipeline does not use are dropped unless asked for.
+``to_pandas()`` returns a frame viewing the stored arrays for the
+plotting and export code.
+
+Scoring and seam extraction run on the float64 frame before it is
+compacted, so seam tables are unaffected by the narrower storage.
+"""
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# curves kept by default besides DEPT and IS_COAL
+KEEP_CURVES = ("GR", "LD", "SD", "CL", "CLAS")
+
+# decimal places tried when rebuilding depth from a regular grid
+MAX_DEPTH_DECIMALS = 6
+
+
+def depth_grid(depth: np.ndarray) -> Optional[Tuple[float, float, int]]:
+    """(top, step, decimals) that rebuild ``depth`` bit for bit, or None."""
+    n = len(depth)
+    if n < 3:
+        return None
+    top = float(depth[0])
+    step = (float(depth[-1]) - top) / (n - 1)
+    if not step > 0:
+        return None
+
+    head = min(n, 1000)
+    for decimals in range(MAX_DEPTH_DECIMALS + 1):
+        # cheap check on the first samples before rebuilding the whole column
+        if not np.array_equal(np.round(top + np.arange(head) * step, decimals), depth[:head]):
+            continue
+        if np.array_equal(_grid_depth(top, step, decimals, n), depth):
+            return top, step, decimals
+    return None
+
+
+def _grid_depth(top: float, step: float, decimals: int, n: int) -> np.ndarray:
+    return np.round(top + np.arange(n) * step, decimals)
+
+
+class WellLog:
+    __slots__ = ("_depth", "_grid", "_n", "curves", "_coal")
+
+    def __init__(
+        self,
+        depth: np.ndarray,
+        curves: Optional[Mapping[str, np.ndarray]] = None,
+        is_coal: Optional[np.ndarray] = None,
+    ):
+        depth = np.ascontiguousarray(depth, dtype=np.float64)
+        self._n = len(depth)
+        self._grid = depth_grid(depth)
+        self._depth = None if self._grid is not None else depth
+        self.curves: Dict[str, np.ndarray] = {
+            name: np.ascontiguousarray(values, dtype=np.float32)
+            for name, values in (curves or {}).items()
+        }
+        self._coal = None if is_coal is None else np.packbits(np.asarray(is_coal, dtype=bool))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, keep: Optional[Sequence[str]] = KEEP_CURVES) -> "WellLog":
+        """Compact ``df``; ``keep=None`` keeps every numeric curve."""
+        curves = {
+            name: df[name].to_numpy()
+            for name in df.columns
+            if name not in ("DEPT", "IS_COAL")
+            and (keep is None or name in keep)
+            and pd.api.types.is_numeric_dtype(df[name])
+        }
+        is_coal = df["IS_COAL"].to_numpy() if "IS_COAL" in df else None
+        return cls(df["DEPT"].to_numpy(), curves, is_coal)
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def depth(self) -> np.ndarray:
+        if self._grid is None:
+            return self._depth
+        return _grid_depth(*self._grid, self._n)
+
+    def __contains__(self, name: str) -> bool:
+        return name == "DEPT" or name in self.curves or (name == "IS_COAL" and self._coal is not None)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name == "DEPT":
+            return self.depth
+        if name == "IS_COAL" and self._coal is not None:
+            return self.is_coal
+        return self.curves[name]
+
+    def __repr__(self) -> str:
+        return f"WellLog({len(self)} rows, {', '.join(self.columns)}, {self.nbytes / 1024**2:.1f} MB)"
+
+    @property
+    def columns(self) -> List[str]:
+        return ["DEPT", *self.curves] + (["IS_COAL"] if self._coal is not None else [])
+
+    @property
+    def is_coal(self) -> Optional[np.ndarray]:
+        if self._coal is None:
+            return None
+        return np.unpackbits(self._coal, count=len(self)).view(bool)
+
+    @property
+    def nbytes(self) -> int:
+        depth = self._depth.nbytes if self._depth is not None else 0
+        coal = self._coal.nbytes if self._coal is not None else 0
+        return depth + sum(v.nbytes for v in self.curves.values()) + coal
+
+    def to_pandas(self) -> pd.DataFrame:
+        """A DataFrame viewing the stored curves (DEPT on a grid and IS_COAL are unpacked)."""
+        return pd.DataFrame({name: self[name] for name in self.columns}, copy=False)
+
+
+def compact_result(result: dict, keep: Optional[Sequence[str]] = KEEP_CURVES) -> dict:
+    """A ``process_*`` result with its working ``df`` replaced by a ``WellLog`` under ``log``."""
+    out = {k: v for k, v in result.items() if k != "df"}
+    df = result.get("df")
+    out["log"] = None if df is None else WellLog.from_frame(df, keep)
+    return out
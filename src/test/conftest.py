@@ -4,7 +4,7 @@ from core.config import CLASConfig
 
 @pytest.fixture
 def sample_las_path():
-    return Path(__file__).parent.parent / "sample" / "well01.las"
+    return Path(__file__).parent.parent.parent / "sample" / "example1.las"
 
 @pytest.fixture
 def cfg():
@@ -0,0 +1,55 @@
+import shutil
+import core.field
+import core.process
+from core.batch import run_batch, run_field_batch
+from core.io import read_las
+from core.process import process_frame
+
+def test_pipelined_batch_matches_serial(tmp_path, sample_las_path, cfg):
+    files = []
+    for i in range(4):
+        dst = tmp_path / "las" / f"well{i}.las"
+        dst.parent.mkdir(exist_ok=True)
+        shutil.copy(sample_las_path, dst)
+        files.append(dst)
+    bad = tmp_path / "las" / "bad.las"
+    bad.write_text("not a las file")
+    files.insert(2, bad)
+
+    serial = list(run_batch(files, cfg, tmp_path / "serial", prefetch=0))
+    piped = list(run_batch(files, cfg, tmp_path / "piped", prefetch=2))
+
+    assert [o.las_path for o in piped] == files
+    assert [o.ok for o in piped] == [True, True, False, True, True]
+    for a, b in zip(serial, piped):
+        assert a.ok == b.ok
+        if a.ok:
+            assert a.seams.equals(b.seams)
+            assert b.output_dir.is_dir()
+
+def test_field_batch_falls_back_to_per_well_scoring(tmp_path, sample_las_path, cfg, monkeypatch):
+    files = []
+    for i in range(3):
+        dst = tmp_path / "las" / f"well{i}.las"
+        dst.parent.mkdir(exist_ok=True)
+        shutil.copy(sample_las_path, dst)
+        files.append(dst)
+
+    def broken_field(*args, **kwargs):
+        raise ValueError("bad grid")
+
+    errors = iter([None, ValueError("bad well"), None])
+    def frame(df, well, cfg):
+        exc = next(errors)
+        if exc:
+            raise exc
+        return process_frame(df, well, cfg)
+
+    monkeypatch.setattr(core.field, "process_field", broken_field)
+    monkeypatch.setattr(core.process, "process_frame", frame)
+    outcomes = list(run_field_batch(files, cfg, tmp_path / "out"))
+
+    assert [o.las_path for o in outcomes] == files
+    assert [o.ok for o in outcomes] == [True, False, True]
+    assert outcomes[1].error == "ValueError: bad well"
+    assert outcomes[0].seams.equals(process_frame(*read_las(files[0]), cfg)["seams"])
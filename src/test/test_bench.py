@@ -0,0 +1,29 @@
+import numpy as np
+from bench.__main__ import StageResult, regressions
+from bench.synth import synth_las, synth_well
+from core.config import CLASConfig
+from core.io import read_las
+from core.process import process_well
+
+def test_synthetic_well_roundtrip(tmp_path):
+    ref = synth_well(20_000, seed=3)
+    path = synth_las(tmp_path / "w.las", 20_000, seed=3)
+
+    df, well = read_las(path)
+    assert well == "SYNTH_20000"
+    assert len(df) == len(ref)
+    assert np.allclose(df["GR"], ref.sort_values("DEPT", kind="stable")["GR"], equal_nan=True)
+
+    # has gaps, NaN depth rows and coal to find
+    result = process_well(path, CLASConfig())
+    assert result["df"]["DEPT"].diff().max() > 1.0
+    assert result["seam_count"] > 0
+
+def test_regressions_respect_tolerance():
+    base = {"read_las@1M": {"seconds": 1.0}, "auto_trim@1M": {"seconds": 0.001}}
+    results = [
+        StageResult("read_las", "1M", 10**6, 1.2, 0.0),
+        StageResult("auto_trim", "1M", 10**6, 0.004, 0.0),  # 4x, but under the noise floor
+    ]
+    assert regressions(results, base, tolerance=0.25) == []
+    assert regressions(results, base, tolerance=0.1) == results[:1]
@@ -0,0 +1,68 @@
+import os
+import shutil
+from pathlib import Path
+from core.cache import LasCache
+from core.io import read_las
+
+SAMPLE = Path(__file__).parent.parent.parent / "sample" / "example1.las"
+
+def test_cache_round_trip(tmp_path):
+    cache = LasCache(tmp_path / "cache")
+
+    df, well = read_las(SAMPLE, cache=cache)
+    cached, cached_well = read_las(SAMPLE, cache=cache)
+
+    assert cached_well == well
+    assert cached.equals(df)
+
+def test_cache_key_follows_file_changes(tmp_path):
+    las = tmp_path / "well.las"
+    shutil.copy(SAMPLE, las)
+    cache = LasCache(tmp_path / "cache")
+
+    key = cache.key_for(las)
+    os.utime(las, ns=(0, 0))
+
+    assert cache.key_for(las) != key
+
+def test_lru_eviction(tmp_path):
+    df, well = read_las(SAMPLE)
+
+    probe = LasCache(tmp_path / "probe")
+    probe.put("x", df, well)
+    entry_size = sum(p.stat().st_size for p in probe.root.iterdir())
+
+    cache = LasCache(tmp_path / "cache", max_bytes=2 * entry_size)
+    cache.put("a", df, well)
+    cache.put("b", df, well)
+    os.utime(cache.root / "a.json", (1000, 1000))
+    os.utime(cache.root / "b.json", (2000, 2000))
+
+    assert cache.get("a") is not None  # refreshes "a"
+    cache.put("c", df, well)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+def test_put_scans_directory_only_when_needed(tmp_path, monkeypatch):
+    df, well = read_las(SAMPLE)
+    cache = LasCache(tmp_path / "cache")
+    scans = []
+    real_evict = LasCache.evict
+    monkeypatch.setattr(LasCache, "evict", lambda self: scans.append(1) or real_evict(self))
+
+    for i in range(5):
+        cache.put(str(i), df, well)
+    assert len(scans) == 1  # first put only, far below the cap
+
+def test_hit_survives_failed_access_time_update(tmp_path, monkeypatch):
+    cache = LasCache(tmp_path / "cache")
+    df, well = read_las(SAMPLE)
+    cache.put("a", df, well)
+
+    def denied(*args, **kwargs):
+        raise PermissionError("read-only cache")
+
+    monkeypatch.setattr(os, "utime", denied)
+    assert cache.get("a") is not None
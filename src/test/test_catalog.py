@@ -0,0 +1,48 @@
+import pandas as pd
+from pathlib import Path
+from core.catalog import SeamCatalog
+
+def _seams(rows):
+    return pd.DataFrame(rows, columns=["TOP", "BOTTOM", "THICKNESS", "MEAN_CLAS", "MIN_CLAS", "COAL_CONF"])
+
+def test_interval_query(tmp_path):
+    with SeamCatalog(tmp_path / "seams.db") as catalog:
+        catalog.add_well(Path("a.las"), "f1", _seams([
+            (100.0, 102.5, 2.5, 0.7, 0.5, 0.9),
+            (310.0, 313.0, 3.0, 0.8, 0.6, 0.85),
+            (460.0, 464.0, 4.0, 0.8, 0.6, 0.95),
+        ]), {"WELL": "A", "UWI": "100/01"})
+        catalog.add_well(Path("b.las"), "f1", _seams([
+            (440.0, 441.0, 1.0, 0.9, 0.8, 0.99),
+            (449.0, 452.0, 3.0, 0.6, 0.4, 0.81),
+            (300.0, 305.0, 5.0, 0.5, 0.2, 0.5),
+        ]), {"WELL": "B"})
+
+        hits = catalog.query(depth=(300, 450), min_thickness=2, min_conf=0.8)
+
+        assert list(zip(hits["WELL"], hits["TOP"])) == [("A", 310.0), ("B", 449.0)]
+        assert hits["UWI"].iloc[0] == "100/01"
+        assert len(catalog.query(wells=["B"])) == 3
+
+def test_reingest_replaces_well(tmp_path):
+    with SeamCatalog(tmp_path / "seams.db") as catalog:
+        seams = _seams([(10.0, 12.0, 2.0, 0.7, 0.5, 0.9)])
+        catalog.add_well(Path("a.las"), "f1", seams, {"WELL": "A"})
+        catalog.add_well(Path("a.las"), "f1", seams, {"WELL": "A"})
+        catalog.add_well(Path("a.las"), "f2", _seams([]), {"WELL": "A"})
+
+        assert catalog.contains(Path("a.las"), "f2")
+        assert len(catalog.query()) == 1
+        assert len(catalog.query(depth=(0, 100), fingerprint="f1")) == 1
+        assert catalog.wells()["SEAM_COUNT"].tolist() == [1, 0]
+
+def test_relative_and_absolute_paths_are_one_well(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    seams = _seams([(10.0, 12.0, 2.0, 0.7, 0.5, 0.9)])
+    with SeamCatalog(tmp_path / "seams.db") as catalog:
+        catalog.add_well(Path("a.las"), "f1", seams, {"WELL": "A"})
+        catalog.add_well(tmp_path / "a.las", "f1", seams, {"WELL": "A"})
+
+        assert catalog.contains(Path("a.las"), "f1")
+        assert len(catalog.wells()) == 1
+        assert catalog.wells()["LAS_PATH"].iloc[0] == str(tmp_path / "a.las")
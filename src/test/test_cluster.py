@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import threading
+from time import time
+from core.cluster import CLAIMS_DIR, SUMMARY_NAME, ClaimDir, ClusterNode, merge
+from core.batch import MAX_CRASHES
+from core.config import CLASConfig
+from core.manifest import Manifest
+
+def test_claim_is_exclusive_until_released(tmp_path):
+    a = ClaimDir(tmp_path, "a")
+    b = ClaimDir(tmp_path, "b")
+
+    assert a.try_claim("w1")
+    assert not b.try_claim("w1")
+    assert b.holder("w1")["node"] == "a"
+
+    a.release("w1")
+    assert b.try_claim("w1")
+
+def test_expired_claim_is_taken_over(tmp_path):
+    a = ClaimDir(tmp_path, "a", lease=60)
+    b = ClaimDir(tmp_path, "b", lease=60)
+    assert a.try_claim("w1")
+
+    assert not b.try_claim("w1")  # lease still running
+    old = time() - 120
+    os.utime(a.lock_path("w1"), (old, old))
+
+    assert b.try_claim("w1")
+    assert b.recovered == 1
+    assert b.holder("w1")["node"] == "b"
+    assert a.renew() == ["w1"] and "w1" not in a.held  # the lock file is b's now
+    assert b.renew() == []
+
+    a.release("w1")  # must not remove b's lock
+    assert b.owns("w1")
+    assert not ClaimDir(tmp_path, "c").try_claim("w1")
+
+def test_release_after_takeover_keeps_new_lock(tmp_path):
+    a = ClaimDir(tmp_path, "a", lease=60)
+    b = ClaimDir(tmp_path, "b", lease=60)
+    assert a.try_claim("w1")
+    old = time() - 120
+    os.utime(a.lock_path("w1"), (old, old))
+    assert b.try_claim("w1")
+
+    a.settle("w1", {"node": "a"})
+    assert b.owns("w1") and b.holder("w1")["node"] == "b"
+
+def test_nodes_share_batch_and_merge(tmp_path, sample_las_path):
+    las_dir = tmp_path / "las"
+    las_dir.mkdir()
+    for i in range(4):
+        shutil.copy(sample_las_path, las_dir / f"w{i}.las")
+    las_files = sorted(las_dir.glob("*.las"))
+    out = tmp_path / "out"
+
+    nodes = [ClusterNode(las_files, CLASConfig(), out, node=f"n{i}", poll=0.05) for i in range(2)]
+    threads = [threading.Thread(target=n.run) for n in nodes]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    done = sorted(o.las_path.name for n in nodes for o in n.outcomes)
+    assert done == [p.name for p in las_files]  # each well exactly once
+    assert not list((out / CLAIMS_DIR).glob("*.lock"))
+
+    summary = merge(out)
+    assert summary["wells"] == 4 and not summary["failed"]
+    assert sorted(n["node"] for n in summary["nodes"]) == ["n0", "n1"]
+    assert json.loads((out / SUMMARY_NAME).read_text())["wells"] == 4
+
+    manifest = Manifest.in_dir(out)
+    assert all(manifest.is_current(p, CLASConfig(), nodes[0].options) for p in las_files)
+
+    again = ClusterNode(las_files, CLASConfig(), out, node="n2", poll=0.05)
+    assert again.run() == []
+
+def test_dead_worker_releases_claims_without_failing_wells(tmp_path, sample_las_path, monkeypatch):
+    import core.batch
+
+    las_dir = tmp_path / "las"
+    las_dir.mkdir()
+    for i in range(3):
+        shutil.copy(sample_las_path, las_dir / f"w{i}.las")
+    las_files = sorted(las_dir.glob("*.las"))
+    out = tmp_path / "out"
+
+    real = core.batch.process_las
+    def dying(las_path, *args, **kwargs):
+        if las_path.stem == "w1":
+            os._exit(1)  # OOM kill / segfault in the worker
+        return real(las_path, *args, **kwargs)
+    monkeypatch.setattr(core.batch, "process_las", dying)  # forked workers inherit it
+
+    node = ClusterNode(las_files, CLASConfig(), out, node="n0", jobs=2, poll=0.05)
+    outcomes = {o.las_path.stem: o for o in node.run()}
+
+    assert outcomes["w0"].ok and outcomes["w2"].ok
+    assert not outcomes["w1"].ok and node._crashes[las_files[1]] == MAX_CRASHES + 1
+    claims = ClaimDir(out / CLAIMS_DIR, "x")
+    assert claims.done_entry("w1") is None  # released, not settled: another node may retry it
+    assert all("error" not in claims.done_entry(k) for k in ("w0", "w2"))
+    assert not list((out / CLAIMS_DIR).glob("*.lock"))
+
+def test_retry_failed_clears_only_failed_markers(tmp_path):
+    claims = ClaimDir(tmp_path, "a")
+    claims.done_path("ok").write_text(json.dumps({"node": "a"}))
+    claims.done_path("bad").write_text(json.dumps({"node": "a", "error": "ValueError: boom"}))
+
+    assert claims.clear_failed() == ["bad"]
+    assert claims.done_entry("ok") is not None and claims.done_entry("bad") is None
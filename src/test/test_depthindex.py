@@ -0,0 +1,48 @@
+import json
+import os
+import numpy as np
+import pytest
+from bench.synth import synth_las
+from core.cli import parse_args
+from core.config import CLASConfig
+from core.depthindex import build_index, index_path, load_index, process_window
+from core.process import process_well
+
+def test_window_matches_whole_well(tmp_path):
+    cfg = CLASConfig()
+    las = synth_las(tmp_path / "w.las", 40_000, seed=3)
+    full = process_well(las, cfg)
+    df = full["df"]
+    top, bottom = np.percentile(df["DEPT"], [40, 60])
+
+    # small blocks so the window read really skips most of the file
+    index = build_index(las, block_bytes=4096)
+    assert len(index.tops) > 50
+    index_path(las).write_text(json.dumps(index.to_json()))
+
+    res = process_window(las, cfg, top, bottom)
+    ref = df[(df["DEPT"] >= top) & (df["DEPT"] <= bottom)]
+    assert np.array_equal(res["df"]["DEPT"], ref["DEPT"])
+    assert np.array_equal(res["df"]["CLAS"], ref["CLAS"], equal_nan=True)
+    assert np.array_equal(res["df"]["IS_COAL"], ref["IS_COAL"])
+
+    seams = full["seams"]
+    inside = seams[(seams["TOP"] > top) & (seams["BOTTOM"] < bottom)].reset_index(drop=True)
+    window = res["seams"]
+    window = window[(window["TOP"] > top) & (window["BOTTOM"] < bottom)].reset_index(drop=True)
+    assert window.equals(inside)
+
+def test_index_saved_and_refreshed(tmp_path):
+    las = synth_las(tmp_path / "w.las", 5_000)
+    index = load_index(las)
+    assert index_path(las).exists()
+    assert load_index(las).offsets.tolist() == index.offsets.tolist()
+
+    # a changed file invalidates the saved index
+    st = las.stat()
+    os.utime(las, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert load_index(las).mtime_ns == st.st_mtime_ns + 10**9
+
+def test_depth_range_rejects_catalog():
+    with pytest.raises(SystemExit):
+        parse_args(["--las-dir", "x", "--depth-range", "10", "20", "--catalog", "seams.db"])
@@ -0,0 +1,59 @@
+import importlib.util
+import shutil
+import pandas as pd
+import pytest
+from core import cli, cluster, watch
+from core.__main__ import main
+from core.config import CLASConfig
+from core.export import SEAM_COLUMNS, FieldSeamTable, load_samples, load_seams
+from core.process import process_well
+
+@pytest.mark.parametrize("fmt", ["csv", "json"])
+def test_export_round_trip_and_field_table(tmp_path, sample_las_path, fmt):
+    las_dir = tmp_path / "las"
+    las_dir.mkdir()
+    for name in ("a.las", "b.las"):
+        shutil.copy(sample_las_path, las_dir / name)
+    out = tmp_path / "out"
+
+    argv = ["--las-dir", str(las_dir), "--output", str(out), "--export", fmt, "--quiet"]
+    main(argv)
+
+    ref = process_well(sample_las_path, CLASConfig())
+    assert ref["seam_count"]
+    samples = load_samples(out, fmt)
+    assert len(samples) == 2 * len(ref["df"])
+    assert set(samples["WELL"]) == {ref["well"]}
+
+    seams = load_seams(out, fmt)
+    assert len(seams) == 2 * ref["seam_count"]
+    assert sorted(set(seams["LAS_FILE"])) == sorted(str(p) for p in las_dir.glob("*.las"))
+
+    # a rerun skips both wells but still lists their seams
+    main(argv)
+    assert load_seams(out, fmt).equals(seams)
+
+def test_interrupted_field_table_keeps_previous(tmp_path):
+    path = tmp_path / "clas_field_seams.csv"
+    with FieldSeamTable(path, "csv") as table:
+        table.append("A", "a.las", pd.DataFrame({c: [1.0] for c in SEAM_COLUMNS}))
+    complete = path.read_text()
+
+    with pytest.raises(KeyboardInterrupt):
+        with FieldSeamTable(path, "csv") as table:
+            table.append("B", "b.las", pd.DataFrame({c: [2.0] for c in SEAM_COLUMNS}))
+            raise KeyboardInterrupt
+
+    assert path.read_text() == complete
+    assert not list(tmp_path.glob("*.tmp"))
+
+@pytest.mark.parametrize("parse, argv", [
+    (cli.parse_args, ["--las-dir", "."]),
+    (watch.parse_args, ["."]),
+    (cluster.parse_args, ["run", "."]),
+])
+def test_parquet_needs_pyarrow(monkeypatch, parse, argv):
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: None)
+    with pytest.raises(SystemExit):
+        parse(argv + ["--export", "parquet"])
+    assert parse(argv + ["--export", "csv"]).export == "csv"
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from core.config import CLASConfig
+from core.field import field_groups, process_field, resample, common_grid
+from core.process import process_frame
+from bench.synth import synth_well
+
+def _regular(n, seed, offset):
+    df = synth_well(n, seed=seed)
+    df["DEPT"] = np.round(10.0 + offset + np.arange(n) * 0.02, 6)
+    return df
+
+def test_field_matches_per_well_scoring():
+    cfg = CLASConfig()
+    frames = [_regular(1500 + 300 * s, s, 0.2 * s) for s in range(4)]
+    wells = [f"W{s}" for s in range(4)]
+
+    field = process_field(frames, wells, cfg)
+    for df, well, res in zip(frames, wells, field):
+        ref = process_frame(df.copy(), well, cfg)
+        assert np.array_equal(res["df"]["DEPT"], ref["df"]["DEPT"])
+        assert np.array_equal(res["df"]["CLAS"], ref["df"]["CLAS"], equal_nan=True)
+        assert np.array_equal(res["df"]["IS_COAL"], ref["df"]["IS_COAL"])
+        assert res["seams"].equals(ref["seams"])
+
+def test_off_grid_well_is_interpolated_not_bridged():
+    grid_well = pd.DataFrame({"DEPT": np.arange(0, 10.01, 0.5), "GR": 1.0})
+    off = pd.DataFrame({"DEPT": [0.25, 0.75, 1.25, 5.25, 5.75], "GR": [10.0, 20.0, 30.0, 40.0, 50.0]})
+
+    grid = common_grid([grid_well, off], 0.5)
+    (lo, hi), dept, values = resample(off, grid, 0.5)
+
+    gr = values[0]
+    assert dept.tolist() == [0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 5.5]
+    assert gr[:2].tolist() == [15.0, 25.0]
+    assert np.isnan(gr[2:10]).all()  # no samples between 1.25 and 5.25
+    assert gr[-1] == 45.0
+
+def test_groups_respect_element_budget():
+    frames = [pd.DataFrame({"DEPT": np.arange(100.0)}) for _ in range(5)]
+    assert field_groups(frames, 1.0, max_elements=250) == [[0, 1], [2, 3], [4]]
+
+def test_coarser_well_is_interpolated_onto_finer_grid():
+    cfg = CLASConfig()
+    fine = [_regular(5000, s, 0.2 * s) for s in range(2)]
+    coarse = synth_well(1000, seed=2)
+    coarse["DEPT"] = np.round(10.0 + np.arange(1000) * 0.1, 6)
+
+    field = process_field(fine + [coarse], ["F0", "F1", "C"], cfg)
+    for df, res in zip(fine, field):
+        assert res["seams"].equals(process_frame(df.copy(), "F", cfg)["seams"])
+
+    res, ref = field[2], process_frame(coarse.copy(), "C", cfg)
+    assert res["df"]["CLAS"].isna().mean() < 0.1
+    assert res["seam_count"] > 0
+
+    def overlaps(a, b):
+        return all(((b["TOP"] < bot) & (b["BOTTOM"] > top)).any() for top, bot in zip(a["TOP"], a["BOTTOM"]))
+
+    assert overlaps(res["seams"], ref["seams"]) and overlaps(ref["seams"], res["seams"])
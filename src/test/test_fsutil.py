@@ -0,0 +1,22 @@
+import pytest
+from core.fsutil import atomic_path, temp_path
+
+def test_atomic_path_replaces_only_on_success(tmp_path):
+    path = tmp_path / "table.csv"
+    path.write_text("old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_path(path) as tmp:
+            tmp.write_text("torn")
+            raise RuntimeError
+    assert path.read_text() == "old"
+    assert not list(tmp_path.glob("*.tmp"))
+
+    with atomic_path(path) as tmp:
+        tmp.write_text("new")
+    assert path.read_text() == "new"
+
+def test_temp_names_are_unique(tmp_path):
+    path = tmp_path / "clas_manifest.jsonl"
+    assert temp_path(path) != temp_path(path)
+    assert temp_path(path).parent == tmp_path
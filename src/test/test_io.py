@@ -1,8 +1,68 @@
-import lasio
-from core.io import read_las
-
-def test_load_las_returns_lasio_object(sample_las_path):
-    las = read_las(sample_las_path)
-    assert isinstance(las, lasio.LASFile)
-    assert "GR" in las.keys()  # gamma ray curve must exist
-    assert "DEPTH" in las.keys() # depth curve must exist
\ No newline at end of file
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from core.io import _read_lasio, read_las, read_las_bytes
+
+def test_read_las_returns_frame_and_well_name(sample_las_path):
+    df, well = read_las(sample_las_path)
+    assert isinstance(df, pd.DataFrame)
+    assert isinstance(well, str)
+    assert "GR" in df.columns  # gamma ray curve must exist
+    assert "DEPT" in df.columns  # depth curve must exist
+
+SAMPLE = Path(__file__).parent.parent.parent / "sample" / "example1.las"
+
+LAS_TEMPLATE = """~Version
+VERS. 2.0
+WRAP. {wrap}
+~Well
+NULL. -999.25
+WELL. TEST-1 : well name
+~Curve
+DEPTH.M
+RHOB.G/C3
+GR.API
+ILD.OHMM
+~A
+{rows}
+"""
+
+def _write(tmp_path, rows, wrap="NO"):
+    path = tmp_path / "t.las"
+    path.write_text(LAS_TEMPLATE.format(wrap=wrap, rows=rows))
+    return path
+
+def test_native_reader_matches_lasio():
+    df, well = read_las(SAMPLE)
+    ref, ref_well = _read_lasio(SAMPLE)
+
+    assert well == ref_well == "SYNTH_A"
+    assert list(df.columns) == list(ref.columns)
+    assert np.array_equal(df.to_numpy(), ref.to_numpy(), equal_nan=True)
+
+def test_projection_and_header_null(tmp_path):
+    path = _write(tmp_path, "11.0 2.1 -999.25 5\n10.0 -999 40 6")
+    df, well = read_las(path)
+
+    assert well == "TEST-1"
+    assert list(df.columns) == ["DEPT", "SD", "GR"]
+    assert df["DEPT"].tolist() == [10.0, 11.0]
+    assert df["SD"].tolist() == [-999.0, 2.1]
+    assert np.isnan(df.loc[1, "GR"])
+
+def test_wrapped_file_falls_back_to_lasio(tmp_path):
+    path = _write(tmp_path, "10.0\n2.1 40 5\n10.5\n2.2 41 6", wrap="YES")
+    df, _ = read_las(path)
+
+    assert df["GR"].tolist() == [40.0, 41.0]
+
+def test_read_las_bytes_matches_file(tmp_path):
+    df, well = read_las_bytes(SAMPLE.read_bytes(), name=SAMPLE.name)
+    ref, ref_well = read_las(SAMPLE)
+
+    assert well == ref_well
+    assert df.equals(ref)
+
+    wrapped = _write(tmp_path, "10.0\n2.1 40 5\n10.5\n2.2 41 6", wrap="YES")
+    df, _ = read_las_bytes(wrapped.read_bytes())
+    assert df["GR"].tolist() == [40.0, 41.0]
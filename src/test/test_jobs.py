@@ -0,0 +1,76 @@
+from pathlib import Path
+from time import sleep
+from core.config import CLASConfig
+from core.jobs import DONE, EXPIRED, FAILED, JobQueue
+from core.memcache import MemoryCache
+from core.process import process_well
+
+SAMPLE = Path(__file__).parent.parent.parent / "sample" / "example1.las"
+
+def test_jobs_run_in_background_and_share_results():
+    cache = MemoryCache()
+    queue = JobQueue(workers=2, processes=False, cache=cache)
+    data = SAMPLE.read_bytes()
+
+    job = queue.submit(data, SAMPLE.name, CLASConfig())
+    assert queue.submit(data, "copy.las", CLASConfig()) is job
+
+    job.future.exception()
+    queue.shutdown()
+
+    ref = process_well(SAMPLE, CLASConfig())
+    assert job.status == DONE
+    assert job.result["seams"].equals(ref["seams"])
+
+    # a new queue on the same cache completes without running anything
+    again = JobQueue(workers=1, processes=False, cache=cache).submit(data, SAMPLE.name, CLASConfig())
+    assert again.status == DONE and again.future is None
+
+def test_failed_job_reports_error():
+    queue = JobQueue(workers=1, processes=False)
+    job = queue.submit(b"not a las file", "bad.las", CLASConfig())
+    job.future.exception()
+    queue.shutdown()
+
+    assert job.status == FAILED
+    assert queue.jobs([job.id, "missing"]) == [job]
+
+def test_process_pool():
+    queue = JobQueue(workers=1)
+    job = queue.submit(SAMPLE.read_bytes(), SAMPLE.name, CLASConfig())
+    job.future.exception()
+    queue.shutdown()
+
+    assert job.status == DONE
+    assert job.result["seam_count"] == process_well(SAMPLE, CLASConfig())["seam_count"]
+
+def test_results_live_in_cache_and_expire_with_it():
+    cache = MemoryCache()
+    queue = JobQueue(workers=1, processes=False, cache=cache)
+    data = SAMPLE.read_bytes()
+    job = queue.submit(data, SAMPLE.name, CLASConfig())
+    _finished(job)
+    queue.shutdown()
+    assert job.status == DONE and job._result is None
+
+    cache.clear()
+    assert job.status == EXPIRED and job.result is None
+
+    queue = JobQueue(workers=1, processes=False, cache=cache)
+    again = queue.submit(data, SAMPLE.name, CLASConfig())
+    _finished(again)
+    queue.shutdown()
+    assert again is not job and again.status == DONE
+
+def _finished(job):
+    while job.finished is None:  # the done-callback runs just after the future settles
+        sleep(0.001)
+    return job
+
+def test_finished_jobs_capped_without_cache():
+    queue = JobQueue(workers=1, processes=False, max_finished=1)
+    first = _finished(queue.submit(b"bad", "a.las", CLASConfig()))
+    _finished(queue.submit(b"worse", "b.las", CLASConfig()))
+    queue.submit(b"worst", "c.las", CLASConfig())
+    queue.shutdown()
+    assert queue.get(first.id) is None
@@ -0,0 +1,64 @@
+import shutil
+from pathlib import Path
+from core.config import CLASConfig
+from core.manifest import Manifest, make_entry, run_options
+from core.types import WellOutcome
+
+SAMPLE = Path(__file__).parent.parent.parent / "sample" / "example1.las"
+
+def _record(tmp_path, cfg, options):
+    las = tmp_path / "well.las"
+    shutil.copy(SAMPLE, las)
+    out = tmp_path / "out" / "well"
+    out.mkdir(parents=True)
+
+    manifest = Manifest.in_dir(tmp_path / "out")
+    manifest.record(
+        WellOutcome(las_path=las, output_dir=out, elapsed=0.1, well="W", outputs=(out,)),
+        cfg,
+        options,
+    )
+    return las, out
+
+def test_unchanged_well_is_current(tmp_path):
+    cfg = CLASConfig()
+    las, _ = _record(tmp_path, cfg, {"save_plot": False})
+
+    reloaded = Manifest.in_dir(tmp_path / "out")
+    assert reloaded.is_current(las, cfg, {"save_plot": False})
+
+def test_changes_invalidate_entry(tmp_path):
+    cfg = CLASConfig()
+    las, out = _record(tmp_path, cfg, {"save_plot": False})
+    manifest = Manifest.in_dir(tmp_path / "out")
+
+    assert not manifest.is_current(las, CLASConfig(min_thickness=2.0), {"save_plot": False})
+    assert not manifest.is_current(las, cfg, {"save_plot": True})
+
+    with las.open("a") as f:
+        f.write("\n")
+    assert not manifest.is_current(las, cfg, {"save_plot": False})
+
+def test_missing_outputs_invalidate_entry(tmp_path):
+    cfg = CLASConfig()
+    las, out = _record(tmp_path, cfg, {})
+    out.rmdir()
+
+    assert not Manifest.in_dir(tmp_path / "out").is_current(las, cfg, {})
+
+def test_failed_entry_is_current_until_the_file_changes(tmp_path):
+    cfg = CLASConfig()
+    options = run_options(export="csv")
+    las = tmp_path / "well.las"
+    shutil.copy(SAMPLE, las)
+    entry = make_entry(WellOutcome(las, tmp_path / "well", 0.1, error="boom"), cfg, options)
+    manifest = Manifest.in_dir(tmp_path / "out")
+
+    assert entry["error"] == "boom" and "outputs" not in entry
+    assert manifest.failure_current(entry, las, cfg, options)
+    assert not manifest.entry_current(entry, las, cfg, options)
+    assert not manifest.failure_current(entry, las, cfg, run_options())
+
+    with las.open("a") as f:
+        f.write("\n")
+    assert not manifest.failure_current(entry, las, cfg, options)
@@ -0,0 +1,47 @@
+import threading
+import time
+import numpy as np
+from core.memcache import MemoryCache, estimate_size
+
+def test_lru_eviction_by_size():
+    cache = MemoryCache(max_bytes=3000, ttl=None)
+    for key in "abc":
+        cache.put(key, np.zeros(125))  # 1000 bytes each
+
+    cache.get("a")
+    cache.put("d", np.zeros(125))
+
+    assert "b" not in cache
+    assert all(k in cache for k in "acd")
+    assert cache.bytes == 3000
+
+def test_ttl_expiry():
+    cache = MemoryCache(ttl=0.01)
+    cache.put("k", b"value")
+    time.sleep(0.02)
+
+    assert cache.get("k") is None
+    assert cache.bytes == 0
+
+def test_oversized_values_are_not_cached():
+    cache = MemoryCache(max_bytes=10)
+    cache.put("k", b"x" * 100)
+    assert "k" not in cache
+
+def test_get_or_compute_runs_once_under_contention():
+    cache = MemoryCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"df": np.ones(10)}
+
+    threads = [threading.Thread(target=cache.get_or_compute, args=("k", compute)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert estimate_size(cache.get("k")) >= 80
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from viz.lod import DepthPyramid, decimate_points, minmax_decimate
+
+def test_minmax_decimate_keeps_bin_extremes():
+    depth = np.arange(10_000, dtype=float)
+    values = np.sin(depth / 7.0)
+    values[5000] = 9.0
+
+    y, x = minmax_decimate(depth, values, 100)
+    assert len(x) == 400
+    assert np.nanmax(x) == 9.0
+    assert np.nanmin(x) == values.min()
+    assert np.all(np.diff(y) >= 0)
+
+def test_minmax_decimate_keeps_gaps():
+    depth = np.arange(10_000, dtype=float)
+    values = np.ones_like(depth)
+    values[4000:6000] = np.nan
+
+    y, x = minmax_decimate(depth, values, 100)
+    assert np.isnan(x).any()
+    assert not np.isnan(x[y < 4000]).any()
+    assert np.all(np.diff(y) >= 0)
+
+def test_short_curve_untouched():
+    depth = np.arange(50, dtype=float)
+    y, x = minmax_decimate(depth, depth * 2, 100)
+    assert y is depth and len(x) == 50
+
+def test_decimate_points_one_per_cell():
+    rng = np.random.default_rng(0)
+    x, y = rng.random(100_000), rng.random(100_000)
+
+    idx = decimate_points(x, y, 10, 10)
+    assert len(idx) == 100
+    assert np.all(np.diff(idx) > 0)
+
+def test_pyramid_window_uses_finest_level_that_fits():
+    depth = np.arange(200_000) * 0.5
+    gr = np.cos(depth)
+    clas = np.where(np.sin(depth / 50) > 0.5, 0.9, np.nan)
+    pyramid = DepthPyramid(depth, {"GR": gr}, {"CLAS": clas}, min_points=1000)
+
+    overview = pyramid.window(max_points=5000)
+    assert all(len(d) <= 5002 for d, _ in overview.values())
+
+    # a narrow window comes from level 0, one sample past each edge
+    d, v = pyramid.window(1000.0, 1050.0, max_points=5000)["GR"]
+    assert np.array_equal(v, gr[1999:2102])
+    assert np.all(pyramid.window(1000.0, 1050.0)["CLAS"][1] == 0.9)
+
+def test_plotly_plot_counts_frame_and_traces():
+    pytest.importorskip("plotly")
+    from viz.plotly_qc import PlotlyQCPlot
+
+    n = 30_000
+    df = pd.DataFrame({
+        "DEPT": np.arange(n) * 0.1,
+        "GR": np.random.default_rng(0).random(n),
+        "CLAS": np.linspace(0, 1, n),
+        "IS_COAL": np.zeros(n, dtype=bool),
+    })
+    plot = PlotlyQCPlot(df, "W", lod=True)
+    assert plot.nbytes > df.memory_usage(deep=True).sum()
+    assert PlotlyQCPlot(df.iloc[:1000], "W", lod=False).nbytes > 0
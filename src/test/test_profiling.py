@@ -0,0 +1,28 @@
+from pathlib import Path
+from core.config import CLASConfig
+from core.process import process_well
+from core.profiling import StageProfiler, summarize
+
+SAMPLE = Path(__file__).parent.parent.parent / "sample" / "example1.las"
+
+def test_process_well_records_stages():
+    profiler = StageProfiler()
+    profiler.start()
+    try:
+        result = process_well(SAMPLE, CLASConfig(), profiler=profiler)
+    finally:
+        profiler.stop()
+
+    names = [s["stage"] for s in profiler.stages]
+    assert names == ["read_las", "auto_trim", "compute_clas", "is_coal", "extract_seams"]
+    assert profiler.stages[0]["rows"] == len(result["df"])
+    assert all(s["wall_s"] >= 0 and "peak_alloc_mb" in s for s in profiler.stages)
+
+def test_summarize_aggregates_by_stage():
+    well = [{"stage": "read_las", "rows": 10, "wall_s": 1.0, "cpu_s": 0.5, "peak_alloc_mb": 2.0}]
+    other = [{"stage": "read_las", "rows": 30, "wall_s": 3.0, "cpu_s": 1.5, "peak_alloc_mb": 5.0}]
+
+    s = summarize([well, other])["read_las"]
+    assert (s["wells"], s["wall_s"], s["rows"]) == (2, 4.0, 40)
+    assert s["max_peak_alloc_mb"] == 5.0
+    assert s["rows_per_s"] == 10.0
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from core.scoring import compute_clas, flag_coal, rolling_mean, rolling_std
+
+def _random_log(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "DEPT": np.arange(n) * 0.02,
+        "GR": rng.normal(80, 30, n),
+        "LD": rng.normal(2.2, 0.4, n),
+        "SD": rng.normal(2.2, 0.4, n),
+        "CL": rng.normal(8.5, 0.5, n),
+    })
+    for col in ("GR", "LD", "SD", "CL"):
+        df.loc[rng.random(n) < 0.05, col] = np.nan
+    return df
+
+def test_rolling_windows_match_pandas():
+    x = _random_log()["GR"]
+    x[100:110] = 42.0
+
+    for window in (3, 4, 5):
+        expected = x.rolling(window, center=True, min_periods=1).mean()
+        assert np.allclose(rolling_mean(x.to_numpy(), window), expected, equal_nan=True)
+
+    # pandas' running sums drift slightly on flat stretches; ours stay exact
+    expected = x.rolling(5, center=True, min_periods=2).std()
+    assert np.allclose(rolling_std(x.to_numpy(), 5), expected, atol=1e-5, equal_nan=True)
+    assert (rolling_std(x.to_numpy(), 5)[102:108] == 0).all()
+
+def test_clas_range_and_missing_curves(cfg):
+    df = _random_log()
+    clas = compute_clas(df, cfg)
+
+    assert clas.index.equals(df.index)
+    assert ((clas.dropna() >= 0) & (clas.dropna() <= 1)).all()
+
+    # a missing caliper curve degrades the score instead of failing
+    no_cal = compute_clas(df.drop(columns="CL"), cfg)
+    assert len(no_cal) == len(df)
+
+def test_flag_coal_needs_two_of_three():
+    clas = np.array([0.9, np.nan, 0.9, 0.1, 0.9, 0.1, 0.1])
+    assert flag_coal(clas, 0.5).tolist() == [False, True, False, True, False, False, False]
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from core.config import CLASConfig
+from core.seams import extract_seams
+
+
+def _log(is_coal, clas, step=0.1):
+    n = len(is_coal)
+    return pd.DataFrame({
+        "DEPT": 100.0 + np.arange(n) * step,
+        "CLAS": np.asarray(clas, dtype=float),
+        "IS_COAL": np.asarray(is_coal, dtype=bool),
+    })
+
+
+def test_gap_bridging_and_closing():
+    cfg = CLASConfig(min_thickness=0.5, max_no_data_run=0.3, point_threshold=0.5)
+    coal = [0] + [1] * 6 + [0] + [1] * 4 + [0] * 3 + [0] * 4
+    clas = [0.1] + [0.9] * 6 + [np.nan] + [0.8] * 4 + [0.2] * 7
+    df = _log(coal, clas)
+
+    seams = extract_seams(df, cfg)
+
+    # one NaN row (0.1 m) is bridged, two valid non-coal rows (0.4 m) close it
+    assert len(seams) == 1
+    seam = seams.iloc[0]
+    assert np.isclose(seam["TOP"], 100.1)
+    assert np.isclose(seam["BOTTOM"], 101.2)
+    assert np.isclose(seam["MIN_CLAS"], 0.2)
+    assert np.isclose(seam["COAL_CONF"], 10 / 11)
+
+
+def test_open_and_thin_zones_are_dropped():
+    cfg = CLASConfig(min_thickness=0.5, max_no_data_run=0.1)
+    coal = [1, 1, 0, 0, 0] + [0] * 5 + [1] * 8
+    df = _log(coal, [0.9] * len(coal))
+
+    assert extract_seams(df, cfg).empty
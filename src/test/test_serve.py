@@ -0,0 +1,88 @@
+import base64
+import json
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+import pytest
+from core.config import CLASConfig
+from core.jobs import JobQueue
+from core.process import process_well
+from core.serve import HTTPError, Service, decode_columns, make_server
+
+@pytest.fixture
+def server(sample_las_path):
+    queue = JobQueue(workers=2, processes=False)
+    srv = make_server(Service(queue, CLASConfig(), roots=[sample_las_path.parent]), port=0)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+    srv.server_close()
+    queue.shutdown()
+
+def _call(url, data=None, content_type="application/octet-stream"):
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": content_type})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        body = resp.read()
+        return resp.status, json.loads(body) if resp.headers["Content-Type"] == "application/json" else body
+
+def test_upload_poll_and_samples(server, sample_las_path):
+    status, job = _call(f"{server}/jobs?name=example1.las", sample_las_path.read_bytes())
+    assert status == 202
+
+    _, done = _call(f"{server}/jobs/{job['id']}?wait=30")
+    ref = process_well(sample_las_path, CLASConfig())
+    assert done["status"] == "done"
+    assert done["seam_count"] == ref["seam_count"]
+    assert [s["TOP"] for s in done["seams"]] == ref["seams"]["TOP"].tolist()
+
+    _, payload = _call(f"{server}/jobs/{job['id']}/samples")
+    cols = decode_columns(payload)
+    assert np.array_equal(cols["DEPT"], ref["df"]["DEPT"])
+    assert np.array_equal(cols["IS_COAL"], ref["df"]["IS_COAL"])
+    assert np.allclose(cols["CLAS"], ref["df"]["CLAS"], equal_nan=True, atol=1e-6)
+
+def test_batch_paths_with_config_override(server, sample_las_path, tmp_path):
+    body = {
+        "wells": [{"path": str(sample_las_path)}],
+        "config": {"thresholds": {"point_threshold": 0.9}},
+    }
+    _, batch = _call(f"{server}/jobs", json.dumps(body).encode(), "application/json")
+    job_id = batch["jobs"][0]["id"]
+    _, done = _call(f"{server}/jobs/{job_id}?wait=30")
+    ref = process_well(sample_las_path, CLASConfig(point_threshold=0.9))
+    assert done["seam_count"] == ref["seam_count"]
+
+    _, polled = _call(f"{server}/jobs?ids={job_id},unknown")
+    assert [j["id"] for j in polled["jobs"]] == [job_id]
+
+    # paths outside the served roots are refused
+    outside = {"wells": [{"path": str(tmp_path / "x.las")}]}
+    with pytest.raises(urllib.error.HTTPError) as err:
+        _call(f"{server}/jobs", json.dumps(outside).encode(), "application/json")
+    assert err.value.code == 403
+
+def test_failed_batch_queues_nothing(sample_las_path, tmp_path):
+    queue = JobQueue(workers=1, processes=False, max_pending=1)
+    service = Service(queue, CLASConfig(), roots=[sample_las_path.parent])
+    good = {"path": str(sample_las_path)}
+    try:
+        with pytest.raises(HTTPError) as err:
+            service.submit_batch({"wells": [good, {"path": str(tmp_path / "x.las")}]})
+        assert err.value.status == 403
+
+        other = {"data": base64.b64encode(b"~V other").decode(), "name": "other.las"}
+        with pytest.raises(HTTPError) as err:
+            service.submit_batch({"wells": [good, other]})  # two new jobs, room for one
+        assert err.value.status == 429
+        assert queue.pending() == 0
+    finally:
+        queue.shutdown()
+
+def test_bad_wait_is_client_error(server, sample_las_path):
+    _, job = _call(f"{server}/jobs?name=example1.las", sample_las_path.read_bytes())
+    for wait in ("soon", "nan", "-1"):
+        with pytest.raises(urllib.error.HTTPError) as err:
+            _call(f"{server}/jobs/{job['id']}?wait={wait}")
+        assert err.value.code == 400
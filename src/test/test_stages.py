@@ -0,0 +1,54 @@
+from dataclasses import fields, replace
+import pandas as pd
+import pytest
+import core.stages
+from core.cache import LasCache
+from core.config import CLASConfig
+from core.process import process_well
+from core.profiling import StageProfiler
+from core.stages import STAGES, stage_keys
+
+def test_every_config_field_belongs_to_a_stage():
+    used = {f for stage in STAGES for f in stage.fields}
+    assert used == {f.name for f in fields(CLASConfig)}
+
+def test_stage_keys_change_only_downstream():
+    cfg = CLASConfig()
+    base = stage_keys(cfg, "src")
+
+    seams_only = stage_keys(replace(cfg, min_thickness=2.0), "src")
+    assert [seams_only[s.name] == base[s.name] for s in STAGES] == [True, True, True, False]
+
+    weights = stage_keys(replace(cfg, w_gr=0.5), "src")
+    assert [weights[s.name] == base[s.name] for s in STAGES] == [True, False, False, False]
+
+    assert stage_keys(cfg, "other")["subscores"] != base["subscores"]
+
+def _reused(las_path, cfg, cache):
+    profiler = StageProfiler(memory=False)
+    res = process_well(las_path, cfg, cache=cache, profiler=profiler)
+    rec = next(r for r in profiler.stages if r["stage"] == "compute_clas")
+    return res, rec["reused"]
+
+@pytest.mark.parametrize("change, reused", [
+    ({"point_threshold": 0.7, "min_thickness": 0.5, "max_no_data_run": 2.0}, "clas"),
+    ({"w_gr": 0.5, "min_effective_weight": 0.5}, "subscores"),
+    ({"neighbor_window": 7}, None),
+])
+def test_rerun_reuses_unchanged_stages(tmp_path, sample_las_path, cfg, change, reused):
+    cache = LasCache(tmp_path / "cache")
+    _, first = _reused(sample_las_path, cfg, cache)
+    assert first is None
+
+    changed = replace(cfg, **change)
+    res, got = _reused(sample_las_path, changed, cache)
+    assert got == reused
+
+    fresh = process_well(sample_las_path, changed)
+    pd.testing.assert_frame_equal(res["seams"], fresh["seams"])
+    pd.testing.assert_series_equal(res["df"]["CLAS"], fresh["df"]["CLAS"])
+
+def test_stage_keys_include_code_version(monkeypatch):
+    before = stage_keys(CLASConfig(), "src")
+    monkeypatch.setattr(core.stages, "__version__", "99.0")
+    assert stage_keys(CLASConfig(), "src")["subscores"] != before["subscores"]
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent
+
+HEAVY = ("pandas", "numpy", "lasio", "yaml", "matplotlib", "plotly")
+
+def test_cli_import_stays_light():
+    # `clas --help` and orchestration scripts only pay for argparse
+    code = (
+        "import sys, core.__main__; "
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=SRC, check=True, capture_output=True, text=True
+    )
+    assert out.stdout.strip() == ""
+
+def test_help_does_not_load_pipeline():
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "core", "--help"],
+        cwd=SRC, check=True, capture_output=True, text=True,
+    )
+    imported = {line.rsplit("|", 1)[-1].strip() for line in out.stderr.splitlines()}
+    assert not imported & set(HEAVY)
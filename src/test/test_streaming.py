@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from core.config import CLASConfig
+from core.process import process_well
+from core.sketch import QuantileSketch
+from core.streaming import process_well_streaming, stream_well
+
+SAMPLE = Path(__file__).parent.parent.parent / "sample" / "example1.las"
+
+def test_chunked_scoring_matches_in_memory():
+    cfg = CLASConfig(point_threshold=0.4, min_thickness=0.3)
+    ref = process_well(SAMPLE, cfg)
+
+    # tiny blocks force many chunk boundaries; an unbounded sketch is exact
+    _, chunks = stream_well(SAMPLE, cfg, block_bytes=4096, sketch_size=10**9)
+    chunks = list(chunks)
+    samples = pd.concat([c.samples for c in chunks], ignore_index=True)
+    seams = pd.concat([c.seams for c in chunks if not c.seams.empty], ignore_index=True)
+
+    assert len(chunks) > 10
+    assert np.array_equal(samples["CLAS"], ref["df"]["CLAS"], equal_nan=True)
+    assert np.array_equal(samples["IS_COAL"], ref["df"]["IS_COAL"])
+    pd.testing.assert_frame_equal(seams, ref["seams"])
+
+def test_streaming_result_shape():
+    result = process_well_streaming(SAMPLE, CLASConfig())
+
+    assert result["df"] is None
+    assert result["well"] == "SYNTH_A"
+    assert result["seam_count"] == len(result["seams"])
+
+def test_sketch_percentiles():
+    values = np.random.default_rng(0).normal(size=200_000)
+    sketch = QuantileSketch(k=1024)
+    for part in np.array_split(values, 7):
+        sketch.update(part)
+
+    assert not sketch.exact
+    for q in (5, 50, 95):
+        rank = np.mean(values <= sketch.percentile(q))
+        assert abs(rank - q / 100) < 0.01
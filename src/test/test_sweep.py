@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from pathlib import Path
+from core.config import CLASConfig
+from core.process import process_well
+from core.sweep import _parse_values, expand_grid, parse_args, sweep_las
+
+SAMPLE = Path(__file__).parent.parent.parent / "sample" / "example1.las"
+
+def test_expand_grid_is_cartesian():
+    configs = expand_grid(CLASConfig(), {"w_gr": [0.3, 0.4], "neighbor_window": [5.0, 7.0, 9.0]})
+
+    assert len(configs) == 6
+    assert {(c.w_gr, c.neighbor_window) for c in configs} == {
+        (g, w) for g in (0.3, 0.4) for w in (5, 7, 9)
+    }
+    assert all(isinstance(c.neighbor_window, int) for c in configs)
+
+def test_parse_values_range_is_inclusive():
+    assert _parse_values("0.4:0.7:0.1") == [0.4, 0.5, 0.6, 0.7]
+    assert _parse_values("1,2") == [1.0, 2.0]
+    assert _parse_values("0.7:0.4:-0.1") == [0.7, 0.6, 0.5, 0.4]
+
+@pytest.mark.parametrize("values", ["0.5:0.7:0", "0.7:0.5:0.1", "0.5:0.7"])
+def test_bad_range_is_a_usage_error(values):
+    with pytest.raises(ValueError):
+        _parse_values(values)
+    with pytest.raises(SystemExit):
+        parse_args(["--las", "x.las", "--set", f"point_threshold={values}"])
+
+def test_sweep_matches_single_runs():
+    configs = expand_grid(
+        CLASConfig(min_thickness=0.3),
+        {"point_threshold": [0.3, 0.5], "w_gr": [0.3, 0.5], "neighbor_window": [3, 7]},
+    )
+    table = sweep_las(SAMPLE, configs)
+
+    for row, cfg in zip(table.itertuples(), configs):
+        ref = process_well(SAMPLE, cfg)
+        assert row.seam_count == ref["seam_count"]
+        if ref["seam_count"]:
+            assert np.isclose(row.total_thickness, ref["seams"]["THICKNESS"].sum())
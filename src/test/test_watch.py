@@ -0,0 +1,108 @@
+import contextlib
+import os
+import shutil
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from core.config import CLASConfig
+from core.watch import Debouncer, InotifyWatcher, PollingWatcher, WatchDaemon
+
+def test_debouncer_waits_until_file_is_stable(tmp_path):
+    path = tmp_path / "a.las"
+    path.write_text("x")
+    deb = Debouncer(quiet=1.0, settle=0.1)
+
+    deb.touch(path, now=0.0)
+    assert deb.ready(now=0.5) == []
+
+    path.write_text("xy")  # still being written: re-armed
+    assert deb.ready(now=1.5) == []
+    assert deb.ready(now=2.6) == [path]
+    assert len(deb) == 0
+
+def test_polling_watcher_sees_new_files(tmp_path):
+    watcher = PollingWatcher(tmp_path, interval=0.01)
+    (tmp_path / "new.las").write_text("x")
+    (tmp_path / "notes.txt").write_text("x")
+    assert watcher.poll(0.05) == [(tmp_path / "new.las", False)]
+
+def test_inotify_watcher_reports_close_write(tmp_path):
+    try:
+        watcher = InotifyWatcher(tmp_path)
+    except OSError:
+        pytest.skip("inotify unavailable")
+    (tmp_path / "new.LAS").write_text("x")
+    events = watcher.poll(1.0)
+    watcher.close()
+    assert (tmp_path / "new.LAS", True) in events
+
+def test_daemon_processes_dropped_file(tmp_path, sample_las_path):
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    done = threading.Event()
+    outcomes = []
+
+    def on_outcome(outcome):
+        outcomes.append(outcome)
+        done.set()
+
+    daemon = WatchDaemon(drop, CLASConfig(), tmp_path / "out", jobs=1, poll=True,
+                         interval=0.05, quiet=0.1, on_outcome=on_outcome)
+    daemon.start_pool()
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    try:
+        shutil.copy(sample_las_path, drop / "w1.las")
+        assert done.wait(30)
+    finally:
+        daemon.stop()
+        thread.join()
+
+    assert outcomes[0].ok and outcomes[0].las_path == drop / "w1.las"
+    assert daemon.manifest.is_current(drop / "w1.las", CLASConfig(), daemon.options)
+
+def test_polling_watcher_skips_files_removed_mid_scan(tmp_path, monkeypatch):
+    (tmp_path / "gone.las").write_text("x")
+    (tmp_path / "kept.las").write_text("x")
+    watcher = PollingWatcher(tmp_path, interval=0.01)
+
+    real_scandir = os.scandir
+
+    class Vanishing:
+        name, path = "gone.las", str(tmp_path / "gone.las")
+
+        def is_file(self):
+            return True
+
+        def stat(self):
+            raise FileNotFoundError(self.path)
+
+    def scandir(path):
+        entries = [e for e in real_scandir(path) if e.name != "gone.las"] + [Vanishing()]
+        return contextlib.nullcontext(iter(entries))
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    assert tmp_path / "kept.las" in watcher._scan()
+
+def test_daemon_recovers_from_dead_worker(tmp_path, sample_las_path):
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    shutil.copy(sample_las_path, drop / "w1.las")
+    outcomes = []
+    daemon = WatchDaemon(drop, CLASConfig(), tmp_path / "out", jobs=1, poll=True,
+                         on_outcome=outcomes.append)
+    daemon.start_pool()
+    try:
+        # a worker dying (OOM kill, segfault) breaks the whole pool
+        with pytest.raises(BrokenProcessPool):
+            daemon._pool.submit(os._exit, 1).result()
+
+        daemon.dispatch(drop / "w1.las")
+        while daemon._inflight:
+            daemon.collect()
+            time.sleep(0.01)
+    finally:
+        daemon.close()
+
+    assert outcomes and outcomes[0].ok
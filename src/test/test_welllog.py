@@ -0,0 +1,40 @@
+import pickle
+import numpy as np
+import pandas as pd
+from core.config import CLASConfig
+from core.memcache import estimate_size
+from core.process import process_well
+from core.welllog import WellLog, compact_result
+
+def test_welllog_round_trip(sample_las_path):
+    res = process_well(sample_las_path, CLASConfig())
+    df = res["df"]
+    log = WellLog.from_frame(df)
+
+    out = log.to_pandas()
+    assert list(out.columns) == [c for c in df.columns]
+    assert np.array_equal(out["DEPT"], df["DEPT"])
+    assert np.array_equal(out["IS_COAL"], df["IS_COAL"])
+    assert np.allclose(out["CLAS"], df["CLAS"], equal_nan=True, atol=1e-6)
+    assert out["GR"].dtype == np.float32
+
+    # the frame views the stored arrays
+    assert np.shares_memory(out["GR"].to_numpy(), log.curves["GR"])
+    # a regular depth column is stored as a grid
+    assert log.nbytes < estimate_size(df) / 2
+
+    again = pickle.loads(pickle.dumps(log))
+    assert np.array_equal(again.is_coal, log.is_coal)
+
+def test_compact_result_drops_unused_curves():
+    depth = np.arange(100.0)
+    res = {"well": "W", "df": pd.DataFrame({"DEPT": depth, "GR": depth, "XYZ": depth})}
+
+    log = compact_result(res)["log"]
+    assert log.columns == ["DEPT", "GR"] and "df" not in compact_result(res)
+    assert WellLog.from_frame(res["df"], keep=None).columns == ["DEPT", "GR", "XYZ"]
+
+def test_irregular_depth_kept_exactly():
+    depth = np.cumsum(np.random.default_rng(0).uniform(0.1, 0.2, 500))
+    log = WellLog(depth, {"GR": depth})
+    assert np.array_equal(log.depth, depth) and log.nbytes == depth.nbytes * 3 // 2
@@ -0,0 +1,142 @@
+"""
+Level-of-detail helpers shared by the plotting backends.
+
+Curves are reduced to first / min / max / last per depth bin, which
+rasterizes like the full curve as long as a bin is no taller than a
+pixel; marker tracks keep one point per pixel cell. ``DepthPyramid``
+precomputes a stack of such reductions per well so a zoomed depth window
+can be served at the finest level that fits a point budget.
+"""
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+Curve = Tuple[np.ndarray, np.ndarray]  # (depth, values)
+
+
+def minmax_decimate(depth: np.ndarray, values: np.ndarray, n_bins: int) -> Curve:
+    """
+    Reduce a depth-sorted curve to first / min / max / last per depth bin.
+
+    With one bin per pixel row the line rasterizes like the full curve.
+    Bins without any valid value become a NaN row at the bin centre, so
+    gaps at least a bin tall still break the line and depth stays sorted.
+    """
+    n = len(depth)
+    if n <= 4 * n_bins or n < 2:
+        return depth, values
+
+    span = depth[-1] - depth[0]
+    if not span > 0:
+        return depth, values
+
+    bins = np.minimum(((depth - depth[0]) / span * n_bins).astype(np.int64), n_bins - 1)
+
+    valid = ~np.isnan(values)
+    d, v, b = depth[valid], values[valid], bins[valid]
+    if not len(v):
+        return depth[:1], values[:1]
+
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    ends = np.r_[starts[1:], len(v)] - 1
+
+    x = np.column_stack((v[starts], np.minimum.reduceat(v, starts), np.maximum.reduceat(v, starts), v[ends]))
+    y = np.column_stack((d[starts], d[starts], d[ends], d[ends]))
+
+    gaps = np.setdiff1d(bins, b[starts])
+    if len(gaps):
+        order = np.argsort(np.r_[b[starts], gaps], kind="stable")
+        centre = depth[0] + (gaps + 0.5) * span / n_bins
+        x = np.vstack((x, np.full((len(gaps), 4), np.nan)))[order]
+        y = np.vstack((y, np.repeat(centre[:, None], 4, axis=1)))[order]
+
+    return y.ravel(), x.ravel()
+
+
+def decimate_points(x: np.ndarray, y: np.ndarray, nx: int, ny: int) -> np.ndarray:
+    """Indices of the first point in each (nx x ny) pixel cell, in drawing order."""
+    if len(x) <= nx or len(x) < 2:
+        return np.arange(len(x))
+
+    def cell(v, n):
+        lo, hi = v.min(), v.max()
+        if not hi > lo:
+            return np.zeros(len(v), dtype=np.int64)
+        return np.minimum(((v - lo) / (hi - lo) * n).astype(np.int64), n - 1)
+
+    key = cell(y, ny) * nx + cell(x, nx)
+    _, first = np.unique(key, return_index=True)
+    return np.sort(first)
+
+
+class DepthPyramid:
+    """
+    Multi-resolution copies of a well's tracks.
+
+    Level 0 holds every sample; each further level has ``factor`` times
+    fewer points, down to about ``min_points``. ``lines`` are reduced with
+    ``minmax_decimate``, ``points`` (e.g. CCI markers) with
+    ``decimate_points``, the value columns shrinking from ``point_columns``
+    by ``factor`` per level as well.
+    """
+
+    def __init__(
+        self,
+        depth: np.ndarray,
+        lines: Mapping[str, np.ndarray],
+        points: Optional[Mapping[str, np.ndarray]] = None,
+        factor: int = 4,
+        min_points: int = 2000,
+        point_columns: int = 200,
+    ):
+        depth = np.asarray(depth, dtype=np.float64)
+        self.levels: List[Dict[str, Curve]] = []
+
+        base: Dict[str, Curve] = {}
+        for name, values in lines.items():
+            base[name] = (depth, np.asarray(values, dtype=np.float64))
+        for name, values in (points or {}).items():
+            values = np.asarray(values, dtype=np.float64)
+            valid = ~np.isnan(values)
+            base[name] = (depth[valid], values[valid])
+        self.levels.append(base)
+
+        n_bins, columns = len(depth) // 4, point_columns
+        while n_bins * 4 > min_points:
+            n_bins //= factor
+            columns = max(4, columns // factor)
+            level: Dict[str, Curve] = {}
+            for name in lines:
+                level[name] = minmax_decimate(*base[name], max(n_bins, 1))
+            for name in points or {}:
+                d, v = base[name]
+                keep = decimate_points(v, d, columns, max(n_bins, 1))
+                level[name] = (d[keep], v[keep])
+            self.levels.append(level)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.levels[0])
+
+    def window(
+        self,
+        top: Optional[float] = None,
+        bottom: Optional[float] = None,
+        max_points: int = 5000,
+    ) -> Dict[str, Curve]:
+        """
+        Every track cut to [top, bottom], each from the finest level that
+        keeps it within ``max_points``. ``None`` means the end of the log.
+        """
+        out: Dict[str, Curve] = {}
+        for name in self.names:
+            for level in self.levels:
+                d, v = level[name]
+                lo = 0 if top is None else np.searchsorted(d, top, side="left")
+                hi = len(d) if bottom is None else np.searchsorted(d, bottom, side="right")
+                if hi - lo <= max_points or level is self.levels[-1]:
+                    # one sample either side so lines reach the window edges
+                    lo, hi = max(lo - 1, 0), min(hi + 1, len(d))
+                    out[name] = (d[lo:hi], v[lo:hi])
+                    break
+        return out
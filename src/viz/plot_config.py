@@ -2,6 +2,9 @@ from pathlib import Path
 import pandas as pd
 from typing import Literal
 
+import matplotlib.pyplot as plt
+
+from core.profiling import NULL_PROFILER
 from viz.plotlib_qc import plot_qc as plot_qc_matplotlib
 
 PlotBackend = Literal["matplotlib"]
@@ -16,9 +19,12 @@ def plot_qc(
     plot: bool,
     save: bool,
     backend: PlotBackend = "matplotlib",
+    profiler=NULL_PROFILER,
+    lod: bool = True,
+    reuse_figure: bool = False,
 ) -> None:
     if backend == "matplotlib":
-        plot_qc_matplotlib(
+        fig = plot_qc_matplotlib(
             df=df,
             seams=seams,
             well_name=well_name,
@@ -26,6 +32,12 @@ def plot_qc(
             threshold=threshold,
             plot=plot,
             save=save,
+            profiler=profiler,
+            lod=lod,
+            reuse_figure=reuse_figure,
         )
+        if not plot and not reuse_figure:
+            # batch runs render many wells; don't keep every figure alive
+            plt.close(fig)
     else:
         raise ValueError(f"Unsupported plot backend: {backend}")
\ No newline at end of file
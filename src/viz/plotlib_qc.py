@@ -1,12 +1,25 @@
 import matplotlib.pyplot as plt
+from matplotlib.collections import PolyCollection
 from matplotlib.figure import Figure
 from pathlib import Path
+from typing import List, Optional, Tuple
 import pandas as pd
 import numpy as np
 import logging
+import threading
+
+from core.profiling import NULL_PROFILER
+from core.scoring import curve_array, density_curve
+from viz.lod import decimate_points, minmax_decimate
 
 logger = logging.getLogger(__name__)
 
+SAVE_DPI = 200
+FIGSIZE = (13, 10)
+
+INFO_HEADER_LINES = 14  # info panel lines above the seam summary
+SEAM_LINES = 6
+
 # Flexible seam naming for large well interpretation
 def seam_label(index: int) -> str:
     """0 -> A, 25 -> Z, 26 -> AA"""
@@ -19,6 +32,204 @@ def seam_label(index: int) -> str:
         index -= 1
     return label
 
+def qc_png_path(out_dir: Path, well_name: str) -> Path:
+    return out_dir / f"{well_name} C-LAS QC.png"
+
+# -------------------------
+# LEVEL OF DETAIL
+# -------------------------
+def _pixels(ax, dpi: float) -> Tuple[int, int]:
+    box = ax.get_position()
+    w, h = ax.figure.get_size_inches()
+    return max(1, int(np.ceil(box.width * w * dpi))), max(1, int(np.ceil(box.height * h * dpi)))
+
+# -------------------------
+# FIGURE
+# -------------------------
+def _seam_summary(seams: pd.DataFrame, max_seams: Optional[int] = None) -> str:
+    if seams.empty:
+        return "No coal seams detected."
+
+    conf = seams["COAL_CONF"] if "COAL_CONF" in seams else pd.Series(np.nan, index=seams.index)
+    shown = len(seams) if max_seams is None else min(len(seams), max_seams)
+
+    lines = []
+    for i, top, bottom, thick, c, mean in zip(
+        range(shown), seams["TOP"], seams["BOTTOM"], seams["THICKNESS"], conf, seams["MEAN_CLAS"]
+    ):
+        conf_txt = "N/A" if np.isnan(c) else f"{c*100:.0f}%"
+        lines.append(
+            f"Seam {seam_label(i)}:\n"
+            f"  {top:.2f} – {bottom:.2f} m\n"
+            f"  Thickness : {thick:.2f} m\n"
+            f"  Coal Conf : {conf_txt}\n"
+            f"  Mean CCI  : {mean:.2f}\n"
+        )
+    if shown < len(seams):
+        lines.append(f"... {len(seams) - shown} more seam(s)")
+    return "\n".join(lines)
+
+class QCFigure:
+    """
+    The 4-track QC layout (GR, density, CCI, info panel).
+
+    Axes, styling and the colorbar are built once; ``draw`` swaps in a
+    well's data, so a batch can render thousands of wells into the same
+    figure instead of building one per well.
+    """
+
+    def __init__(self, pyplot: bool = True):
+        if pyplot:
+            fig, axes = plt.subplots(1, 4, figsize=FIGSIZE, sharey=True, width_ratios=[1, 1, 1, 0.9])
+        else:
+            # outside pyplot's figure registry: nothing to close, safe to keep around
+            fig = Figure(figsize=FIGSIZE)
+            axes = fig.subplots(1, 4, sharey=True, width_ratios=[1, 1, 1, 0.9])
+
+        self.fig = fig
+        self.ax_gr, self.ax_dens, self.ax_clas, self.ax_info = axes
+        self._artists: List = []
+
+        self.ax_gr.set_xlabel("GR")
+        self.ax_gr.set_ylabel("Depth (m)")
+        self.ax_gr.invert_yaxis()
+        self.ax_clas.set_xlabel("CCI")
+        for ax in (self.ax_gr, self.ax_dens, self.ax_clas):
+            ax.grid(True, linestyle="--", alpha=0.5)
+
+        self.threshold_line = self.ax_clas.axvline(0.7, color="red", linestyle="--", linewidth=1)
+        self.cbar = fig.colorbar(
+            plt.cm.ScalarMappable(cmap="viridis"), ax=self.ax_clas
+        )
+
+        self.ax_info.axis("off")
+        self.info = self.ax_info.text(0.0, 0.95, "", fontsize=10, va="top")
+
+        fig.subplots_adjust(left=0.08, right=0.95, top=0.95, bottom=0.05, wspace=0.25)
+
+    def _visible_seams(self) -> int:
+        """Seam entries that fit in the info panel; the rest would be drawn off-page."""
+        height_pt = 0.95 * self.ax_info.get_position().height * self.fig.get_figheight() * 72
+        lines = height_pt / self.info.get_fontsize()  # upper bound: real lines are taller
+        return max(1, int(np.ceil((lines - INFO_HEADER_LINES) / SEAM_LINES)))
+
+    def _add(self, artist):
+        self._artists.append(artist)
+        return artist
+
+    def clear(self) -> None:
+        for artist in self._artists:
+            artist.remove()
+        self._artists = []
+
+    def draw(
+        self,
+        df: pd.DataFrame,
+        seams: pd.DataFrame,
+        well_name: str,
+        threshold: float,
+        lod_dpi: Optional[float] = None,
+    ) -> Figure:
+        """Fill the tracks with one well; ``lod_dpi`` decimates to that resolution."""
+        self.clear()
+
+        depth = df["DEPT"].to_numpy(dtype=np.float64)
+        _, rows = _pixels(self.ax_gr, lod_dpi) if lod_dpi else (0, 0)
+
+        def curve(ax, values, color):
+            y, x = depth, values
+            if lod_dpi:
+                y, x = minmax_decimate(depth, values, rows)
+            self._add(ax.plot(x, y, color=color, linewidth=0.8)[0])
+
+        # -------------------------
+        # GR TRACK
+        # -------------------------
+        curve(self.ax_gr, curve_array(df, "GR"), "darkgreen")
+
+        # -------------------------
+        # DENSITY TRACK
+        # -------------------------
+        if "LD" in df.columns or "SD" in df.columns:
+            dens = density_curve(curve_array(df, "LD"), curve_array(df, "SD"))
+            valid = ~np.isnan(dens)
+            if valid.any():
+                y, x = depth[valid], dens[valid]
+                if lod_dpi:
+                    y, x = minmax_decimate(y, x, rows)
+                self._add(self.ax_dens.plot(x, y, color="navy", linewidth=0.8)[0])
+        else:
+            self._add(self.ax_dens.text(
+                0.5, 0.5,
+                "Density log\nnot available",
+                ha="center", va="center",
+                transform=self.ax_dens.transAxes
+            ))
+
+        # -------------------------
+        # C-LAS TRACK
+        # -------------------------
+        clas = df["CLAS"].to_numpy(dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            pos = np.flatnonzero(clas > 0)
+        if lod_dpi and len(pos):
+            cols, _ = _pixels(self.ax_clas, lod_dpi)
+            pos = pos[decimate_points(clas[pos], depth[pos], cols, rows)]
+
+        vmin, vmax = (clas[pos].min(), clas[pos].max()) if len(pos) else (0.0, 1.0)
+        sc = self._add(self.ax_clas.scatter(
+            clas[pos], depth[pos], c=clas[pos], cmap="viridis", vmin=vmin, vmax=vmax, s=8
+        ))
+        self.cbar.update_normal(sc)
+        self.threshold_line.set_xdata([threshold, threshold])
+
+        # -------------------------
+        # COAL SHADING
+        # -------------------------
+        if not seams.empty:
+            verts = [
+                [(0, top), (1, top), (1, bottom), (0, bottom)]
+                for top, bottom in zip(seams["TOP"], seams["BOTTOM"])
+            ]
+            for ax in (self.ax_gr, self.ax_dens, self.ax_clas):
+                self._add(ax.add_collection(PolyCollection(
+                    verts, facecolors="black", edgecolors="none", alpha=0.25,
+                    transform=ax.get_yaxis_transform(),
+                ), autolim=False))
+
+        for ax in (self.ax_gr, self.ax_dens, self.ax_clas):
+            ax.relim()
+            ax.autoscale_view()
+
+        # -------------------------
+        # INFO PANEL
+        # -------------------------
+        self.info.set_text(
+            f"WELL: {well_name}\n"
+            "====================\n\n"
+            "INTERPRETATION GUIDE\n"
+            "--------------------\n"
+            "CCI Score (color):\n"
+            "Coal confidence Index score\n\n"
+            "Shaded intervals:\n"
+            "Detected coal seams\n\n"
+            "Threshold:\n"
+            "≥ 0.55  Likely coal\n\n"
+            "SEAM SUMMARY\n"
+            "--------------------\n"
+            f"{_seam_summary(seams, self._visible_seams())}"
+        )
+
+        return self.fig
+
+_local = threading.local()
+
+def shared_figure() -> QCFigure:
+    """A QCFigure reused by every save-only render in this thread."""
+    if getattr(_local, "figure", None) is None:
+        _local.figure = QCFigure(pyplot=False)
+    return _local.figure
+
 def plot_qc(
     df: pd.DataFrame,
     seams: pd.DataFrame,
@@ -27,137 +238,33 @@ def plot_qc(
     threshold: float = 0.7,
     plot: bool = True,
     save: bool = True,
+    profiler=NULL_PROFILER,
+    lod: bool = True,
+    reuse_figure: bool = False,
 ) -> Figure:
+    """
+    Render the QC figure and optionally save / show it.
 
-    fig, axes = plt.subplots(
-        1, 4,
-        figsize=(13, 10),
-        sharey=True,
-        width_ratios=[1, 1, 1, 0.9]
-    )
-
-    ax_gr, ax_dens, ax_clas, ax_info = axes
-
-    # -------------------------
-    # GR TRACK
-    # -------------------------
-    ax_gr.plot(df["GR"], df["DEPT"], color="darkgreen", linewidth=0.8)
-    ax_gr.set_xlabel("GR")
-    ax_gr.set_ylabel("Depth (m)")
-    ax_gr.invert_yaxis()
-    ax_gr.grid(True, linestyle="--", alpha=0.5)
-
-    # -------------------------
-    # DENSITY TRACK
-    # -------------------------
-    dens_cols = [c for c in ("LD", "SD") if c in df.columns]
-    if dens_cols:
-        dens = df[dens_cols].median(axis=1, skipna=True)
-        valid = dens.notna()
-        if valid.any():
-            ax_dens.plot(
-                dens[valid],
-                df.loc[valid, "DEPT"],
-                color="navy",
-                linewidth=0.8
-            )
-
-    else:
-        ax_dens.text(
-            0.5, 0.5,
-            "Density log\nnot available",
-            ha="center", va="center",
-            transform=ax_dens.transAxes
-        )
+    Without ``plot`` the tracks are decimated to the saved resolution
+    (``lod``) and, with ``reuse_figure``, drawn into this thread's shared
+    figure; the returned figure is then only valid until the next call.
+    Interactive plots always get every sample so zooming shows full detail.
+    """
+    interactive = plot
+    qc = shared_figure() if reuse_figure and not interactive else QCFigure()
+    lod_dpi = SAVE_DPI if lod and not interactive else None
 
-    ax_dens.grid(True, linestyle="--", alpha=0.5)
-
-    # -------------------------
-    # C-LAS TRACK
-    # -------------------------
-    mask_pos = df["CLAS"].notna() & (df["CLAS"] > 0)
-
-    sc = ax_clas.scatter(
-        df.loc[mask_pos, "CLAS"],
-        df.loc[mask_pos, "DEPT"],
-        c=df.loc[mask_pos, "CLAS"],
-        cmap="viridis",
-        s=8
-    )
-
-    ax_clas.axvline(threshold, color="red", linestyle="--", linewidth=1)
-    ax_clas.set_xlabel("CCI")
-    ax_clas.grid(True, linestyle="--", alpha=0.5)
-    plt.colorbar(sc, ax=ax_clas)
-
-    # -------------------------
-    # COAL SHADING
-    # -------------------------
-    for _, seam in seams.iterrows():
-        for ax in (ax_gr, ax_dens, ax_clas):
-            ax.axhspan(
-                seam["TOP"],
-                seam["BOTTOM"],
-                color="black",
-                alpha=0.25
-            )
-
-    # -------------------------
-    # INFO PANEL
-    # -------------------------
-    ax_info.axis("off")
-
-    ax_info.axis("off")
-
-    if seams.empty:
-        seam_summary = "No coal seams detected."
-    else:
-        lines = []
-        for i, seam in seams.iterrows():
-            label = seam_label(i) # type: ignore
-            conf = seam.get("COAL_CONF", np.nan)
-            conf_txt = "N/A" if np.isnan(conf) else f"{conf*100:.0f}%"
-
-            lines.append(
-                f"Seam {label}:\n"
-                f"  {seam['TOP']:.2f} – {seam['BOTTOM']:.2f} m\n"
-                f"  Thickness : {seam['THICKNESS']:.2f} m\n"
-                f"  Coal Conf : {conf_txt}\n"
-                f"  Mean CCI  : {seam['MEAN_CLAS']:.2f}\n"
-            )
-
-        seam_summary = "\n".join(lines)
-
-    info_text = (
-        f"WELL: {well_name}\n"
-        "====================\n\n"
-        "INTERPRETATION GUIDE\n"
-        "--------------------\n"
-        "CCI Score (color):\n"
-        "Coal confidence Index score\n\n"
-        "Shaded intervals:\n"
-        "Detected coal seams\n\n"
-        "Threshold:\n"
-        "≥ 0.55  Likely coal\n\n"
-        "SEAM SUMMARY\n"
-        "--------------------\n"
-        f"{seam_summary}"
-    )
-
-    ax_info.text(0.0, 0.95, info_text, fontsize=10, va="top")
-
-    # -------------------------
-    # SAVE
-    # -------------------------
-    out_path = out_dir / f"{well_name} C-LAS QC.png"
-    fig.subplots_adjust(left=0.08, right=0.95, top=0.95, bottom=0.05, wspace=0.25)
+    with profiler.stage("plot_render", rows=len(df)):
+        fig = qc.draw(df, seams, well_name, threshold, lod_dpi=lod_dpi)
 
     if save:
+        out_path = qc_png_path(out_dir, well_name)
         out_dir.mkdir(parents=True, exist_ok=True)
-        fig.savefig(out_path, dpi=200)
+        with profiler.stage("plot_savefig"):
+            fig.savefig(out_path, dpi=SAVE_DPI)
         logger.info(f"Saved QC plot → {out_path.resolve()}")
-        
+
     if plot:
         plt.show(block=True)
 
-    return fig
\ No newline at end of file
+    return fig
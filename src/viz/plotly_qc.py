@@ -1,22 +1,81 @@
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from core.scoring import curve_array, density_curve
+from viz.lod import DepthPyramid
+
+# wells longer than this switch to WebGL traces and a decimated overview
+LOD_MIN_ROWS = 20_000
+
+# points per track sent to the browser for one view
+MAX_POINTS = 5_000
+
+TRACK_COLS = {"GR": 1, "DENS": 2, "CLAS": 3}
+
+# rough bytes per element of trace data plotly keeps as a Python sequence
+SEQUENCE_ITEM_BYTES = 32
+
+
+def _array_bytes(values) -> int:
+    if values is None or isinstance(values, str):
+        return 0
+    if isinstance(values, np.ndarray):
+        return int(values.nbytes)
+    try:
+        return len(values) * SEQUENCE_ITEM_BYTES
+    except TypeError:
+        return 0
+
 
 class PlotlyQCPlot:
+    """
+    Interactive 3-track QC figure.
+
+    Long wells (or ``lod=True``) use ``Scattergl`` traces fed from a
+    ``DepthPyramid``: the first render holds a decimated overview and
+    ``zoom(top, bottom)`` returns a copy at the finest resolution that fits
+    ``max_points`` for that depth window, so full-resolution data only
+    leaves the server for the part of the log being looked at.
+    """
 
     def __init__(
         self,
         df: pd.DataFrame,
         well_name: str,
         threshold: float = 0.7,
+        seams: Optional[pd.DataFrame] = None,
+        lod: Optional[bool] = None,
+        max_points: int = MAX_POINTS,
     ):
         self.df = df
         self.well = well_name
         self.threshold = threshold
+        self.seams = seams
+        self.lod = len(df) > LOD_MIN_ROWS if lod is None else lod
+        self.max_points = max_points
+        self.pyramid = self._pyramid() if self.lod else None
+        self._traces = {}
         self.fig = self._build()
 
+    def _pyramid(self) -> DepthPyramid:
+        lines = {}
+        if "GR" in self.df:
+            lines["GR"] = curve_array(self.df, "GR")
+        if "LD" in self.df or "SD" in self.df:
+            lines["DENS"] = density_curve(curve_array(self.df, "LD"), curve_array(self.df, "SD"))
+
+        points = {}
+        if "CLAS" in self.df:
+            clas = curve_array(self.df, "CLAS")
+            with np.errstate(invalid="ignore"):
+                points["CLAS"] = np.where(clas > 0, clas, np.nan)
+
+        return DepthPyramid(curve_array(self.df, "DEPT"), lines, points, min_points=self.max_points // 4)
+
     # --------------------------------------------------
     # Build figure
     # --------------------------------------------------
@@ -30,9 +89,12 @@ class PlotlyQCPlot:
             subplot_titles=("Gamma Ray", "Density", "CCI"),
         )
 
-        self._gr_track(fig, col=1)
-        self._density_track(fig, col=2)
-        self._cci_track(fig, col=3)
+        view = self.pyramid.window(max_points=self.max_points) if self.lod else None
+
+        self._gr_track(fig, col=TRACK_COLS["GR"], view=view)
+        self._density_track(fig, col=TRACK_COLS["DENS"], view=view)
+        self._cci_track(fig, col=TRACK_COLS["CLAS"], view=view)
+        self._seam_shapes(fig)
 
         fig.update_yaxes(
             autorange="reversed",
@@ -49,72 +111,77 @@ class PlotlyQCPlot:
 
         return fig
 
+    @property
+    def _scatter(self):
+        return go.Scattergl if self.lod else go.Scatter
+
+    def _add(self, fig: go.Figure, name: str, trace, col: int) -> None:
+        fig.add_trace(trace, row=1, col=col)
+        self._traces[name] = len(fig.data) - 1
+
     # --------------------------------------------------
     # GR track, Density track
     # --------------------------------------------------
-    def _gr_track(self, fig: go.Figure, col: int) -> None:
+    def _gr_track(self, fig: go.Figure, col: int, view=None) -> None:
         if "GR" not in self.df:
             return
 
-        fig.add_trace(
-            go.Scatter(
-                x=self.df["GR"],
-                y=self.df["DEPT"],
-                mode="lines",
-                line=dict(color="darkgreen"),
-            ),
-            row=1,
-            col=col,
-        )
+        y, x = view["GR"] if view else (self.df["DEPT"], self.df["GR"])
+
+        self._add(fig, "GR", self._scatter(
+            x=x,
+            y=y,
+            mode="lines",
+            line=dict(color="darkgreen"),
+        ), col)
 
         fig.update_xaxes(title_text="GR", row=1, col=col)
 
-    def _density_track(self, fig: go.Figure, col: int) -> None:
+    def _density_track(self, fig: go.Figure, col: int, view=None) -> None:
         dens_cols = [c for c in ("LD", "SD") if c in self.df.columns]
         if not dens_cols:
             return
 
-        dens = self.df[dens_cols].median(axis=1, skipna=True)
+        if view:
+            y, x = view["DENS"]
+        else:
+            y, x = self.df["DEPT"], self.df[dens_cols].median(axis=1, skipna=True)
 
-        fig.add_trace(
-            go.Scatter(
-                x=dens,
-                y=self.df["DEPT"],
-                mode="lines",
-                line=dict(color="navy"),
-            ),
-            row=1,
-            col=col,
-        )
+        self._add(fig, "DENS", self._scatter(
+            x=x,
+            y=y,
+            mode="lines",
+            line=dict(color="navy"),
+        ), col)
 
         fig.update_xaxes(title_text="Density", row=1, col=col)
 
-    def _cci_track(self, fig: go.Figure, col: int) -> None:
+    def _cci_track(self, fig: go.Figure, col: int, view=None) -> None:
         if "CLAS" not in self.df:
             return
 
         # -----------------------------
         # CLAS scatter plot
         # -----------------------------
-        mask_pos = self.df["CLAS"].notna() & (self.df["CLAS"] > 0)
-
-        fig.add_trace(
-            go.Scatter(
-                x=self.df.loc[mask_pos, "CLAS"],
-                y=self.df.loc[mask_pos, "DEPT"],
-                mode="markers",
-                marker=dict(
-                    size=6,
-                    color=self.df.loc[mask_pos, "CLAS"],
-                    colorscale="Viridis",
-                    cmin=0,
-                    cmax=1,
-                    colorbar=dict(title="CCI"),
-                ),
+        if view:
+            y, x = view["CLAS"]
+        else:
+            mask_pos = self.df["CLAS"].notna() & (self.df["CLAS"] > 0)
+            y, x = self.df.loc[mask_pos, "DEPT"], self.df.loc[mask_pos, "CLAS"]
+
+        self._add(fig, "CLAS", self._scatter(
+            x=x,
+            y=y,
+            mode="markers",
+            marker=dict(
+                size=6,
+                color=x,
+                colorscale="Viridis",
+                cmin=0,
+                cmax=1,
+                colorbar=dict(title="CCI"),
             ),
-            row=1,
-            col=col,
-        )
+        ), col)
 
         fig.update_xaxes(
             title_text="CCI",
@@ -123,8 +190,68 @@ class PlotlyQCPlot:
             col=col,
         )
 
+    # --------------------------------------------------
+    # Seam shading
+    # --------------------------------------------------
+    def _seam_shapes(self, fig: go.Figure) -> None:
+        if self.seams is None or self.seams.empty:
+            return
+
+        # one layout update instead of add_hrect per seam and track
+        shapes = [
+            dict(
+                type="rect",
+                xref=f"x{'' if col == 1 else col} domain",
+                yref="y",
+                x0=0, x1=1, y0=top, y1=bottom,
+                fillcolor="black", opacity=0.2, line_width=0, layer="below",
+            )
+            for top, bottom in zip(self.seams["TOP"], self.seams["BOTTOM"])
+            for col in TRACK_COLS.values()
+        ]
+        fig.update_layout(shapes=shapes)
+
+    # --------------------------------------------------
+    # Zoom
+    # --------------------------------------------------
+    def zoom(self, top: Optional[float] = None, bottom: Optional[float] = None) -> go.Figure:
+        """
+        A copy of the figure showing [top, bottom] (None = end of log) at the
+        finest resolution that fits. The overview in ``figure()`` is left
+        as is, so one plot can serve several sessions.
+        """
+        fig = go.Figure(self.fig)
+
+        if self.lod:
+            view = self.pyramid.window(top, bottom, max_points=self.max_points)
+            with fig.batch_update():
+                for name, index in self._traces.items():
+                    y, x = view[name]
+                    fig.data[index].update(x=x, y=y)
+                    if name == "CLAS":
+                        fig.data[index].marker.color = x
+
+        if top is not None or bottom is not None:
+            depth = self.df["DEPT"]
+            top = depth.iloc[0] if top is None else top
+            bottom = depth.iloc[-1] if bottom is None else bottom
+            fig.update_yaxes(range=[bottom, top], autorange=False)
+
+        return fig
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held: ``df``, the pyramid levels and the figure's trace data."""
+        total = int(self.df.memory_usage(index=True, deep=True).sum())
+        if self.pyramid is not None:
+            total += sum(d.nbytes + v.nbytes for level in self.pyramid.levels for d, v in level.values())
+        for trace in self.fig.data:
+            for attr in ("x", "y", "customdata", "text"):
+                total += _array_bytes(getattr(trace, attr, None))
+        return total
+
     # --------------------------------------------------
     # Applying save function
     # --------------------------------------------------
     def figure(self) -> go.Figure:
-        return self.fig
\ No newline at end of file
+        return self.fig